@@ -0,0 +1,80 @@
+"""
+Batch queries for a StationGraph - a file of queries, one per line, answered
+    across a pool of worker processes so that large batches use every core.
+
+Each line of the query file is a request in the same form as for the query
+    server (see server.py), e.g.
+        {"id": 1, "command": "movetrips", "nodes": "C,C", "maximum": 3}
+    and each answer is written as a line of JSON in the same form, in the
+    same order as the queries. A query that throws an error is answered with
+    the error, and the rest of the batch carries on.
+"""
+
+import json
+import multiprocessing
+import server
+import shared
+from shared import SharedGraph
+
+def run_batch(station_graph, query_lines, output_stream, processes=None,
+        chunksize=64):
+    """
+    Answers a batch of queries, writing each answer as soon as it and every
+        answer before it are ready. The graph is copied into shared memory
+        once, for every worker to query in place (see shared.SharedGraph),
+        and the queries are sent to the workers in chunks as they are read,
+        so the query file is never held in memory all at once.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        query_lines - An iterable of queries, one per line, e.g. an open
+            file. Blank lines are skipped.
+        output_stream - A text stream for the answers, e.g. sys.stdout.
+        processes - The number of worker processes. None uses one per core.
+            With 1, the queries are answered in this process instead.
+        chunksize - The number of queries sent to a worker at a time.
+    Returns:
+        dict - The number of queries answered ('queries') and, of those, the
+            number answered with an error ('errors').
+    """
+    query_lines = (line for line in query_lines if line.strip())
+    summary = {'queries': 0, 'errors': 0}
+    if processes == 1:
+        _write_answers((server.handle_line(station_graph, line)
+                for line in query_lines), output_stream, summary)
+        return summary
+
+    with SharedGraph.create(station_graph) as shared_graph, \
+            multiprocessing.Pool(processes, shared.init_worker,
+                    (shared_graph,)) as pool:
+        _write_answers(pool.imap(_answer_line, query_lines, chunksize),
+                output_stream, summary)
+    return summary
+
+def _write_answers(answers, output_stream, summary):
+    """
+    Writes answers to a stream as lines of JSON, counting them as it goes.
+
+    Arguments:
+        answers - An iterable of responses from server.handle_line().
+        output_stream - A text stream for the answers.
+        summary - The dict of counts returned by run_batch(), updated here.
+    """
+    for answer in answers:
+        summary['queries'] += 1
+        if 'error' in answer:
+            summary['errors'] += 1
+        output_stream.write(json.dumps(answer))
+        output_stream.write('\n')
+    output_stream.flush()
+
+def _answer_line(line):
+    """
+    Answers a single query in a worker process.
+
+    Arguments:
+        line - The query, as a line of JSON.
+    Returns:
+        dict - The response from server.handle_line().
+    """
+    return server.handle_line(shared.worker_graph, line)
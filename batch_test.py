@@ -0,0 +1,56 @@
+import io
+import json
+import unittest
+import batch
+from graph import StationGraph
+
+class BatchTestCases(unittest.TestCase):
+    """
+    Unit testing for batch queries.
+    """
+    def setUp(self):
+        self.stations = StationGraph(['AB5', 'BC4', 'CD8', 'DC8', 'DE6',
+                'AD5', 'CE2', 'EB3', 'AE7'])
+        self.queries = [json.dumps({'id': number, 'command': 'movetrips',
+                'nodes': 'C,C', 'maximum': number}) for number in range(8)]
+        self.queries.insert(4, '')
+        self.queries.append('{"id": "last", "command": "mindist", ' \
+                '"nodes": "A,C"}')
+
+    def check_answers(self, output, summary):
+        """
+        Checks the answers to self.queries - one per query, in order, with
+            the query that throws an error answered with that error.
+        """
+        answers = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([answer['id'] for answer in answers],
+                list(range(8)) + ['last'])
+        self.assertTrue(answers[0]['error'].startswith('ValueError'))
+        for number in range(1, 8):
+            self.assertEqual(answers[number]['result'],
+                    self.stations.num_trips_by_moves('C', 'C', 1, number))
+        self.assertEqual(answers[8]['result'], 9)
+        self.assertEqual(summary, {'queries': 9, 'errors': 1})
+
+    def test_run_batch_in_process(self):
+        """
+        Are the queries answered in order, without stopping at an error,
+            when run in this process?
+        """
+        output = io.StringIO()
+        summary = batch.run_batch(self.stations, self.queries, output,
+                processes=1)
+        self.check_answers(output.getvalue(), summary)
+
+    def test_run_batch_process_pool(self):
+        """
+        Are the queries answered the same way, in order, when spread across
+            worker processes a few at a time?
+        """
+        output = io.StringIO()
+        summary = batch.run_batch(self.stations, iter(self.queries), output,
+                processes=2, chunksize=2)
+        self.check_answers(output.getvalue(), summary)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+import threading
+
+class LRUCache:
+    """
+    A class representing a bounded, least-recently-used cache. When the cache
+        is full, adding a new item evicts the item that was used least
+        recently. Hits and misses are counted so the cache can be sized.
+
+    Public variables are:
+        maxsize - The maximum number of items held by the cache. A maxsize
+            of 0 disables the cache.
+        hits - The number of get() calls that found their key.
+        misses - The number of get() calls that did not find their key.
+
+    Private variables are:
+        _items - An OrderedDict of the cached items, ordered from least to
+            most recently used.
+        _lock - Guards _items, so the cache can be shared between threads.
+    """
+    def __init__(self, maxsize):
+        """
+        Constructor method - returns a completely empty cache.
+
+        Arguments:
+            maxsize - The maximum number of items held by the cache. Will
+                throw a ValueError if less than zero.
+        """
+        if maxsize < 0:
+            raise ValueError("Cache size cannot be negative")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for a key and marks it as the most recently
+            used item.
+
+        Arguments:
+            key - The key to retrieve the value for.
+            default - The value returned if the key is not cached.
+        Returns:
+            (any type) - The cached value, or default on a miss.
+        """
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Adds or replaces the value cached for a key, evicting the least
+            recently used item if the cache is over its maxsize.
+
+        Arguments:
+            key - The key to cache the value under.
+            value - The value to cache.
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def discard(self, key):
+        """
+        Removes the value cached for a key, if there is one.
+
+        Arguments:
+            key - The key to remove.
+        """
+        with self._lock:
+            self._items.pop(key, None)
+
+    def values(self):
+        """
+        Returns a list of the cached values, without marking them as used.
+
+        Returns:
+            list - The cached values, least recently used first.
+        """
+        with self._lock:
+            return list(self._items.values())
+
+    def items(self):
+        """
+        Returns a list of the cached keys and values, without marking them as
+            used.
+
+        Returns:
+            list - (key, value) tuples, least recently used first.
+        """
+        with self._lock:
+            return list(self._items.items())
+
+    def clear(self):
+        """
+        Removes every item from the cache. The hit and miss counters are kept.
+        """
+        with self._lock:
+            self._items.clear()
+
+    def info(self):
+        """
+        Reports the usage of the cache.
+
+        Returns:
+            dict - The hits, misses, current size and maxsize of the cache.
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._items), 'maxsize': self.maxsize}
@@ -0,0 +1,85 @@
+import unittest
+from cache import LRUCache
+
+class LRUCacheUnitTests(unittest.TestCase):
+    """
+    Unit testing for an LRUCache object.
+    """
+    def setUp(self):
+        self.cache = LRUCache(2)
+
+    def test_cache_initializes_empty(self):
+        """
+        Does the cache initialize empty, with no hits or misses?
+        """
+        self.assertEqual(self.cache.info(),
+                {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 2})
+
+    def test_cache_counts_hits_and_misses(self):
+        """
+        Do get() calls count a hit when the key is cached and a miss when
+            it isn't?
+        """
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_cache_evicts_least_recently_used(self):
+        """
+        When the cache is full, is the least recently used item evicted?
+        """
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+        self.cache.put('c', 3)
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_cache_clear(self):
+        """
+        Does clear() empty the cache while keeping its counters?
+        """
+        self.cache.put('a', 1)
+        self.cache.get('a')
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_cache_discard(self):
+        """
+        Does discard() remove a single key, and ignore keys not cached?
+        """
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.discard('a')
+        self.cache.discard('c')
+        self.assertEqual(self.cache.items(), [('b', 2)])
+
+    def test_cache_items_not_marked_used(self):
+        """
+        Does items() list every cached item without changing which is
+            evicted next?
+        """
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.assertEqual(self.cache.items(), [('a', 1), ('b', 2)])
+        self.cache.put('c', 3)
+        self.assertNotIn('a', self.cache)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_cache_size_zero_disabled(self):
+        """
+        Does a cache with a maxsize of 0 never hold anything?
+        """
+        cache = LRUCache(0)
+        cache.put('a', 1)
+        self.assertNotIn('a', cache)
+        with self.assertRaises(ValueError):
+            LRUCache(-1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+The queries that can be run against a StationGraph, shared by the CLI
+    (main.py) and the query server (server.py). Each query is described by a
+    mapping with the same names as the CLI arguments - e.g.
+    {'command': 'movetrips', 'nodes': 'A,C', 'maximum': 4} - so that one
+    query means the same thing wherever it comes from.
+"""
+
+# The commands execute() can run, in the order they are listed by main.py
+QUERY_COMMANDS = ('route', 'movetrips', 'disttrips', 'movetripsfrom',
+        'disttripsfrom', 'movehist', 'disthist', 'mindist')
+
+# The CLI arguments that preprocess the graph rather than describe a query.
+# They are acted on once, when the graph is loaded (see main.py), and a
+# query can't ask for them - the server, batch workers and the TCP service
+# all share one graph across many queries.
+PREPROCESSING_ARGUMENTS = ('landmarks', 'hierarchy')
+
+def execute(station_graph, request):
+    """
+    Runs a single query against a graph.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        request - A mapping describing the query:
+            command - One of QUERY_COMMANDS.
+            nodes - The node names, either comma-separated (as on the command
+                line) or as a list.
+            minimum, maximum - For the trip counting commands, as for the
+                -m and -M arguments. minimum defaults to 1.
+            window - For 'movehist' and 'disthist', an optional list of
+                (minimum, maximum) pairs.
+            search - For 'mindist', as for the --search argument.
+            Any other keys are ignored, but a ValueError is thrown if any of
+            PREPROCESSING_ARGUMENTS is set, or if the command is unknown or
+            an argument is missing or of the wrong type.
+    Returns:
+        output - The output from the StationGraph object, as returned by
+            the method the command maps to.
+    """
+    command = request.get('command')
+    if command not in QUERY_COMMANDS:
+        raise ValueError("Unknown command: {!r}".format(command))
+    for name in PREPROCESSING_ARGUMENTS:
+        if request.get(name):
+            raise ValueError("{:s} is built once when the graph is loaded, " \
+                    "not per query".format(name))
+    node_name_list = _get_nodes(request)
+
+    if command == 'route':
+        return station_graph.get_distance_by_route(node_name_list)
+    if command == 'mindist':
+        _check_node_count(command, node_name_list, 2)
+        return station_graph.min_route_distance(node_name_list[0],
+                node_name_list[1], request.get('search'))
+
+    maximum = _get_int(request, 'maximum')
+    if command in ('movehist', 'disthist'):
+        _check_node_count(command, node_name_list, 2)
+        if command == 'movehist':
+            histogram = station_graph.trip_histogram_by_moves(
+                    node_name_list[0], node_name_list[1], maximum)
+        else:
+            histogram = station_graph.trip_histogram_by_distance(
+                    node_name_list[0], node_name_list[1], maximum)
+        if request.get('window'):
+            return {'{:d},{:d}'.format(*window): histogram.count(*window)
+                    for window in request['window']}
+        return histogram.get_counts()
+
+    minimum = _get_int(request, 'minimum', 1)
+    if command == 'movetrips':
+        _check_node_count(command, node_name_list, 2)
+        return station_graph.num_trips_by_moves(node_name_list[0],
+                node_name_list[1], minimum, maximum)
+    if command == 'disttrips':
+        _check_node_count(command, node_name_list, 2)
+        return station_graph.num_trips_by_distance(node_name_list[0],
+                node_name_list[1], minimum, maximum)
+    _check_node_count(command, node_name_list, 1)
+    if command == 'movetripsfrom':
+        return station_graph.num_trips_from_by_moves(node_name_list[0],
+                minimum, maximum)
+    return station_graph.num_trips_from_by_distance(node_name_list[0],
+            minimum, maximum)
+
+def _get_nodes(request):
+    """
+    Gives the node names of a query as a list.
+    """
+    nodes = request.get('nodes')
+    if isinstance(nodes, str):
+        return nodes.split(',')
+    if isinstance(nodes, (list, tuple)) and \
+            all(isinstance(node, str) for node in nodes):
+        return list(nodes)
+    raise ValueError("Expected nodes as a comma-separated string or a list " \
+            "of names but received {!r}".format(nodes))
+
+def _check_node_count(command, node_name_list, count):
+    """
+    Throws a ValueError if a query doesn't name the number of nodes its
+        command needs.
+    """
+    if len(node_name_list) < count:
+        raise ValueError("Expected {:d} node names for {:s} but received " \
+                "{:d}".format(count, command, len(node_name_list)))
+
+def _get_int(request, name, default=None):
+    """
+    Gives an int argument of a query. Throws a ValueError if it is missing
+        (and has no default) or is not an int.
+    """
+    value = request.get(name)
+    if value is None:
+        if default is None:
+            raise ValueError("Missing argument: {:s}".format(name))
+        return default
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("Expected {:s} as an int but received " \
+                "{!r}".format(name, value))
+    return value
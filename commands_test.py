@@ -0,0 +1,44 @@
+import unittest
+import commands
+from graph import StationGraph
+
+class CommandsTestCases(unittest.TestCase):
+    """
+    Unit testing for the queries shared by the CLI and the query server.
+    """
+    def setUp(self):
+        self.stations = StationGraph(['AB10', 'AC2', 'CB2', 'AD5'])
+
+    def test_execute(self):
+        """
+        Does each command give the same output as the StationGraph method it
+            maps to, with nodes given either way?
+        """
+        self.assertEqual(commands.execute(self.stations,
+                {'command': 'route', 'nodes': 'A,C,B'}), '4')
+        self.assertEqual(commands.execute(self.stations,
+                {'command': 'disttrips', 'nodes': ['A', 'B'], 'maximum': 11}),
+                self.stations.num_trips_by_distance('A', 'B', 1, 11))
+        self.assertEqual(commands.execute(self.stations,
+                {'command': 'movetripsfrom', 'nodes': 'A', 'minimum': 2,
+                'maximum': 2}),
+                self.stations.num_trips_from_by_moves('A', 2, 2))
+        self.assertEqual(commands.execute(self.stations,
+                {'command': 'mindist', 'nodes': 'A,B', 'search': 'early'}), 4)
+
+    def test_execute_errors(self):
+        """
+        Are unknown commands, and missing or mistyped arguments, rejected
+            with a ValueError?
+        """
+        for request in [{'command': 'save'}, {'command': 'route'},
+                {'command': 'movetrips', 'nodes': 'A,B'},
+                {'command': 'movetrips', 'nodes': 'A,B', 'maximum': '3'},
+                {'command': 'mindist', 'nodes': 'A'},
+                {'command': 'mindist', 'nodes': 'A,B', 'hierarchy': True},
+                {'command': 'mindist', 'nodes': 'A,B', 'landmarks': 2}]:
+            with self.assertRaises(ValueError):
+                commands.execute(self.stations, request)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,13 @@
-from queues import PriorityQueue
+from array import array
+import io
+import mmap
+import os
+from queues import BucketQueue, IndexedPriorityQueue
+from cache import LRUCache
+from hierarchy import ContractionHierarchy
+from reachability import Condensation, ReachabilityIndex
+from storage import CompactAdjacency
+from loader import split_connection
 
 class StationGraph:
     """
@@ -9,8 +18,75 @@ class StationGraph:
         values - Another dict containing the name of each station (node) that
             station connects to (key), as well as the distance to that station
             (value).
+    Once compact() is called, _nodes is replaced by a read-only
+        CompactAdjacency, which behaves the same way but stores the stations
+        as integer IDs and the connections in flat arrays.
+
+    The public int generation counts the changes made to the connections,
+        and is moved on by every method that adds, removes or changes one.
+        Each of the derived structures below is only used while it matches
+        the current generation (see _current()) - the private dict
+        _generations holds the generation each was built at, or last brought
+        up to date at, by name (key). A change either brings a structure up
+        to date cheaply, or leaves it to be dropped the next time it is
+        needed (see _connection_changed()).
+
+    The private LRUCache _distance_cache contains:
+        keys - The names of origin stations that min_route_distance() has
+            been called with.
+        values - The full dict of minimum distances from that origin to every
+            station, as found by _shortest_distances(). When a connection
+            changes, each origin is repaired or dropped, and the whole cache
+            is emptied after add_connections().
+
+    The private DistanceIndex _distance_index, if built by
+        build_distance_index(), holds the minimum distance between every pair
+        of stations. It is repaired or dropped in the same way, and dropped
+        when a station is added.
+
+    The private dictionary _reverse_nodes mirrors _nodes with every
+        connection reversed (i.e. the stations connecting TO each station).
+        It is built the first time a bidirectional search needs it, and kept
+        up to date by every change from then on.
+
+    The private Landmarks _landmarks, if built by build_landmarks(), holds
+        the distances to and from a few chosen stations, used as lower bounds
+        by the 'alt' search. They are repaired or dropped along with
+        _distance_index.
+
+    The private ContractionHierarchy _hierarchy, if built by
+        build_hierarchy(), is used by the 'hierarchy' search. It is dropped
+        after any change.
+
+    The private Condensation _condensation, if built by condensation() or
+        build_reachability(), holds the strongly connected components of the
+        graph. While it is current, trip counting and searches for a single
+        destination use it to stay away from points that can't reach it -
+        they never build it themselves, as doing so takes a pass over the
+        whole graph. As it doesn't depend on distances, it is kept when a
+        distance changes, but dropped when a connection is added or
+        removed.
+
+    The private ReachabilityIndex _reachability, if built by
+        build_reachability(), lets queries between two stations that have no
+        route between them be answered without a search. It is updated when
+        a connection is added (unless the connection joins two strongly
+        connected components), kept when a distance changes, and dropped
+        when a connection is removed.
+
+    The private int _max_weight is the distance of the longest connection,
+        used to choose the priority queue for Dijkstra searches (see
+        _node_queue()). It is found the first time it is needed.
     """
-    def __init__(self, connection_list):
+    # The search strategies min_route_distance() can be asked to use. None
+    # picks one automatically.
+    SEARCH_MODES = (None, 'dijkstra', 'early', 'bidirectional', 'alt',
+            'hierarchy')
+    # The longest connection for which Dijkstra searches use a BucketQueue
+    # rather than a binary heap
+    BUCKET_QUEUE_MAX_WEIGHT = 256
+
+    def __init__(self, connection_list, cache_size=128):
         """
         Initialize the _nodes dictionary with a user-provided list of station
             connections.
@@ -21,14 +97,47 @@ class StationGraph:
                 'AB2'. The node names can only be one character each in this
                 format. The distance number can be any length. Throws a ValueError
                 if any item in the list has fewer than 3 characters.
+            cache_size - The number of origins whose minimum distances are
+                kept by min_route_distance(). 0 disables the cache.
         """
         self._nodes = {}
-        for connection in connection_list:
-            if len(connection) < 3:
-                raise ValueError("Expected a connection list item with a " \
-                        "length of 3 or more but got a length of {:d} "\
-                        "instead.".format(len(connection)))
-            self.add_connection(connection[0], connection[1], connection[2:])
+        self._distance_cache = LRUCache(cache_size)
+        self._distance_index = None
+        self._reverse_nodes = None
+        self._landmarks = None
+        self._hierarchy = None
+        self._condensation = None
+        self._reachability = None
+        self._max_weight = None
+        self.generation = 0
+        self._generations = {}
+        self.add_connections(split_connection(connection)
+                for connection in connection_list)
+
+    @classmethod
+    def from_edges(cls, edges, cache_size=128, compact=False):
+        """
+        Builds a graph from any number of connections at once - e.g. those
+            read from a file by loader.read_connections(). Unlike the
+            constructor, station names can be any length.
+
+        Arguments:
+            edges - An iterable of (node_from, node_to, distance) tuples,
+                validated as for add_connection().
+            cache_size - As for StationGraph().
+            compact - If True, the compact storage (see compact()) is built
+                straight from the connections, without building the dict of
+                dicts first.
+        Returns:
+            StationGraph - The graph.
+        """
+        station_graph = cls([], cache_size)
+        if compact:
+            station_graph._nodes = CompactAdjacency.from_edges(
+                    station_graph._check_connections(edges))
+        else:
+            station_graph.add_connections(edges)
+        return station_graph
 
     def get(self, key):
         """
@@ -57,11 +166,41 @@ class StationGraph:
             return []
         return list(self._nodes.keys())
 
+    def compact(self):
+        """
+        Converts the graph to compact storage - station names are mapped to
+            integer IDs, and the connections are stored in flat arrays
+            instead of a dict per station (see storage.CompactAdjacency). This
+            takes far less memory on large graphs. Every query method keeps
+            working, but the graph becomes read-only: add_connection() will
+            throw a TypeError from then on.
+        """
+        if not self.is_compact():
+            self._nodes = CompactAdjacency.from_adjacency(self._nodes)
+            self._reverse_nodes = None
+
+    def is_compact(self):
+        """
+        Indicates whether or not the graph uses compact storage.
+
+        Returns:
+            boolean - True if compact() has been called.
+        """
+        return isinstance(self._nodes, CompactAdjacency)
+
     def add_connection(self, node_from, node_to, distance):
         """
         Adds a single, unidirectional connection from any station to any other
             station. Stations that do not exist will be created and added to
-            _nodes.
+            _nodes. Throws a TypeError if the graph is compact (see compact()).
+
+        A new connection, or a shorter distance for an existing one, can only
+            make routes shorter, so the cached minimum distances, distance
+            index and landmarks are repaired in place - only the distances
+            that the connection improves are worked out again (see
+            _repair_distances()). A longer distance for an existing
+            connection only drops those that relied on it (see
+            _connection_changed()).
 
         Arguments:
             node_from - The origin of the connection between two stations.
@@ -71,24 +210,295 @@ class StationGraph:
                 throw a ValueError if the argument provided is not an int or
                 the int is <=0.
         """
+        if self.is_compact():
+            raise TypeError("Connections cannot be added to a compact graph")
+        distance = self._check_connection(node_from, node_to, distance)
+
+        new_nodes = [node for node in (node_from, node_to)
+                if self.get(node) is None]
+        for node in new_nodes:
+            self._nodes[node] = {}
+        old_distance = self._nodes[node_from].get(node_to)
+        if old_distance == distance:
+            return
+        self._nodes[node_from][node_to] = distance
+        if self._max_weight is not None:
+            self._max_weight = max(self._max_weight, distance)
+        if self._reverse_nodes is not None:
+            self._reverse_nodes.setdefault(node_from, {})
+            self._reverse_nodes.setdefault(node_to, {})[node_from] = distance
+        self._connection_changed(node_from, node_to, old_distance, distance,
+                new_nodes)
+
+    def add_connections(self, edges):
+        """
+        Adds any number of connections at once. Every connection is checked
+            before any is added, so a bad connection leaves the graph as it
+            was, and the graph moves on by a single generation, so the
+            derived structures (caches, indexes) are only dropped once
+            rather than repaired once per connection. Throws a TypeError if
+            the graph is compact (see compact()).
+
+        Arguments:
+            edges - An iterable of (node_from, node_to, distance) tuples,
+                validated as for add_connection().
+        """
+        if self.is_compact():
+            raise TypeError("Connections cannot be added to a compact graph")
+        edges = self._check_connections(edges)
+        if not edges:
+            return
+
+        nodes = self._nodes
+        for node_from, node_to, distance in edges:
+            connected_nodes = nodes.get(node_from)
+            if connected_nodes is None:
+                connected_nodes = nodes[node_from] = {}
+            if node_to not in nodes:
+                nodes[node_to] = {}
+            connected_nodes[node_to] = distance
+        if self._max_weight is not None:
+            self._max_weight = max(self._max_weight,
+                    max(distance for node_from, node_to, distance in edges))
+        if self._reverse_nodes is not None:
+            for node_from, node_to, distance in edges:
+                self._reverse_nodes.setdefault(node_from, {})
+                self._reverse_nodes.setdefault(node_to, {})[node_from] = \
+                        distance
+        self.generation += 1
+
+    def remove_connection(self, node_from, node_to):
+        """
+        Removes a single, unidirectional connection. The stations themselves
+            are kept, even if they are left with no connections. Throws a
+            TypeError if the graph is compact (see compact()).
+
+        Only the derived structures that relied on the connection are dropped
+            (see _connection_changed()) - e.g. a cached origin whose shortest
+            routes never used it is kept as it is.
+
+        Arguments:
+            node_from - The origin of the connection.
+            node_to - The destination of the connection. Will throw a
+                ValueError if there is no connection from node_from to
+                node_to.
+        Returns:
+            int - The distance of the removed connection.
+        """
+        if self.is_compact():
+            raise TypeError("Connections cannot be removed from a compact " \
+                    "graph")
+        if not self.are_adjacent(node_from, node_to):
+            raise ValueError("No connection exists from {} to {}".format(
+                    node_from, node_to))
+
+        distance = self._nodes[node_from].pop(node_to)
+        if self._max_weight == distance:
+            # Found again the next time it is needed
+            self._max_weight = None
+        if self._reverse_nodes is not None:
+            del self._reverse_nodes[node_to][node_from]
+        self._connection_changed(node_from, node_to, distance, None)
+        return distance
+
+    def update_distance(self, node_from, node_to, distance):
+        """
+        Changes the distance of an existing connection, as add_connection()
+            does, but throws a ValueError if there is no such connection -
+            so that a mistyped station is never added by accident.
+
+        Arguments:
+            node_from - The origin of the connection.
+            node_to - The destination of the connection.
+            distance - The new distance, validated as for add_connection().
+        Returns:
+            int - The distance of the connection before the change.
+        """
+        if self.is_compact():
+            raise TypeError("Connections cannot be changed in a compact graph")
+        if not self.are_adjacent(node_from, node_to):
+            raise ValueError("No connection exists from {} to {}".format(
+                    node_from, node_to))
+        old_distance = self._nodes[node_from][node_to]
+        self.add_connection(node_from, node_to, distance)
+        return old_distance
+
+    def _connection_changed(self, node_from, node_to, old_distance, distance,
+            new_nodes=()):
+        """
+        Moves the graph on to its next generation after a single connection
+            is added, removed or given a new distance, and brings the
+            derived structures that can be kept cheaply up to date with it.
+            Any structure not brought up to date is dropped the next time it
+            is needed (see _current()).
+
+        A connection that is new or shorter can only make routes shorter, so
+            the cached distances, distance index and landmarks are repaired
+            (see _repair_distances()). A connection that is removed or
+            longer can only make routes longer, and only those that used it,
+            so a structure is kept as it is unless one of its minimum
+            distances relied on the connection (see _uses_connection()).
+            The reachability index and condensation only change when a
+            connection is added or removed (see
+            ReachabilityIndex.add_connection()). The contraction hierarchy
+            is always dropped.
+
+        Arguments:
+            node_from - The origin of the connection.
+            node_to - The destination of the connection.
+            old_distance - The distance of the connection before the change,
+                or None if it was added.
+            distance - The distance of the connection after the change, or
+                None if it was removed.
+            new_nodes - The stations added along with the connection.
+        """
+        distance_cache = self._current('_distance_cache')
+        distance_index = self._current('_distance_index')
+        landmarks = self._current('_landmarks')
+        reachability = self._current('_reachability')
+        condensation = self._current('_condensation')
+        self.generation += 1
+        if old_distance is None or distance is None:
+            condensation = None
+        if reachability is not None and distance is None:
+            reachability = None
+        elif reachability is not None and old_distance is None and \
+                not reachability.add_connection(node_from, node_to):
+            reachability = None
+        if new_nodes:
+            # The index and landmarks have no place for new points
+            distance_index = landmarks = None
+
+        if old_distance is None or \
+                (distance is not None and distance < old_distance):
+            for origin, min_distances in distance_cache.items():
+                for node in new_nodes:
+                    min_distances[node] = float("inf")
+                self._repair_distances(min_distances, self._nodes, origin,
+                        node_from, node_to, distance, loops=True)
+            if distance_index is not None:
+                distance_index.relax(node_from, node_to, distance)
+            if landmarks is not None:
+                reverse_nodes = self._reverse_adjacency()
+                for landmark, distances_from, distances_to in \
+                        landmarks.rows():
+                    self._repair_distances(distances_from, self._nodes,
+                            landmark, node_from, node_to, distance)
+                    self._repair_distances(distances_to, reverse_nodes,
+                            landmark, node_to, node_from, distance)
+        else:
+            for origin, min_distances in distance_cache.items():
+                if self._uses_connection(min_distances, origin, node_from,
+                        node_to, old_distance, loops=True):
+                    distance_cache.discard(origin)
+            if distance_index is not None and distance_index.uses_connection(
+                    node_from, node_to, old_distance):
+                distance_index = None
+            if landmarks is not None and any(
+                    self._uses_connection(distances_from, landmark,
+                            node_from, node_to, old_distance) or
+                    self._uses_connection(distances_to, landmark,
+                            node_to, node_from, old_distance)
+                    for landmark, distances_from, distances_to in
+                    landmarks.rows()):
+                landmarks = None
+
+        self._generations['_distance_cache'] = self.generation
+        if distance_index is not None:
+            self._generations['_distance_index'] = self.generation
+        if landmarks is not None:
+            self._generations['_landmarks'] = self.generation
+        if reachability is not None:
+            self._generations['_reachability'] = self.generation
+        if condensation is not None:
+            self._generations['_condensation'] = self.generation
+
+    @staticmethod
+    def _uses_connection(min_distances, origin, node_from, node_to, distance,
+            loops=False):
+        """
+        Indicates whether or not a connection is on a shortest route from one
+            point, i.e. whether removing it or making it longer could change
+            any of the point's minimum distances. A tie with another route of
+            the same distance counts as using the connection.
+
+        Arguments:
+            min_distances, origin, loops - As for _repair_distances().
+            node_from - The origin of the connection, as it is in the
+                adjacency min_distances was found with.
+            node_to - The destination of the connection, likewise.
+            distance - The distance of the connection.
+        Returns:
+            boolean - True if the connection may be on a shortest route.
+        """
+        if node_from == origin:
+            start = 0
+        else:
+            start = min_distances[node_from]
+        if start == float("inf"):
+            return False
+        if node_to == origin and not loops:
+            return False
+        return min_distances[node_to] == start + distance
+
+    def _current(self, name):
+        """
+        Gives a derived structure, as long as it was built (or last brought
+            up to date) at the graph's current generation. A structure that
+            is out of date is dropped, or emptied for the distance cache.
+
+        Arguments:
+            name - The name of the attribute holding the structure, e.g.
+                '_distance_index'.
+        Returns:
+            (any type) - The structure, or None if it is out of date or has
+                not been built.
+        """
+        structure = getattr(self, name)
+        if structure is not None and \
+                self._generations.get(name) != self.generation:
+            if name == '_distance_cache':
+                structure.clear()
+                self._generations[name] = self.generation
+            else:
+                structure = None
+                setattr(self, name, None)
+        return structure
+
+    @staticmethod
+    def _check_connection(node_from, node_to, distance):
+        """
+        Checks a connection before it is added, as described in
+            add_connection().
+
+        Returns:
+            int - The distance of the connection.
+        """
         if node_from == node_to:
             raise ValueError("Connection attempted between a node and " \
                     "itself: {:s} and {:s}".format(node_from, node_to))
-
-        if self.get(node_from) is None:
-            self._nodes[node_from] = {}
-        if self.get(node_to) is None:
-            self._nodes[node_to] = {}
-
         try:
             distance = int(distance)
         except ValueError:
             raise ValueError("Expected connection distance as an int but " \
                     "received {:s} instead".format(type(distance).__name__))
-        else:
-            if distance <= 0:
-                raise ValueError("Distance of connection is zero or negative")
-        self._nodes[node_from][node_to] = distance
+        if distance <= 0:
+            raise ValueError("Distance of connection is zero or negative")
+        return distance
+
+    @classmethod
+    def _check_connections(cls, edges):
+        """
+        Checks every connection in an iterable, as described in
+            add_connection().
+
+        Returns:
+            list - (node_from, node_to, distance) for each connection, with
+                each distance as an int.
+        """
+        return [(node_from, node_to,
+                cls._check_connection(node_from, node_to, distance))
+                for node_from, node_to, distance in edges]
 
     def are_adjacent(self, node_from, node_to):
         """
@@ -108,6 +518,40 @@ class StationGraph:
             return False
         return node_to in self.get(node_from).keys()
 
+    def can_reach(self, node_from, node_to):
+        """
+        Indicates whether or not any route, of at least one move, leads from
+            one point to another. Answered in constant time if
+            build_reachability() has been called, or with a search
+            otherwise.
+
+        Arguments:
+            node_from - The origin point. Method throws a ValueError if the
+                node does not exist.
+            node_to - The destination point. Method throws a ValueError if
+                the node does not exist. If the same as node_from, whether
+                the point is on a loop.
+        Returns:
+            boolean - True if node_to can be reached from node_from.
+        """
+        if self.get(node_from) is None or self.get(node_to) is None:
+            raise ValueError("Non-existant origin or destination node was " \
+                    "given")
+        reachability = self._current('_reachability')
+        if reachability is not None:
+            return reachability.can_reach(node_from, node_to)
+
+        seen = set()
+        unexplored = [node_from]
+        while unexplored:
+            for connected_node in self._nodes[unexplored.pop()]:
+                if connected_node == node_to:
+                    return True
+                if connected_node not in seen:
+                    seen.add(connected_node)
+                    unexplored.append(connected_node)
+        return False
+
     def get_distance_by_route(self, route):
         """
         Provides the total distance between an arbitrary number of named
@@ -192,61 +636,366 @@ class StationGraph:
         Returns:
             int - The number of possible trips given the restrictions.
         """
-        if maximum < minimum:
-            raise ValueError("maximum ({:d}) is less than " \
-                    "minimum ({:d})".format(maximum, minimum))
-        elif minimum <= 0:
-            raise ValueError("minimum requires a value greater than zero")
+        # Both sweeps count walks per step rather than listing them. In the
+        # current data set, our maximum move count limit is based on being
+        # less than OR EQUAL TO the maximum, while the distance limit is
+        # based on being LESS THAN the maximum ONLY. That conditional is
+        # reflected in the sweeps themselves.
         if self.get(node_from) is None or self.get(node_to) is None:
             raise ValueError("Non-existant origin or destination node was " \
                     "given")
+        self._check_trip_limits(minimum, maximum)
+        if not self._may_reach(node_from, node_to):
+            return 0
+        # Walks that wander off to where node_to can't be reached from are
+        # never counted, so they aren't followed at all
+        sweep = self._trip_sweep(node_from, minimum, maximum, is_distance,
+                self._pruning(node_to))
+
         available_routes = 0
+        for step, layer in sweep:
+            # add to the count if we're above our minimum
+            if step >= minimum:
+                available_routes += layer.get(node_to, 0)
 
-        # We start by building a priority queue made of tuples, which contains
-        # origin node and the number of moves or distance needed to get there.
-        # Then, we start populating the queue with the
-        # name of connecting nodes and the number of connections traversed
-        # or distance traversed to get from the origin to that point.
-        trip_queue = PriorityQueue()
-        trip_queue.add((0, node_from))
-        while not trip_queue.is_empty():
-            current_node = trip_queue.remove()
-            # leave the loop now if we've reached the maximum.
-            # in the current data set, our maximum move count limit is based
-            # on being less than OR EQUAL TO the maximum, while the distance
-            # limit is based on being LESS THAN to the maximum ONLY. That
-            # conditional is reflected here.
-            if is_distance and current_node[0] >= maximum:
-                break
-            elif not is_distance and current_node[0] > maximum:
-                break
-            # add to the count if we've reached the destination and
-            # we're above our minimum
-            if current_node[1] == node_to and current_node[0] >= minimum:
-                available_routes += 1
-            # continue adding to the queue - if we're measuring by distance,
-            # add the distance to the next node. Else, just increment by one
-            # and keep going.
-            for connected_node, distance in self.get(current_node[1]).items():
-                if is_distance:
-                    increment = distance
-                else:
-                    increment = 1
-                trip_queue.add((current_node[0]+increment, connected_node))
+        return available_routes
+
+    def num_trips_from_by_moves(self, node_from, min_moves, max_moves):
+        """
+        Determines the number of trips that can be made from one point to
+            every point in the graph within a certain number of moves, in a
+            single pass. Calls on _num_trips_from().
+
+        Arguments:
+            node_from - The origin point of the trips being queried.
+            min_moves - The minimum number of moves required to be made before
+                trips are counted.
+            max_moves - The maximum number of moves until the number of trips
+                stop being counted and the method exits.
+        Returns:
+            dict - The number of possible trips (value) to each node in the
+                graph (key) given the move number restrictions.
+        """
+        return self._num_trips_from(node_from, min_moves, max_moves, False)
+
+    def num_trips_from_by_distance(self, node_from, min_dist, max_dist):
+        """
+        Determines the number of trips that can be made from one point to
+            every point in the graph within a certain distance, in a single
+            pass. Calls on _num_trips_from().
+
+        Arguments:
+            node_from - The origin point of the trips being queried.
+            min_dist - The minimum distance required to be made before
+                trips are counted.
+            max_dist - The maximum distance before which the number of trips
+                stop being counted and the method exits.
+        Returns:
+            dict - The number of possible trips (value) to each node in the
+                graph (key) given the distance restrictions.
+        """
+        return self._num_trips_from(node_from, min_dist, max_dist, True)
+
+    def _num_trips_from(self, node_from, minimum, maximum, is_distance):
+        """
+        Determines the number of trips that can be made from one point to
+            every point in the graph, within a certain number of moves, or
+            less than a certain distance. Equivalent to calling _num_trips()
+            once for each destination, but the graph is only swept once.
+
+        Arguments:
+            node_from - The origin point of the trips being queried.
+                Method throws a ValueError if the node does not exist.
+            minimum - The minimum moves/distance required to be made before
+                trips are counted. Method will throw a ValueError if less
+                than zero.
+            maximum - The maximum moves/distance until the number of trips
+                stop being counted and the method exits. Will throw a
+                ValueError if less than minimum.
+            is_distance - Whether or not we're calculating the number of trips
+                possible based on distance (True) or number of moves (False).
+        Returns:
+            dict - The number of possible trips (value) to each node in the
+                graph (key) given the restrictions.
+        """
+        sweep = self._trip_sweep(node_from, minimum, maximum, is_distance)
+        if self.get(node_from) is None:
+            raise ValueError("Non-existant origin node was given")
+
+        available_routes = dict.fromkeys(self._nodes, 0)
+        for step, layer in sweep:
+            if step >= minimum:
+                for node, walks in layer.items():
+                    available_routes[node] += walks
 
         return available_routes
 
-    def min_route_distance(self, node_from, node_to):
+    def trip_histogram_by_moves(self, node_from, node_to, max_moves):
+        """
+        Builds a TripHistogram of the number of trips that can be made
+            between two points for every number of moves up to max_moves, in
+            a single pass. Calls on _trip_histogram().
+
+        Arguments:
+            node_from - The origin point of the connection being queried.
+            node_to - The destination of the connection being queried.
+            max_moves - The largest number of moves the histogram covers
+                (inclusive).
+        Returns:
+            TripHistogram - The trip counts, answering any move window up to
+                max_moves.
+        """
+        return self._trip_histogram(node_from, node_to, max_moves, False)
+
+    def trip_histogram_by_distance(self, node_from, node_to, max_dist):
+        """
+        Builds a TripHistogram of the number of trips that can be made
+            between two points for every distance below max_dist, in a single
+            pass. Calls on _trip_histogram().
+
+        Arguments:
+            node_from - The origin point of the connection being queried.
+            node_to - The destination of the connection being queried.
+            max_dist - The distance the histogram covers up to (exclusive).
+        Returns:
+            TripHistogram - The trip counts, answering any distance window up
+                to max_dist.
+        """
+        return self._trip_histogram(node_from, node_to, max_dist, True)
+
+    def _trip_histogram(self, node_from, node_to, ceiling, is_distance):
+        """
+        Counts the trips between two points for every number of moves, or
+            every distance, up to a ceiling.
+
+        Arguments:
+            node_from - The origin point of the connection being queried.
+                Method throws a ValueError if the node does not exist.
+            node_to - The destination of the connection being queried.
+                Method throws a ValueError if the node does not exist.
+            ceiling - The largest maximum the histogram will be able to
+                answer. Will throw a ValueError if zero or less.
+            is_distance - Whether or not we're counting trips by distance
+                (True) or number of moves (False).
+        Returns:
+            TripHistogram - The trip counts between the two points.
+        """
+        if self.get(node_from) is None or self.get(node_to) is None:
+            raise ValueError("Non-existant origin or destination node was " \
+                    "given")
+        self._check_trip_limits(1, ceiling)
+
+        # Moves are counted up to and including the ceiling, distances up to
+        # but not including it - see _num_trips()
+        if is_distance:
+            counts = [0] * ceiling
+        else:
+            counts = [0] * (ceiling + 1)
+        if not self._may_reach(node_from, node_to):
+            return TripHistogram(counts, ceiling, is_distance)
+        sweep = self._trip_sweep(node_from, 1, ceiling, is_distance,
+                self._pruning(node_to))
+        for step, layer in sweep:
+            counts[step] = layer.get(node_to, 0)
+
+        return TripHistogram(counts, ceiling, is_distance)
+
+    def iter_trips(self, node_from, node_to, minimum, maximum,
+            is_distance=False):
+        """
+        Lists the trips counted by num_trips_by_moves() (or, with is_distance,
+            by num_trips_by_distance()), one at a time. Trips are given in
+            order of their number of moves (or distance), and in the order
+            of each point's connections otherwise. Nothing is worked out
+            until the first trip is asked for, and only the trip being built
+            is held at any one time - see _walk_trips().
+
+        Arguments:
+            node_from - The origin point of the trips. Method throws a
+                ValueError if the node does not exist.
+            node_to - The destination of the trips. Method throws a
+                ValueError if the node does not exist.
+            minimum - As for _num_trips().
+            maximum - As for _num_trips().
+            is_distance - Whether or not the limits are distances (True) or
+                numbers of moves (False).
+        Returns:
+            generator - Yields each trip as a tuple of the points it passes
+                through, node_from and node_to included.
+        """
+        if self.get(node_from) is None or self.get(node_to) is None:
+            raise ValueError("Non-existant origin or destination node was " \
+                    "given")
+        self._check_trip_limits(minimum, maximum)
+        return self._walk_trips(node_from, node_to, minimum, maximum,
+                is_distance)
+
+    def _trip_sweep(self, node_from, minimum, maximum, is_distance,
+            allowed=None):
+        """
+        Validates the limits of a trip count and returns the matching sweep,
+            either _sweep_by_distance() or _sweep_by_moves().
+
+        Arguments:
+            node_from - The origin point of the walks being counted.
+            minimum - The minimum moves/distance required to be made before
+                trips are counted. Method will throw a ValueError if less
+                than zero.
+            maximum - The maximum moves/distance until the number of trips
+                stop being counted. Will throw a ValueError if less than
+                minimum.
+            is_distance - Whether or not the sweep is by distance (True) or
+                number of moves (False).
+            allowed - As for _sweep_by_moves().
+        Returns:
+            generator - The (step, layer) sweep from node_from.
+        """
+        self._check_trip_limits(minimum, maximum)
+        if is_distance:
+            return self._sweep_by_distance(node_from, maximum, allowed)
+        return self._sweep_by_moves(node_from, maximum, allowed)
+
+    @staticmethod
+    def _check_trip_limits(minimum, maximum):
+        """
+        Validates the limits of a trip count.
+
+        Arguments:
+            minimum - The minimum moves/distance. Method will throw a
+                ValueError if less than zero.
+            maximum - The maximum moves/distance. Will throw a ValueError if
+                less than minimum.
+        """
+        if maximum < minimum:
+            raise ValueError("maximum ({:d}) is less than " \
+                    "minimum ({:d})".format(maximum, minimum))
+        elif minimum <= 0:
+            raise ValueError("minimum requires a value greater than zero")
+
+    def _sweep_by_moves(self, node_from, maximum, allowed=None):
+        """
+        Counts the walks leaving a node one move at a time, without listing
+            the walks themselves. Each step pushes the number of walks ending
+            at every node along that node's connections, so the work done
+            grows with (connections x maximum) rather than with the number
+            of walks.
+
+        Arguments:
+            node_from - The origin point of the walks being counted.
+            maximum - The number of moves to sweep up to (inclusive).
+            allowed - If given, a set of the only components (see
+                condensation()) walks may move to - e.g. those that can reach
+                the destination (see _pruning()). Walks are never extended to
+                a point of any other component.
+        Yields:
+            tuple - (moves, layer), where layer is a dict of every node
+                reached after exactly that many moves (key) and the number of
+                distinct walks from node_from that end there (value). The sweep
+                stops early once no walk can be extended any further.
+        """
+        components = self._condensation.components \
+                if allowed is not None else None
+        layer = {node_from: 1}
+        yield 0, layer
+        for moves in range(1, maximum + 1):
+            next_layer = {}
+            for current_node, walks in layer.items():
+                for connected_node in self.get(current_node):
+                    if allowed is not None and \
+                            components[connected_node] not in allowed:
+                        continue
+                    next_layer[connected_node] = \
+                            next_layer.get(connected_node, 0) + walks
+            if not next_layer:
+                return
+            layer = next_layer
+            yield moves, layer
+
+    def _sweep_by_distance(self, node_from, maximum, allowed=None):
+        """
+        Counts the walks leaving a node in order of the distance travelled,
+            without listing the walks themselves. The walks ending at each
+            (node, distance) pair are merged into a single count, so the work
+            done grows with (connections x maximum) rather than with the
+            number of walks. Only the layers between the current distance and
+            the longest connection are held at any one time, and the next
+            distance that any walk ends on is taken from a priority queue
+            (see _node_queue()), so distances no walk ends on cost nothing.
+
+        Arguments:
+            node_from - The origin point of the walks being counted.
+            maximum - The distance to sweep up to (exclusive).
+            allowed - As for _sweep_by_moves().
+        Yields:
+            tuple - (distance, layer), where layer is a dict of every node
+                reached after travelling exactly that distance (key) and the
+                number of distinct walks from node_from that end there (value).
+                Distances that no walk ends on are skipped.
+        """
+        # The distances that walks are waiting at, in order. As every
+        # connection is at least 1 long, each layer is complete by the time
+        # its distance comes off the queue.
+        components = self._condensation.components \
+                if allowed is not None else None
+        pending_distances = self._node_queue()
+        pending_distances.add(0, 0)
+        pending_layers = {0: {node_from: 1}}
+        while not pending_distances.is_empty():
+            distance = pending_distances.remove()[1]
+            layer = pending_layers.pop(distance)
+            yield distance, layer
+            for current_node, walks in layer.items():
+                for connected_node, connected_distance in \
+                        self.get(current_node).items():
+                    if allowed is not None and \
+                            components[connected_node] not in allowed:
+                        continue
+                    next_distance = distance + connected_distance
+                    if next_distance < maximum:
+                        next_layer = pending_layers.get(next_distance)
+                        if next_layer is None:
+                            next_layer = pending_layers[next_distance] = {}
+                            pending_distances.add(next_distance,
+                                    next_distance)
+                        next_layer[connected_node] = \
+                                next_layer.get(connected_node, 0) + walks
+
+    def min_route_distance(self, node_from, node_to, search=None):
         """
         Gets the shortest route between two points, using Dijkstra's
             algorithm. This version is modified to allow for a route that
-            traverses back to the origin if such a route is possible.
+            traverses back to the origin if such a route is possible. The
+            distances found from each origin are kept in _distance_cache, so
+            repeated origins are answered without searching again. If
+            build_distance_index() has been called, the distance is looked up
+            from the index instead. If build_reachability() has been called,
+            a destination with no route to it is answered straight away,
+            whatever the search mode.
 
         Arguments:
             node_from - The origin point of the connection being queried.
                 Method throws a ValueError if the node does not exist.
             node_to - The destination of the connection being queried.
                 Method throws a ValueError if the node does not exist.
+            search - The search strategy to use, from SEARCH_MODES:
+                'dijkstra' - Search from the origin to every point, and
+                    cache the result for the origin.
+                'early' - Stop searching as soon as the destination's
+                    distance is settled. Nothing is cached.
+                'bidirectional' - Search forwards from the origin and
+                    backwards from the destination at the same time, until
+                    the two searches meet. Nothing is cached.
+                'alt' - A* search towards the destination, guided by the
+                    landmarks from build_landmarks(). Throws a ValueError if
+                    no landmarks have been built. Nothing is cached.
+                'hierarchy' - Query the contraction hierarchy from
+                    build_hierarchy(). Throws a ValueError if no hierarchy
+                    has been built.
+                None (default) - Use the distance index or the cache if they
+                    can answer, then 'hierarchy' or 'alt' if either has been
+                    built, otherwise 'dijkstra' ('early' if the cache is
+                    disabled).
+                Throws a ValueError for any other value.
 
         Returns:
             int/float - The minimum distance to traverse to complete the
@@ -256,29 +1005,732 @@ class StationGraph:
                 from the origin to the destination when the two are different,
                 float("inf") (i.e. infinity) is returned.
         """
+        if search not in self.SEARCH_MODES:
+            raise ValueError("Unknown search mode: {!r}".format(search))
         if self.get(node_from) is None or self.get(node_to) is None:
             raise ValueError("Non-existant origin or destination node was " \
                     "given")
+        if not self._may_reach(node_from, node_to):
+            return 0 if node_from == node_to else float("inf")
+
+        distance_cache = self._current('_distance_cache')
+        if search is None:
+            distance_index = self._current('_distance_index')
+            if distance_index is not None:
+                return distance_index.lookup(node_from, node_to)
+            min_distances = distance_cache.get(node_from)
+            if min_distances is not None:
+                return min_distances[node_to]
+            if self._current('_hierarchy') is not None:
+                search = 'hierarchy'
+            elif self._current('_landmarks') is not None:
+                search = 'alt'
+            elif distance_cache.maxsize == 0:
+                search = 'early'
+            else:
+                search = 'dijkstra'
+
+        if search == 'dijkstra':
+            min_distances = self._shortest_distances(node_from)
+            distance_cache.put(node_from, min_distances)
+            return min_distances[node_to]
+        elif search == 'early':
+            return self._shortest_distances(node_from, node_to).get(node_to,
+                    float("inf"))
+        elif search == 'alt':
+            return self._landmark_distance(node_from, node_to)
+        elif search == 'hierarchy':
+            hierarchy = self._current('_hierarchy')
+            if hierarchy is None:
+                raise ValueError("build_hierarchy() must be called before a " \
+                        "'hierarchy' search")
+            return hierarchy.distance(node_from, node_to)
+        return self._bidirectional_distance(node_from, node_to)
+
+    def min_route_distances_from(self, node_from):
+        """
+        Gets the minimum distance from one point to every point in the graph,
+            with a single search, following the rules of
+            min_route_distance(). Answered from the distance index or the
+            cache if they can, but the result isn't added to the cache - so
+            that sweeping over every origin doesn't push out the origins
+            cached by min_route_distance().
+
+        Arguments:
+            node_from - The origin point of the routes. Method throws a
+                ValueError if the node does not exist.
+        Returns:
+            dict - The minimum distance (value) to each point in the graph
+                (key).
+        """
+        if self.get(node_from) is None:
+            raise ValueError("Non-existant origin node was given")
+        distance_index = self._current('_distance_index')
+        if distance_index is not None:
+            return {node_to: distance_index.lookup(node_from, node_to)
+                    for node_to in self._nodes}
+        min_distances = self._current('_distance_cache').get(node_from)
+        if min_distances is None:
+            min_distances = self._shortest_distances(node_from)
+        return dict(min_distances)
+
+    def _bidirectional_distance(self, node_from, node_to):
+        """
+        Gets the minimum distance between two points by running Dijkstra's
+            algorithm forwards from the origin and backwards (along reversed
+            connections) from the destination, always advancing the search
+            whose next point is closer. The searches stop once the next points
+            of both are together no closer than the best route found. Routes
+            are only recorded when a connection is crossed, never from a
+            point's own distance, so a route from the origin back to itself
+            is always made of at least one connection. Each search skips the
+            points that can't be on a route between the two (see
+            Condensation).
+
+        Arguments:
+            node_from - The origin point of the route.
+            node_to - The destination point of the route.
+
+        Returns:
+            int/float - The minimum distance, as described in
+                min_route_distance().
+        """
+        forward_distances = {node_from: 0}
+        backward_distances = {node_to: 0}
+        forward_queue = self._node_queue()
+        forward_queue.add(node_from, 0)
+        backward_queue = self._node_queue()
+        backward_queue.add(node_to, 0)
+        reverse_nodes = self._reverse_adjacency()
+        forward_allowed = self._pruning(node_to)
+        backward_allowed = self._pruning(node_from, forwards=True)
+        components = self._condensation.components \
+                if self._condensation is not None else None
+        best_distance = float("inf")
+
+        while not forward_queue.is_empty() and not backward_queue.is_empty():
+            forward_minimum = forward_queue.peek()[0]
+            backward_minimum = backward_queue.peek()[0]
+            if forward_minimum + backward_minimum >= best_distance:
+                break
+            if forward_minimum <= backward_minimum:
+                node_queue, adjacency = forward_queue, self._nodes
+                distances, other_distances = forward_distances, backward_distances
+                allowed = forward_allowed
+            else:
+                node_queue, adjacency = backward_queue, reverse_nodes
+                distances, other_distances = backward_distances, forward_distances
+                allowed = backward_allowed
+
+            minimum, current_node = node_queue.remove()
+            for connected_node, connected_distance in \
+                    adjacency[current_node].items():
+                if allowed is not None and \
+                        components[connected_node] not in allowed:
+                    continue
+                new_distance = minimum + connected_distance
+                # Has the other search already reached this point? Then
+                # there's a complete route through this connection.
+                if connected_node in other_distances:
+                    best_distance = min(best_distance,
+                            new_distance + other_distances[connected_node])
+                if new_distance < distances.get(connected_node, float("inf")):
+                    distances[connected_node] = new_distance
+                    if node_queue.contains(connected_node):
+                        node_queue.decrease_key(connected_node, new_distance)
+                    else:
+                        node_queue.add(connected_node, new_distance)
+
+        # No route back to the origin - see min_route_distance()
+        if node_from == node_to and best_distance == float("inf"):
+            return 0
+        return best_distance
+
+    def _walk_trips(self, node_from, node_to, minimum, maximum, is_distance):
+        """
+        Lists the walks between two points for each number of moves (or
+            each distance) in turn, as described in iter_trips().
+
+        A table is kept of which points have a walk of exactly each number
+            of moves (or distance) left to node_to, built by following
+            connections backwards from node_to. Each walk is found by a
+            depth-first search that only moves to a point if the rest of the
+            walk can still be finished from there, so the search never
+            reaches a dead end and the work done grows with the length of
+            the walks listed. The table only has entries for the numbers of
+            moves (or distances) that some walk finishes on, and is filled
+            in order of them alongside the walks themselves, the way
+            _sweep_by_distance() is, so the first walk is given as soon as
+            the table is long enough for it. Only the points the search is
+            part way through are held besides, no matter how many walks
+            there are.
+
+        Arguments:
+            node_from - The origin point of the walks.
+            node_to - The destination of the walks.
+            minimum - The minimum moves/distance of the walks listed.
+            maximum - The maximum moves (inclusive) or distance (exclusive)
+                of the walks listed.
+            is_distance - Whether or not the limits are distances (True) or
+                numbers of moves (False).
+        Yields:
+            tuple - Each walk, as the points it passes through.
+        """
+        if not self._may_reach(node_from, node_to):
+            return
+        if is_distance:
+            maximum -= 1
+        # finishing[steps] holds every point with a walk of exactly that
+        # many moves (or that distance) to node_to. Walks node_from can't
+        # get to are never needed, so they aren't followed at all.
+        allowed = self._pruning(node_from, forwards=True)
+        components = self._condensation.components \
+                if allowed is not None else None
+        reverse_nodes = self._reverse_adjacency()
+        finishing = {0: {node_to}}
+        # As every connection is at least 1 long, the walks for a number of
+        # steps only use the entries for fewer steps, which are complete by
+        # the time that number comes off the queue
+        pending_steps = self._node_queue()
+        pending_steps.add(0, 0)
+        while not pending_steps.is_empty():
+            steps = pending_steps.remove()[1]
+            for current_node in finishing[steps]:
+                for connected_node, connected_distance in \
+                        reverse_nodes[current_node].items():
+                    if allowed is not None and \
+                            components[connected_node] not in allowed:
+                        continue
+                    next_steps = steps + \
+                            (connected_distance if is_distance else 1)
+                    if next_steps > maximum:
+                        continue
+                    next_finishing = finishing.get(next_steps)
+                    if next_finishing is None:
+                        next_finishing = finishing[next_steps] = set()
+                        pending_steps.add(next_steps, next_steps)
+                    next_finishing.add(connected_node)
+
+            if steps < minimum or node_from not in finishing[steps]:
+                continue
+            # The walk so far, the moves (or distance) still to go at each
+            # of its points, and the connections left to try from each
+            route = [node_from]
+            remaining = [steps]
+            unexplored = [iter(self.get(node_from).items())]
+            while unexplored:
+                for connected_node, connected_distance in unexplored[-1]:
+                    left = remaining[-1] - \
+                            (connected_distance if is_distance else 1)
+                    if left < 0 or \
+                            connected_node not in finishing.get(left, ()):
+                        continue
+                    if left == 0:
+                        yield tuple(route) + (connected_node,)
+                        continue
+                    route.append(connected_node)
+                    remaining.append(left)
+                    unexplored.append(
+                            iter(self.get(connected_node).items()))
+                    break
+                else:
+                    route.pop()
+                    remaining.pop()
+                    unexplored.pop()
 
+    def _reverse_adjacency(self):
+        """
+        Returns _reverse_nodes, building it first if this is the first time
+            it's been needed.
+
+        Returns:
+            dict - Each node (key) and a dict of the nodes connecting to it,
+                with the distance of each connection (value). A compact
+                graph gives a CompactAdjacency instead.
+        """
+        if self._reverse_nodes is None and self.is_compact():
+            self._reverse_nodes = self._nodes.reversed()
+        elif self._reverse_nodes is None:
+            reverse_nodes = {node: {} for node in self._nodes}
+            for node_from, connected_nodes in self._nodes.items():
+                for node_to, distance in connected_nodes.items():
+                    reverse_nodes[node_to][node_from] = distance
+            self._reverse_nodes = reverse_nodes
+        return self._reverse_nodes
+
+    def build_reachability(self):
+        """
+        Builds an index of which points can reach which (see
+            reachability.ReachabilityIndex), so that min_route_distance(),
+            the trip counting methods and can_reach() answer a query between
+            two points with no route between them straight away, rather than
+            searching everything reachable from the origin first. Takes the
+            square of the number of strongly connected components in bits.
+
+        Returns:
+            ReachabilityIndex - The index now used by the query methods.
+        """
+        self._reachability = ReachabilityIndex(self.condensation())
+        self._generations['_reachability'] = self.generation
+        return self._reachability
+
+    def condensation(self):
+        """
+        Gives the strongly connected components of the graph and the directed
+            acyclic graph they form (see reachability.Condensation), built
+            the first time it is asked for and kept until a connection is
+            added or removed. While it is kept, trip counting and searches
+            use it to skip points that can't lead to their destination (see
+            _pruning()).
+
+        Returns:
+            Condensation - The condensation of the graph.
+        """
+        condensation = self._current('_condensation')
+        if condensation is None:
+            condensation = self._condensation = Condensation(self._nodes)
+            self._generations['_condensation'] = self.generation
+        return condensation
+
+    def _pruning(self, node, forwards=False):
+        """
+        Gives the components (see condensation()) that a search or sweep
+            towards a point can be kept to - those that can reach it, or
+            with forwards, those that can be reached from it. Nothing is
+            pruned unless the condensation is already built and current, as
+            building it costs more than most searches it would save.
+
+        Arguments:
+            node - The point the routes lead to (or, with forwards, from).
+            forwards - Whether or not to follow connections away from node
+                (True) rather than towards it (False).
+        Returns:
+            frozenset/None - The numbers of the components, or None if they
+                are every component of the graph or there is no current
+                condensation, i.e. nothing can be skipped.
+        """
+        condensation = self._current('_condensation')
+        if condensation is None:
+            return None
+        if forwards:
+            allowed = condensation.reachable_from(node)
+        else:
+            allowed = condensation.reaching(node)
+        if len(allowed) == condensation.component_count:
+            return None
+        return allowed
+
+    def _may_reach(self, node_from, node_to):
+        """
+        Indicates whether or not a route could lead from one point to
+            another, without searching.
+
+        Returns:
+            boolean - False if the reachability index shows there is no
+                route, True if there is one or no index has been built.
+        """
+        reachability = self._current('_reachability')
+        return reachability is None or \
+                reachability.can_reach(node_from, node_to)
+
+    def build_hierarchy(self):
+        """
+        Builds a contraction hierarchy over the graph, which the 'hierarchy'
+            search of min_route_distance() uses to answer queries with two
+            very small searches. Worth it when the graph changes rarely but
+            is queried often - the hierarchy is dropped if a connection is
+            added afterwards.
+
+        Returns:
+            ContractionHierarchy - The hierarchy now used by
+                min_route_distance(). Its shortcut_count and
+                preprocessing_time report the cost of building it.
+        """
+        self._hierarchy = ContractionHierarchy(self._nodes)
+        self._generations['_hierarchy'] = self.generation
+        return self._hierarchy
+
+    def build_landmarks(self, count=8, memory_budget=None):
+        """
+        Picks landmark points and stores the minimum distances from every
+            point to each landmark, and from each landmark to every point.
+            By the triangle inequality these give a lower bound on the
+            distance between any two points, which lets the 'alt' search of
+            min_route_distance() head straight for the destination. Landmarks
+            are picked one at a time, each as far as possible from the ones
+            already picked, starting from the first point. The landmarks are
+            kept up to date as connections are added afterwards (see
+            add_connection()).
+
+        Arguments:
+            count - The number of landmarks to pick. Will throw a ValueError
+                if zero or less.
+            memory_budget - If given, the most bytes the landmark distances
+                may take up. The count is lowered to fit, and a ValueError is
+                thrown if not even one landmark fits. An empty graph has no
+                landmarks to pick, so fits any budget.
+        Returns:
+            Landmarks - The landmarks now used by min_route_distance().
+        """
+        vertices = self.get_vertices()
+        if count <= 0:
+            raise ValueError("count requires a value greater than zero")
+        if memory_budget is not None and vertices:
+            count = min(count, memory_budget // Landmarks.bytes_per_landmark(
+                    len(vertices)))
+            if count <= 0:
+                raise ValueError("A memory budget of {:d} bytes is too small " \
+                        "for any landmarks".format(memory_budget))
+        count = min(count, len(vertices))
+
+        landmarks = Landmarks(vertices)
+        reverse_nodes = self._reverse_adjacency()
+        # How far each point is from the nearest landmark picked so far, in
+        # both directions. Points no landmark can reach (or be reached from)
+        # are picked first, so that every part of the graph gets a landmark.
+        nearest = dict.fromkeys(vertices, float("inf"))
+        landmark = vertices[0] if vertices else None
+        while len(landmarks.landmarks) < count:
+            distances_from = self._dijkstra(landmark, self._nodes)
+            distances_to = self._dijkstra(landmark, reverse_nodes)
+            landmarks.add(landmark, distances_from, distances_to)
+            for node in vertices:
+                nearest[node] = min(nearest[node],
+                        distances_from.get(node, float("inf")) + \
+                        distances_to.get(node, float("inf")))
+            landmark = max(vertices, key=lambda node: nearest[node])
+
+        self._landmarks = landmarks
+        self._generations['_landmarks'] = self.generation
+        return landmarks
+
+    def _dijkstra(self, node_from, adjacency):
+        """
+        Gets the minimum distance from one point to every point it can reach,
+            using an unmodified Dijkstra's algorithm - i.e. the distance from
+            the origin to itself is always 0.
+
+        Arguments:
+            node_from - The origin point of the routes being calculated.
+            adjacency - The connections to follow - either _nodes, or
+                _reverse_nodes to get the distances TO node_from instead.
+
+        Returns:
+            dict - The minimum distance (value) to each point reachable from
+                the origin (key).
+        """
+        min_distances = {node_from: 0}
+        node_queue = self._node_queue()
+        node_queue.add(node_from, 0)
+        while not node_queue.is_empty():
+            minimum, current_node = node_queue.remove()
+            for connected_node, connected_distance in \
+                    adjacency[current_node].items():
+                new_distance = minimum + connected_distance
+                if new_distance < min_distances.get(connected_node, float("inf")):
+                    min_distances[connected_node] = new_distance
+                    if node_queue.contains(connected_node):
+                        node_queue.decrease_key(connected_node, new_distance)
+                    else:
+                        node_queue.add(connected_node, new_distance)
+        return min_distances
+
+    def _landmark_distance(self, node_from, node_to):
+        """
+        Gets the minimum distance between two points using A* search, where
+            the estimate of the distance left to the destination is the lower
+            bound given by the landmarks. Points the landmarks prove can't
+            reach the destination are never explored.
+
+        Arguments:
+            node_from - The origin point of the route.
+            node_to - The destination point of the route.
+
+        Returns:
+            int/float - The minimum distance, as described in
+                min_route_distance(). Throws a ValueError if build_landmarks()
+                hasn't been called.
+        """
+        landmarks = self._current('_landmarks')
+        if landmarks is None:
+            raise ValueError("build_landmarks() must be called before an " \
+                    "'alt' search")
+
+        min_distances = {node_from: 0}
+        node_queue = IndexedPriorityQueue()
+        node_queue.add(node_from, landmarks.lower_bound(node_from, node_to))
+        # The shortest loop back to the origin found so far
+        best_loop = float("inf")
+        while not node_queue.is_empty():
+            estimate, current_node = node_queue.remove()
+            if estimate >= best_loop:
+                break
+            if current_node == node_to and node_to != node_from:
+                return min_distances[current_node]
+            for connected_node, connected_distance in \
+                    self.get(current_node).items():
+                new_distance = min_distances[current_node] + connected_distance
+                if connected_node == node_from:
+                    if node_to == node_from:
+                        best_loop = min(best_loop, new_distance)
+                    continue
+                if new_distance < min_distances.get(connected_node, float("inf")):
+                    remaining = landmarks.lower_bound(connected_node, node_to)
+                    if remaining == float("inf"):
+                        continue
+                    min_distances[connected_node] = new_distance
+                    if node_queue.contains(connected_node):
+                        node_queue.decrease_key(connected_node,
+                                new_distance + remaining)
+                    else:
+                        node_queue.add(connected_node, new_distance + remaining)
+
+        if node_to == node_from:
+            # No route back to the origin - see min_route_distance()
+            return 0 if best_loop == float("inf") else best_loop
+        return float("inf")
+
+    def build_distance_index(self):
+        """
+        Precomputes the minimum distance between every pair of points, so
+            that min_route_distance() becomes a table lookup. Runs
+            _shortest_distances() once from every point, so the origin to
+            origin loop-back rules of min_route_distance() are kept. The index
+            is kept up to date as connections are added afterwards (see
+            add_connection()).
+
+        Returns:
+            DistanceIndex - The index now used by min_route_distance().
+        """
+        vertices = self.get_vertices()
+        distances = array('d')
+        for node_from in vertices:
+            min_distances = self._shortest_distances(node_from)
+            distances.extend(min_distances[node_to] for node_to in vertices)
+        self._distance_index = DistanceIndex(vertices, distances)
+        self._generations['_distance_index'] = self.generation
+        return self._distance_index
+
+    def has_distance_index(self):
+        """
+        Indicates whether or not min_route_distance() is currently answered
+            from a distance index.
+
+        Returns:
+            boolean - True if build_distance_index() has been called since
+                the last connection was added.
+        """
+        return self._current('_distance_index') is not None
+
+    def save(self, path):
+        """
+        Saves the graph, along with its distance index if one has been built,
+            to a binary snapshot that can be read back with StationGraph.load()
+            (see storage.CompactAdjacency.write() for the layout). An
+            existing file is replaced rather than overwritten in place.
+
+        Arguments:
+            path - The path of the file to write.
+        """
+        # Write to a new file and move it into place, so that a graph still
+        # mapped from an earlier snapshot at the same path isn't changed.
+        temporary_path = '{:s}.{:d}.tmp'.format(path, os.getpid())
+        try:
+            with open(temporary_path, 'wb') as graph_file:
+                self._write_snapshot(graph_file)
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def to_bytes(self):
+        """
+        Gives the snapshot written by save() as bytes - e.g. to hand the
+            graph to another process.
+
+        Returns:
+            bytes - The snapshot.
+        """
+        stream = io.BytesIO()
+        self._write_snapshot(stream)
+        return stream.getvalue()
+
+    def _write_snapshot(self, stream):
+        """
+        Writes the graph, along with its distance index if one has been
+            built, to a binary stream as a snapshot.
+
+        Arguments:
+            stream - A binary file-like object to write to.
+        """
+        if self.is_compact():
+            adjacency = self._nodes
+        else:
+            adjacency = CompactAdjacency.from_adjacency(self._nodes)
+        distances = None
+        distance_index = self._current('_distance_index')
+        if distance_index is not None:
+            distances = distance_index.reordered(list(adjacency))
+        adjacency.write(stream, distances)
+
+    @classmethod
+    def load(cls, path, cache_size=128, compact=True):
+        """
+        Reads back a graph saved with save(). The file is memory-mapped and
+            used in place (see from_buffer()).
+
+        Arguments:
+            path - The path of the file to read.
+            cache_size - As for StationGraph().
+            compact - As for from_buffer().
+        Returns:
+            StationGraph - The graph that was saved. Throws a ValueError if
+                the file is not a graph snapshot of a known version.
+        """
+        with open(path, 'rb') as graph_file:
+            try:
+                buffer = mmap.mmap(graph_file.fileno(), 0,
+                        access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file can't be mapped
+                raise ValueError("{:s} is not a graph snapshot".format(path))
+        return cls.from_buffer(buffer, cache_size, compact)
+
+    @classmethod
+    def from_buffer(cls, buffer, cache_size=128, compact=True):
+        """
+        Builds a graph from a snapshot held in a buffer, as written by save()
+            or to_bytes(). The buffer is used in place, so only the station
+            names are read up front - the connections are read as queries
+            use them. If a distance index was saved alongside the graph, it
+            is restored without being recomputed.
+
+        Arguments:
+            buffer - An object supporting the buffer protocol holding the
+                snapshot, e.g. bytes or mmap.mmap.
+            cache_size - As for StationGraph().
+            compact - If True (default), the graph uses the buffer in place
+                and is read-only, as after compact(). If False, the
+                connections are copied out so that more can be added.
+        Returns:
+            StationGraph - The graph. Throws a ValueError if the buffer is
+                not a graph snapshot of a known version.
+        """
+        adjacency, distances = CompactAdjacency.from_buffer(buffer)
+
+        station_graph = cls([], cache_size)
+        if compact:
+            station_graph._nodes = adjacency
+        else:
+            station_graph._nodes = {node: dict(connected_nodes.items())
+                    for node, connected_nodes in adjacency.items()}
+        if distances is not None:
+            station_graph._distance_index = DistanceIndex(list(adjacency),
+                    distances)
+            station_graph._generations['_distance_index'] = \
+                    station_graph.generation
+        return station_graph
+
+    def distance_cache_info(self):
+        """
+        Reports the usage of the cache of minimum distances kept by
+            min_route_distance(), so that its size can be tuned.
+
+        Returns:
+            dict - The hits, misses, current size and maxsize of the cache.
+        """
+        return self._current('_distance_cache').info()
+
+    def _node_queue(self):
+        """
+        Gives an empty priority queue for a Dijkstra search over this graph.
+            When no connection is longer than BUCKET_QUEUE_MAX_WEIGHT, this
+            is a BucketQueue, which finds the next point to settle by
+            stepping through the distances in order rather than by comparing
+            them - O(E + max_weight x V) for the whole search. Otherwise it
+            is an IndexedPriorityQueue.
+
+        Returns:
+            BucketQueue/IndexedPriorityQueue - The queue.
+        """
+        max_weight = self._get_max_weight()
+        if max_weight <= self.BUCKET_QUEUE_MAX_WEIGHT:
+            return BucketQueue(max_weight)
+        return IndexedPriorityQueue()
+
+    def _get_max_weight(self):
+        """
+        Gives the distance of the longest connection in the graph (0 if there
+            are none). Found the first time it is needed, and kept up to date
+            as connections are added from then on.
+
+        Returns:
+            int - The longest distance.
+        """
+        if self._max_weight is None:
+            self._max_weight = max((distance
+                    for connected_nodes in self._nodes.values()
+                    for distance in connected_nodes.values()), default=0)
+        return self._max_weight
+
+    def _shortest_distances(self, node_from, node_to=None):
+        """
+        Gets the minimum distance from one point to every point in the graph,
+            using Dijkstra's algorithm. This version is modified to allow for
+            a route that traverses back to the origin if such a route is
+            possible.
+
+        Arguments:
+            node_from - The origin point of the routes being calculated.
+            node_to - If given, the search stops as soon as the distance to
+                this point is known, and only that distance is guaranteed to
+                be final in the result. Points that can't reach node_to (see
+                _pruning()) are skipped.
+
+        Returns:
+            dict - The minimum distance (value) to each node in the graph
+                (key), as described in min_route_distance(). With node_to,
+                only the points the search reached are given, so that a
+                search that stops early never has to touch the rest of the
+                graph - any other point is at an infinite distance.
+        """
         min_distances = {}
-        node_queue = PriorityQueue()
+        node_queue = self._node_queue()
+        allowed = None
+        if node_to is not None:
+            allowed = self._pruning(node_to)
+            components = self._condensation.components \
+                    if allowed is not None else None
 
         # First, initialize min_distances with assumed min_distances for
         # the time being (i.e. 0 for origin, float("inf") for all possible
-        # destinations
-        for key in self._nodes.keys():
-            if key == node_from:
-                init_minimum = 0
-            else:
-                init_minimum = float("inf")
-            min_distances[key] = init_minimum
-            # Items in the priority queue are tuples, with the min_distance
-            # listed first for sorting, then the key of the final point
-            node_queue.add((init_minimum, key))
+        # destinations - left out when searching for node_to, so the search
+        # costs nothing for the points it never reaches. Only the origin
+        # starts in the queue - every other point is added the first time a
+        # route to it is found.
+        if node_to is None:
+            for key in self._nodes.keys():
+                min_distances[key] = float("inf")
+        min_distances[node_from] = 0
+        node_queue.add(node_from, 0)
 
         while not node_queue.is_empty():
+            # Each point is removed (settled) exactly once - its distance
+            # can't be improved on after this point.
             minimum, current_node = node_queue.remove()
+            # Stop early once the destination is settled. If we're looking
+            # for a route back to the origin, every loop still to be found
+            # would be longer than the one we already have.
+            if node_to is not None:
+                if node_to != node_from and current_node == node_to:
+                    break
+                if node_to == node_from and \
+                        0 < min_distances[node_from] <= minimum:
+                    break
             for connected_node, connected_distance in self.get(current_node).items():
+                if allowed is not None and \
+                        components[connected_node] not in allowed:
+                    continue
                 new_distance = minimum + connected_distance
                 # If the minimum distance from here plus the distance to the
                 # next node is less than the current minimum distance to that
@@ -286,15 +1738,451 @@ class StationGraph:
                 # OR - if the distance is the origin (i.e. min_distance
                 # from origin to connected_node is zero) - this allows us to
                 # loop back to the origin!
-                if new_distance < min_distances[connected_node] or \
-                        min_distances[connected_node] == 0:
+                known_distance = min_distances.get(connected_node,
+                        float("inf"))
+                if new_distance < known_distance or known_distance == 0:
                     min_distances[connected_node] = new_distance
                     # Prevents the origin node from being added back into the
-                    # queue, so we don't re-evaluate the whole graph again
-                    if not connected_node == node_from:
-                        node_queue.add((new_distance, connected_node))
+                    # queue, so we don't re-evaluate the whole graph again.
+                    # Points already waiting in the queue are moved up rather
+                    # than added a second time.
+                    if connected_node == node_from:
+                        continue
+                    if node_queue.contains(connected_node):
+                        node_queue.decrease_key(connected_node, new_distance)
+                    else:
+                        node_queue.add(connected_node, new_distance)
 
         # Now we have a dict of all of the Dijkstra min distances to
-        # those points from the origin -- we want to return the distance
-        # to just one point (the destination)
-        return min_distances[node_to]
+        # those points from the origin
+        return min_distances
+
+    def _repair_distances(self, min_distances, adjacency, origin, node_from,
+            node_to, distance, loops=False):
+        """
+        Repairs the minimum distances from one point, in place, after a
+            connection is added or made shorter. Only routes through that
+            connection can have got shorter, so the search starts from its
+            destination and only carries on through points whose distance it
+            improves, rather than searching the whole graph again.
+
+        Arguments:
+            min_distances - The minimum distance (value) to each point in
+                adjacency (key) from the origin. Anything that can be read
+                and assigned to with [], e.g. a dict.
+            adjacency - The connections followed to find min_distances -
+                _nodes, or _reverse_nodes for the distances TO the origin.
+            origin - The point the distances are from.
+            node_from - The origin of the connection, as it is in adjacency.
+            node_to - The destination of the connection, as it is in
+                adjacency.
+            distance - The new distance of the connection.
+            loops - If True, min_distances follows the rules of
+                _shortest_distances(), i.e. the distance of the origin is the
+                shortest route back to it, or 0 if there is none. If False
+                (default), it is always 0, as for _dijkstra().
+        """
+        infinity = float("inf")
+        if node_from == origin:
+            start = 0
+        else:
+            start = min_distances[node_from]
+        if start == infinity:
+            return
+        # Distances kept in arrays of doubles are whole numbers
+        start = int(start)
+        node_queue = self._node_queue()
+
+        def relax(node, new_distance):
+            current_distance = min_distances[node]
+            if node == origin:
+                # A route back to the origin is never followed any further
+                if loops and (current_distance == 0 or
+                        new_distance < current_distance):
+                    min_distances[node] = new_distance
+            elif new_distance < current_distance:
+                min_distances[node] = new_distance
+                if node_queue.contains(node):
+                    node_queue.decrease_key(node, new_distance)
+                else:
+                    node_queue.add(node, new_distance)
+
+        relax(node_to, start + distance)
+        while not node_queue.is_empty():
+            minimum, current_node = node_queue.remove()
+            for connected_node, connected_distance in \
+                    adjacency[current_node].items():
+                relax(connected_node, minimum + connected_distance)
+
+class Landmarks:
+    """
+    A class representing the landmarks picked by
+        StationGraph.build_landmarks(), along with the minimum distances
+        between each landmark and every point in the graph.
+
+    Public variables are:
+        landmarks - The names of the landmark points, in the order picked.
+
+    Private variables are:
+        _positions - A dict of each point name (key) and its place in the
+            distance arrays (value).
+        _distances_from - A list with one array of doubles per landmark,
+            holding the distance from the landmark to each point.
+        _distances_to - As _distances_from, but holding the distance from
+            each point to the landmark.
+    """
+    def __init__(self, vertices):
+        """
+        Constructor method - returns a set of landmarks with no landmarks.
+
+        Arguments:
+            vertices - The names of all of the points in the graph.
+        """
+        self.landmarks = []
+        self._positions = {node: index for index, node in enumerate(vertices)}
+        self._distances_from = []
+        self._distances_to = []
+
+    @staticmethod
+    def bytes_per_landmark(vertex_count):
+        """
+        Gives the memory taken up by the distances of a single landmark.
+
+        Arguments:
+            vertex_count - The number of points in the graph.
+        Returns:
+            int - The size in bytes.
+        """
+        return 2 * vertex_count * array('d').itemsize
+
+    def nbytes(self):
+        """
+        Gives the memory taken up by the distances of all landmarks.
+
+        Returns:
+            int - The size in bytes.
+        """
+        return len(self.landmarks) * \
+                self.bytes_per_landmark(len(self._positions))
+
+    def add(self, landmark, distances_from, distances_to):
+        """
+        Adds a landmark.
+
+        Arguments:
+            landmark - The name of the landmark point.
+            distances_from - A dict of the distance from the landmark to each
+                point it can reach.
+            distances_to - A dict of the distance to the landmark from each
+                point that can reach it.
+        """
+        infinity = float("inf")
+        row_from = array('d', [infinity]) * len(self._positions)
+        row_to = array('d', [infinity]) * len(self._positions)
+        for node, distance in distances_from.items():
+            row_from[self._positions[node]] = distance
+        for node, distance in distances_to.items():
+            row_to[self._positions[node]] = distance
+        self.landmarks.append(landmark)
+        self._distances_from.append(row_from)
+        self._distances_to.append(row_to)
+
+    def rows(self):
+        """
+        Gives the distances of each landmark, so that they can be updated in
+            place.
+
+        Yields:
+            tuple - (landmark, distances_from, distances_to), where the two
+                distances are RowView objects read and assigned to by point
+                name.
+        """
+        for landmark, row_from, row_to in zip(self.landmarks,
+                self._distances_from, self._distances_to):
+            yield landmark, RowView(row_from, self._positions), \
+                    RowView(row_to, self._positions)
+
+    def lower_bound(self, node_from, node_to):
+        """
+        Gives a lower bound on the distance from one point to another, using
+            the triangle inequality for each landmark L:
+                d(from, to) >= d(L, to) - d(L, from)
+                d(from, to) >= d(from, L) - d(to, L)
+
+        Arguments:
+            node_from - The origin point.
+            node_to - The destination point.
+        Returns:
+            int/float - The best lower bound. float("inf") if a landmark
+                proves the destination can't be reached at all.
+        """
+        infinity = float("inf")
+        position_from = self._positions[node_from]
+        position_to = self._positions[node_to]
+        bound = 0
+        for row_from, row_to in zip(self._distances_from, self._distances_to):
+            landmark_to_target = row_from[position_to]
+            landmark_to_node = row_from[position_from]
+            if landmark_to_node != infinity:
+                # If the landmark reaches this point but not the destination,
+                # neither can this point
+                if landmark_to_target == infinity:
+                    return infinity
+                bound = max(bound, landmark_to_target - landmark_to_node)
+            node_to_landmark = row_to[position_from]
+            target_to_landmark = row_to[position_to]
+            if target_to_landmark != infinity:
+                # If the destination reaches the landmark but this point
+                # doesn't, this point can't reach the destination either
+                if node_to_landmark == infinity:
+                    return infinity
+                bound = max(bound, node_to_landmark - target_to_landmark)
+        return bound
+
+class RowView:
+    """
+    A class giving access to an array of distances by point name, rather than
+        by place in the array.
+
+    Private variables are:
+        _row - The array of distances.
+        _positions - A dict of each point name (key) and its place in the
+            array (value).
+    """
+    def __init__(self, row, positions):
+        """
+        Constructor method.
+
+        Arguments:
+            row - The array of distances.
+            positions - A dict of each point name (key) and its place in the
+                array (value).
+        """
+        self._row = row
+        self._positions = positions
+
+    def __getitem__(self, node):
+        return self._row[self._positions[node]]
+
+    def __setitem__(self, node, distance):
+        self._row[self._positions[node]] = distance
+
+class DistanceIndex:
+    """
+    A class representing the minimum distance between every pair of points
+        in a StationGraph, as built by StationGraph.build_distance_index().
+
+    Public variables are:
+        vertices - The names of the points in the index, in table order.
+
+    Private variables are:
+        _positions - A dict of each vertex name (key) and its place in
+            vertices (value).
+        _distances - A flat array of doubles, holding one row of minimum
+            distances per origin, in the same order as vertices.
+            Unreachable destinations are stored as infinity.
+    """
+    def __init__(self, vertices, distances):
+        """
+        Constructor method.
+
+        Arguments:
+            vertices - The names of the points in the index.
+            distances - The flattened table of minimum distances, row by row.
+                Throws a ValueError if it is not len(vertices) squared long.
+        """
+        if len(distances) != len(vertices) ** 2:
+            raise ValueError("Expected {:d} distances but received " \
+                    "{:d}".format(len(vertices) ** 2, len(distances)))
+        self.vertices = list(vertices)
+        self._positions = {node: index for index, node in enumerate(vertices)}
+        self._distances = distances
+
+    def lookup(self, node_from, node_to):
+        """
+        Gives the minimum distance between two points in the index.
+
+        Arguments:
+            node_from - The origin point of the route.
+            node_to - The destination point of the route.
+        Returns:
+            int/float - The minimum distance, as described in
+                StationGraph.min_route_distance().
+        """
+        distance = self._distances[self._positions[node_from] * \
+                len(self.vertices) + self._positions[node_to]]
+        if distance == float("inf"):
+            return distance
+        return int(distance)
+
+    def relax(self, node_from, node_to, distance):
+        """
+        Updates the index after a connection between two points already in it
+            is added or made shorter. A route can only get shorter by using
+            the connection once, so each minimum distance d(x, y) becomes
+            min(d(x, y), d(x, node_from) + distance + d(node_to, y)). Rows
+            for which the connection doesn't shorten the route to node_to
+            can't change at all, and are skipped.
+
+        Arguments:
+            node_from - The origin of the connection.
+            node_to - The destination of the connection.
+            distance - The new distance of the connection.
+        """
+        infinity = float("inf")
+        if not isinstance(self._distances, array):
+            # A table loaded from a snapshot is read-only
+            self._distances = array('d', self._distances)
+        table = self._distances
+        size = len(self.vertices)
+        start = self._positions[node_from]
+        end = self._positions[node_to]
+        onwards = table[end * size:(end + 1) * size]
+        # The trivial route from node_to to itself, rather than its loop
+        onwards[end] = 0
+        for row in range(size):
+            offset = row * size
+            to_start = 0 if row == start else table[offset + start]
+            if to_start == infinity:
+                continue
+            via = to_start + distance
+            if row == end:
+                # Only the loop back to node_to can change
+                loop = table[offset + end]
+                if loop == 0 or via < loop:
+                    table[offset + end] = via
+                continue
+            if via >= table[offset + end]:
+                continue
+            loop = table[offset + row]
+            table[offset:offset + size] = array('d', [min(current, via + onward)
+                    for current, onward in zip(table[offset:offset + size],
+                    onwards)])
+            if loop == 0 and onwards[row] != infinity:
+                # No loop back to this row's origin was known before
+                table[offset + row] = via + onwards[row]
+
+    def uses_connection(self, node_from, node_to, distance):
+        """
+        Indicates whether or not a connection between two points in the index
+            is on any of its shortest routes, i.e. whether removing it or
+            making it longer could change the index. A tie with another route
+            of the same distance counts as using the connection.
+
+        Arguments:
+            node_from - The origin of the connection.
+            node_to - The destination of the connection.
+            distance - The distance of the connection.
+        Returns:
+            boolean - True if the connection may be on a shortest route.
+        """
+        infinity = float("inf")
+        table = self._distances
+        size = len(self.vertices)
+        start = self._positions[node_from]
+        end = self._positions[node_to]
+        for row in range(size):
+            offset = row * size
+            to_start = 0 if row == start else table[offset + start]
+            if to_start != infinity and \
+                    table[offset + end] == to_start + distance:
+                return True
+        return False
+
+    def reordered(self, vertices):
+        """
+        Gives the table of minimum distances with the rows and columns in
+            another order - e.g. the station IDs of a CompactAdjacency.
+
+        Arguments:
+            vertices - The names of the points in the index, in the order
+                wanted.
+        Returns:
+            array/memoryview - The flattened table, row by row.
+        """
+        if vertices == self.vertices:
+            return self._distances
+        size = len(self.vertices)
+        places = [self._positions[node] for node in vertices]
+        distances = array('d')
+        for node_from in places:
+            row = self._distances[node_from * size:(node_from + 1) * size]
+            distances.extend(row[node_to] for node_to in places)
+        return distances
+
+class TripHistogram:
+    """
+    A class representing the number of trips between two points for every
+        number of moves, or every distance, up to a ceiling. The counts are
+        kept as a running (prefix) total, so the number of trips within any
+        [minimum, maximum] window under the ceiling is found in constant time.
+
+    Public variables are:
+        ceiling - The largest maximum this histogram can answer.
+        is_distance - Whether the counts are by distance (True) or by number
+            of moves (False).
+
+    Private variables are:
+        _prefix_sums - A list where item i is the number of trips made in
+            fewer than i moves (or less than a distance of i).
+    """
+    def __init__(self, counts, ceiling, is_distance):
+        """
+        Constructor method.
+
+        Arguments:
+            counts - A list where item i is the number of trips made in
+                exactly i moves (or a distance of exactly i).
+            ceiling - The largest maximum this histogram can answer.
+            is_distance - Whether the counts are by distance (True) or by
+                number of moves (False).
+        """
+        self.ceiling = ceiling
+        self.is_distance = is_distance
+        self._prefix_sums = [0]
+        for count in counts:
+            self._prefix_sums.append(self._prefix_sums[-1] + count)
+
+    def get_counts(self):
+        """
+        Returns the number of trips for each individual number of moves (or
+            distance), starting at 1.
+
+        Returns:
+            dict - The number of moves/distance (key) and the number of trips
+                made in exactly that many moves, or that exact distance
+                (value).
+        """
+        return {step: self._prefix_sums[step + 1] - self._prefix_sums[step]
+                for step in range(1, len(self._prefix_sums) - 1)}
+
+    def count(self, minimum, maximum):
+        """
+        Gives the number of trips within a window, with the same semantics as
+            StationGraph.num_trips_by_moves() and num_trips_by_distance() -
+            i.e. the maximum is inclusive for moves and exclusive for
+            distance.
+
+        Arguments:
+            minimum - The minimum moves/distance required to be made before
+                trips are counted. Will throw a ValueError if less than zero.
+            maximum - The maximum moves/distance until the number of trips
+                stop being counted. Will throw a ValueError if less than
+                minimum, or greater than the ceiling of the histogram.
+        Returns:
+            int - The number of possible trips given the restrictions.
+        """
+        if maximum < minimum:
+            raise ValueError("maximum ({:d}) is less than " \
+                    "minimum ({:d})".format(maximum, minimum))
+        elif minimum <= 0:
+            raise ValueError("minimum requires a value greater than zero")
+        elif maximum > self.ceiling:
+            raise ValueError("maximum ({:d}) is greater than the histogram " \
+                    "ceiling ({:d})".format(maximum, self.ceiling))
+
+        if self.is_distance:
+            upper = maximum
+        else:
+            upper = maximum + 1
+        return self._prefix_sums[upper] - self._prefix_sums[minimum]
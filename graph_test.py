@@ -1,5 +1,8 @@
+import os
+import tempfile
 import unittest
 from graph import StationGraph
+from queues import BucketQueue, IndexedPriorityQueue
 
 class StationGraphSetupTestCases(unittest.TestCase):
     """
@@ -74,6 +77,153 @@ class StationGraphSetupTestCases(unittest.TestCase):
         self.stations.add_connection('C', 'B', 1)
         self.assertEqual(self.stations.min_route_distance('A', 'B'), 2)
 
+    def test_min_distance_no_loop(self):
+        """
+        Does the method min_route_distance() give 0 for an origin that can't
+            be returned to, even when other (unreachable) nodes connect to it?
+        """
+        self.stations.add_connection('C', 'A', 1)
+        self.stations.add_connection('A', 'B', 1)
+        self.assertEqual(self.stations.min_route_distance('A', 'A'), 0)
+        self.assertEqual(self.stations.min_route_distance('A', 'C'), float("inf"))
+
+    def test_min_distance_cache(self):
+        """
+        Does min_route_distance() reuse the distances found from an origin,
+            repair them when a connection is added or shortened, and forget
+            them when one is lengthened?
+        """
+        self.stations.add_connection('A', 'B', 10)
+        self.stations.add_connection('B', 'C', 1)
+        self.assertEqual(self.stations.min_route_distance('A', 'B'), 10)
+        self.assertEqual(self.stations.min_route_distance('A', 'C'), 11)
+        info = self.stations.distance_cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['size']), (1, 1, 1))
+        self.stations.add_connection('A', 'C', 2)
+        self.stations.add_connection('C', 'D', 1)
+        self.assertEqual(self.stations.distance_cache_info()['size'], 1)
+        self.assertEqual(self.stations.min_route_distance('A', 'C'), 2)
+        self.assertEqual(self.stations.min_route_distance('A', 'D'), 3)
+        self.stations.add_connection('A', 'C', 20)
+        self.assertEqual(self.stations.distance_cache_info()['size'], 0)
+        self.assertEqual(self.stations.min_route_distance('A', 'C'), 11)
+
+    def test_min_distance_cache_bounded(self):
+        """
+        Does the cache used by min_route_distance() stay within its size?
+        """
+        stations = StationGraph(['AB1', 'BC1', 'CA1'], cache_size=2)
+        for node in ['A', 'B', 'C']:
+            stations.min_route_distance(node, 'A')
+        self.assertEqual(stations.distance_cache_info()['size'], 2)
+        self.assertEqual(stations.min_route_distance('A', 'A'), 3)
+
+    def test_add_connections_bulk(self):
+        """
+        Does add_connections() add every connection at once, keeping the last
+            of any repeated connection, and add none of them if one is bad?
+        """
+        self.stations.add_connections([('A', 'B', '5'), ('B', 'C', 4),
+                ('A', 'B', 6)])
+        self.assertEqual(self.stations.get('A'), {'B': 6})
+        self.assertEqual(self.stations.get_vertices(), ['A', 'B', 'C'])
+        with self.assertRaises(ValueError):
+            self.stations.add_connections([('C', 'D', 1), ('D', 'D', 1)])
+        self.assertIsNone(self.stations.get('D'))
+
+    def test_remove_connection(self):
+        """
+        Does remove_connection() remove only the connection, keeping both
+            stations, and throw an error if there is no such connection?
+        """
+        self.stations.add_connections([('A', 'B', 5), ('B', 'C', 4)])
+        self.assertEqual(self.stations.remove_connection('A', 'B'), 5)
+        self.assertFalse(self.stations.are_adjacent('A', 'B'))
+        self.assertEqual(self.stations.get_vertices(), ['A', 'B', 'C'])
+        self.assertEqual(self.stations.min_route_distance('A', 'C'),
+                float("inf"))
+        with self.assertRaises(ValueError):
+            self.stations.remove_connection('A', 'B')
+        with self.assertRaises(ValueError):
+            self.stations.remove_connection('A', 'D')
+
+    def test_update_distance(self):
+        """
+        Does update_distance() change the distance of a connection, and throw
+            an error rather than add one that doesn't exist?
+        """
+        self.stations.add_connections([('A', 'B', 5), ('B', 'C', 4)])
+        self.assertEqual(self.stations.update_distance('A', 'B', 2), 5)
+        self.assertEqual(self.stations.min_route_distance('A', 'C'), 6)
+        with self.assertRaises(ValueError):
+            self.stations.update_distance('A', 'C', 1)
+        with self.assertRaises(ValueError):
+            self.stations.update_distance('A', 'B', 0)
+        self.assertIsNone(self.stations.get('D'))
+
+    def test_generation(self):
+        """
+        Does every change to the connections move the graph on a generation,
+            while a change that changes nothing does not?
+        """
+        self.assertEqual(self.stations.generation, 0)
+        self.stations.add_connections([('A', 'B', 5), ('B', 'C', 4)])
+        self.stations.add_connection('A', 'C', 9)
+        self.stations.add_connection('A', 'C', 9)
+        self.stations.update_distance('A', 'C', 8)
+        self.stations.remove_connection('A', 'C')
+        self.assertEqual(self.stations.generation, 4)
+
+    def test_from_edges(self):
+        """
+        Does from_edges() build the same graph with multi-character station
+            names, with either storage?
+        """
+        edges = [('Union', 'King', '3'), ('King', 'Queen', '2'),
+                ('Queen', 'Union', '4')]
+        for compact in [False, True]:
+            stations = StationGraph.from_edges(edges, compact=compact)
+            self.assertEqual(stations.is_compact(), compact)
+            self.assertEqual(stations.get('King'), {'Queen': 2})
+            self.assertEqual(stations.min_route_distance('Union', 'Queen'), 5)
+        with self.assertRaises(ValueError):
+            StationGraph.from_edges([('A', 'B', 0)], compact=True)
+
+    def test_bucket_queue_chosen_for_small_weights(self):
+        """
+        Do searches use a BucketQueue only while every connection is short
+            enough, giving the same answers either way?
+        """
+        self.stations.add_connections([('A', 'B', 3), ('B', 'C', 4),
+                ('C', 'A', 2), ('A', 'C', 9)])
+        self.assertIsInstance(self.stations._node_queue(), BucketQueue)
+        small = [self.stations.min_route_distance(node_from, node_to, search)
+                for node_from in 'ABC' for node_to in 'ABC'
+                for search in ['early', 'bidirectional']]
+        small_trips = self.stations.num_trips_by_distance('A', 'A', 1, 30)
+
+        self.stations.BUCKET_QUEUE_MAX_WEIGHT = 0
+        self.assertIsInstance(self.stations._node_queue(), IndexedPriorityQueue)
+        self.assertEqual(small, [self.stations.min_route_distance(node_from,
+                node_to, search) for node_from in 'ABC' for node_to in 'ABC'
+                for search in ['early', 'bidirectional']])
+        self.assertEqual(self.stations.num_trips_by_distance('A', 'A', 1, 30),
+                small_trips)
+
+    def test_long_connections(self):
+        """
+        Are trips counted quickly by distance when the connections are long,
+            skipping the distances no trip ends on?
+        """
+        self.stations.add_connections([('A', 'B', 100000), ('B', 'A', 90000),
+                ('B', 'C', 250000), ('C', 'A', 170000)])
+        self.assertEqual(self.stations._get_max_weight(), 250000)
+        self.assertEqual(self.stations.num_trips_by_distance('A', 'A', 1,
+                3000000), 890)
+        trips = self.stations.iter_trips('A', 'A', 1, 3000000, True)
+        self.assertEqual(next(trips), ('A', 'B', 'A'))
+        self.assertEqual(self.stations.min_route_distance('A', 'A'), 190000)
+
 class StationGraphSimpleCalcTestCases(unittest.TestCase):
     """
     Unit testing for simple distance calculation methods of a
@@ -163,6 +313,117 @@ class StationGraphAdvCalcTestCases(unittest.TestCase):
         self.assertEqual(self.stations.num_trips_by_moves('C', 'C', 1, 3), 2)
         self.assertEqual(self.stations.num_trips_by_moves('A', 'C', 4, 4), 3)
 
+    def test_num_trips_by_moves_large_maximum(self):
+        """
+        Will the method num_trips_by_moves() keep returning the same counts
+            as a full enumeration of the trips, including for move limits
+            where listing every trip would be impractical?
+        """
+        self.assertEqual(self.stations.num_trips_by_moves('C', 'C', 1, 10), 51)
+        self.assertEqual(self.stations.num_trips_by_moves('A', 'C', 2, 9), 50)
+        self.assertGreater(self.stations.num_trips_by_moves('A', 'C', 1, 200),
+                10 ** 20)
+
+    def test_num_trips_by_distance_large_maximum(self):
+        """
+        Will the method num_trips_by_distance() keep returning the same counts
+            as a full enumeration of the trips, including for distance limits
+            where listing every trip would be impractical?
+        """
+        self.assertEqual(self.stations.num_trips_by_distance('C', 'C', 1, 60), 91)
+        self.assertEqual(self.stations.num_trips_by_distance('A', 'E', 10, 50), 71)
+        # The maximum is exclusive - C>E>B>C is exactly 9
+        self.assertEqual(self.stations.num_trips_by_distance('C', 'C', 9, 9), 0)
+        self.assertEqual(self.stations.num_trips_by_distance('C', 'C', 9, 10), 1)
+        self.assertGreater(self.stations.num_trips_by_distance('A', 'C', 1, 600),
+                10 ** 20)
+
+    def test_num_trips_from(self):
+        """
+        Will the methods num_trips_from_by_moves() and
+            num_trips_from_by_distance() give the same counts for every
+            destination as asking for each destination in turn?
+        """
+        by_moves = self.stations.num_trips_from_by_moves('A', 1, 6)
+        by_distance = self.stations.num_trips_from_by_distance('A', 1, 30)
+        self.assertEqual(by_moves, {'A': 0, 'B': 12, 'C': 15, 'D': 10, 'E': 17})
+        self.assertEqual(by_distance, {'A': 0, 'B': 11, 'C': 11, 'D': 6, 'E': 15})
+        for node in self.stations.get_vertices():
+            self.assertEqual(by_moves[node],
+                    self.stations.num_trips_by_moves('A', node, 1, 6))
+            self.assertEqual(by_distance[node],
+                    self.stations.num_trips_by_distance('A', node, 1, 30))
+        with self.assertRaises(ValueError):
+            self.stations.num_trips_from_by_moves('X', 1, 6)
+        with self.assertRaises(ValueError):
+            self.stations.num_trips_from_by_distance('A', 0, 30)
+
+    def test_trip_histograms(self):
+        """
+        Will the windows answered by trip_histogram_by_moves() and
+            trip_histogram_by_distance() match num_trips_by_moves() and
+            num_trips_by_distance()?
+        """
+        by_moves = self.stations.trip_histogram_by_moves('C', 'C', 10)
+        by_distance = self.stations.trip_histogram_by_distance('C', 'C', 60)
+        for maximum in range(1, 11):
+            for minimum in range(1, maximum + 1):
+                self.assertEqual(by_moves.count(minimum, maximum),
+                        self.stations.num_trips_by_moves('C', 'C', minimum, maximum))
+        for maximum in range(1, 61, 7):
+            for minimum in range(1, maximum + 1, 3):
+                self.assertEqual(by_distance.count(minimum, maximum),
+                        self.stations.num_trips_by_distance('C', 'C', minimum, maximum))
+        self.assertEqual(sum(by_moves.get_counts().values()), 51)
+        self.assertEqual(by_distance.get_counts()[9], 1)
+
+    def test_trip_histogram_errors(self):
+        """
+        Will trip histograms throw the correct errors?
+        """
+        histogram = self.stations.trip_histogram_by_moves('C', 'C', 5)
+        with self.assertRaises(ValueError):
+            # maximum above the ceiling
+            histogram.count(1, 6)
+        with self.assertRaises(ValueError):
+            # max_moves < min_moves
+            histogram.count(4, 3)
+        with self.assertRaises(ValueError):
+            # min_moves <= 0
+            histogram.count(0, 3)
+        with self.assertRaises(ValueError):
+            # non-existent node
+            self.stations.trip_histogram_by_distance('C', 'X', 30)
+
+    def test_iter_trips(self):
+        """
+        Will the method iter_trips() list every trip num_trips_by_moves()
+            and num_trips_by_distance() count, in order of moves or
+            distance, without listing them all up front?
+        """
+        self.assertEqual(list(self.stations.iter_trips('C', 'C', 1, 3)),
+                [('C', 'D', 'C'), ('C', 'E', 'B', 'C')])
+        self.assertEqual(list(self.stations.iter_trips('C', 'C', 1, 30,
+                True)), [('C', 'E', 'B', 'C'), ('C', 'D', 'C'),
+                ('C', 'E', 'B', 'C', 'E', 'B', 'C'), ('C', 'D', 'E', 'B', 'C'),
+                ('C', 'D', 'C', 'E', 'B', 'C'), ('C', 'E', 'B', 'C', 'D', 'C'),
+                ('C', 'E', 'B', 'C', 'E', 'B', 'C', 'E', 'B', 'C')])
+        trips = list(self.stations.iter_trips('A', 'E', 10, 50, True))
+        self.assertEqual(len(trips), 71)
+        distances = [int(self.stations.get_distance_by_route(list(trip)))
+                for trip in trips]
+        self.assertEqual(distances, sorted(distances))
+        self.assertEqual(len(set(trips)), 71)
+        self.assertEqual(len(list(self.stations.iter_trips('A', 'C', 2, 9))),
+                50)
+        # Far too many trips to list, but the first comes straight away
+        trips = self.stations.iter_trips('A', 'C', 1, 200)
+        self.assertEqual(next(trips), ('A', 'B', 'C'))
+        with self.assertRaises(ValueError):
+            self.stations.iter_trips('A', 'X', 1, 3)
+        with self.assertRaises(ValueError):
+            self.stations.iter_trips('A', 'C', 0, 3)
+
     def test_set_questions_8_through_9(self):
         """
         Runs the next two tests against the data set. (Tests 8-9)
@@ -170,11 +431,344 @@ class StationGraphAdvCalcTestCases(unittest.TestCase):
         self.assertEqual(self.stations.min_route_distance('A', 'C'), 9)
         self.assertEqual(self.stations.min_route_distance('B', 'B'), 9)
 
+    def test_min_distance_search_modes(self):
+        """
+        Does min_route_distance() give the same answers with every search
+            mode, including loops back to the origin, and throw an error for
+            an unknown mode?
+        """
+        vertices = self.stations.get_vertices()
+        for node_from in vertices:
+            for node_to in vertices:
+                expected = self.stations.min_route_distance(node_from, node_to,
+                        search='dijkstra')
+                for search in ['early', 'bidirectional']:
+                    self.assertEqual(self.stations.min_route_distance(
+                            node_from, node_to, search=search), expected)
+        self.assertEqual(self.stations.min_route_distance('B', 'B',
+                search='bidirectional'), 9)
+        self.assertEqual(self.stations.min_route_distance('A', 'A',
+                search='bidirectional'), 0)
+        with self.assertRaises(ValueError):
+            self.stations.min_route_distance('A', 'C', search='sideways')
+
+    def test_min_distance_early_unreached(self):
+        """
+        Does an 'early' search only give the points it reached, and does
+            min_route_distance() still give infinity for a point it never
+            settled - whether unreachable, or cut off by stopping early?
+        """
+        self.stations.add_connection('F', 'G', 1)
+        min_distances = self.stations._shortest_distances('B', 'C')
+        self.assertEqual(min_distances['C'], 4)
+        for node in ['A', 'F', 'G']:
+            self.assertNotIn(node, min_distances)
+        for node_from, node_to in [('B', 'A'), ('B', 'F'), ('A', 'G'),
+                ('G', 'F'), ('E', 'A')]:
+            self.assertEqual(self.stations.min_route_distance(node_from,
+                    node_to, search='early'), float("inf"))
+        self.assertEqual(self.stations.min_route_distance('F', 'G',
+                search='early'), 1)
+        self.assertEqual(self.stations.min_route_distance('A', 'E',
+                search='early'), 7)
+        self.assertEqual(self.stations.min_route_distance('G', 'G',
+                search='early'), 0)
+
+    def test_min_distance_bidirectional_after_add(self):
+        """
+        Does a bidirectional search see connections added after its first
+            use?
+        """
+        self.assertEqual(self.stations.min_route_distance('B', 'A',
+                search='bidirectional'), float("inf"))
+        self.stations.add_connection('E', 'A', 1)
+        self.assertEqual(self.stations.min_route_distance('B', 'A',
+                search='bidirectional'), 7)
+
+    def test_min_distance_landmarks(self):
+        """
+        Once build_landmarks() is called, does the 'alt' search give the same
+            answers as Dijkstra?
+        """
+        with self.assertRaises(ValueError):
+            self.stations.min_route_distance('A', 'C', search='alt')
+        landmarks = self.stations.build_landmarks(2)
+        self.assertEqual(len(landmarks.landmarks), 2)
+        self.assertEqual(landmarks.nbytes(), 2 * 2 * 5 * 8)
+        vertices = self.stations.get_vertices()
+        for node_from in vertices:
+            for node_to in vertices:
+                self.assertEqual(self.stations.min_route_distance(node_from,
+                        node_to, search='alt'),
+                        self.stations.min_route_distance(node_from, node_to,
+                        search='dijkstra'))
+        self.assertEqual(self.stations.min_route_distance('C', 'C'), 9)
+
+    def test_min_distance_hierarchy(self):
+        """
+        Once build_hierarchy() is called, does the 'hierarchy' search give
+            the same answers as Dijkstra, and is the hierarchy dropped when a
+            connection is added?
+        """
+        with self.assertRaises(ValueError):
+            self.stations.min_route_distance('A', 'C', search='hierarchy')
+        self.stations.build_hierarchy()
+        vertices = self.stations.get_vertices()
+        for node_from in vertices:
+            for node_to in vertices:
+                self.assertEqual(self.stations.min_route_distance(node_from,
+                        node_to, search='hierarchy'),
+                        self.stations.min_route_distance(node_from, node_to,
+                        search='dijkstra'))
+        self.stations.add_connection('B', 'A', 1)
+        with self.assertRaises(ValueError):
+            self.stations.min_route_distance('A', 'C', search='hierarchy')
+
+    def test_landmarks_memory_budget(self):
+        """
+        Does build_landmarks() pick fewer landmarks to fit a memory budget,
+            throw an error when none fit (but pick none for an empty graph),
+            and drop the landmarks when a station is added?
+        """
+        landmarks = self.stations.build_landmarks(4, memory_budget=200)
+        self.assertEqual(len(landmarks.landmarks), 2)
+        landmarks = StationGraph([]).build_landmarks(2, memory_budget=100)
+        self.assertEqual(len(landmarks.landmarks), 0)
+        with self.assertRaises(ValueError):
+            self.stations.build_landmarks(4, memory_budget=10)
+        with self.assertRaises(ValueError):
+            self.stations.build_landmarks(0)
+        self.stations.add_connection('B', 'F', 1)
+        with self.assertRaises(ValueError):
+            self.stations.min_route_distance('A', 'C', search='alt')
+
+    def test_distance_index(self):
+        """
+        Once build_distance_index() is called, does min_route_distance() give
+            the same answers as before, including loops back to the origin,
+            and is the index repaired when a connection is added, but dropped
+            when a station is?
+        """
+        vertices = self.stations.get_vertices()
+        expected = {(node_from, node_to):
+                self.stations.min_route_distance(node_from, node_to)
+                for node_from in vertices for node_to in vertices}
+        self.stations.build_distance_index()
+        self.assertTrue(self.stations.has_distance_index())
+        for (node_from, node_to), distance in expected.items():
+            self.assertEqual(self.stations.min_route_distance(node_from, node_to),
+                    distance)
+        self.assertEqual(self.stations.min_route_distance('A', 'A'), 0)
+        self.assertEqual(self.stations.min_route_distance('B', 'A'), float("inf"))
+        self.stations.add_connection('B', 'A', 1)
+        self.assertTrue(self.stations.has_distance_index())
+        self.assertEqual(self.stations.min_route_distance('B', 'A'), 1)
+        self.assertEqual(self.stations.min_route_distance('A', 'A'), 6)
+        self.stations.add_connection('F', 'A', 1)
+        self.assertFalse(self.stations.has_distance_index())
+        self.assertEqual(self.stations.min_route_distance('F', 'A'), 1)
+
+    def test_repair_after_add(self):
+        """
+        After connections are added or shortened, do the repaired cache,
+            distance index and landmarks give the same answers as a graph
+            built with those connections from the start?
+        """
+        indexed = StationGraph(['AB5', 'BC4', 'CD8', 'DC8', 'DE6', 'AD5',
+                'CE2', 'EB3', 'AE7'])
+        indexed.build_distance_index()
+        vertices = self.stations.get_vertices()
+        self.stations.build_landmarks(2)
+        for node_from in vertices:
+            self.stations.min_route_distance(node_from, 'A',
+                    search='dijkstra')
+        connections = ['BA3', 'DC1', 'ED2', 'CA9', 'EA1']
+        for connection in connections:
+            self.stations.add_connection(*connection)
+            indexed.add_connection(*connection)
+        expected = StationGraph(['AB5', 'BC4', 'CD8', 'DC8', 'DE6', 'AD5',
+                'CE2', 'EB3', 'AE7'] + connections)
+        for node_from in vertices:
+            for node_to in vertices:
+                distance = expected.min_route_distance(node_from, node_to)
+                self.assertEqual(self.stations.min_route_distance(node_from,
+                        node_to), distance)
+                self.assertEqual(self.stations.min_route_distance(node_from,
+                        node_to, search='alt'), distance)
+                self.assertEqual(indexed.min_route_distance(node_from,
+                        node_to), distance)
+        self.assertEqual(self.stations.distance_cache_info()['size'], 5)
+
+    def test_reachability(self):
+        """
+        Once build_reachability() is called, do can_reach() and the query
+            methods give the same answers for points with no route between
+            them, and is the index kept up to date as connections change?
+        """
+        vertices = self.stations.get_vertices()
+        expected = {(node_from, node_to):
+                self.stations.can_reach(node_from, node_to)
+                for node_from in vertices for node_to in vertices}
+        self.assertFalse(expected['B', 'A'])
+        self.assertTrue(expected['C', 'C'])
+        self.stations.build_reachability()
+        for (node_from, node_to), reachable in expected.items():
+            self.assertEqual(self.stations.can_reach(node_from, node_to),
+                    reachable)
+        self.assertEqual(self.stations.min_route_distance('B', 'A',
+                search='bidirectional'), float("inf"))
+        self.assertEqual(self.stations.min_route_distance('A', 'A'), 0)
+        self.assertEqual(self.stations.num_trips_by_moves('C', 'A', 1, 10), 0)
+        self.assertEqual(self.stations.trip_histogram_by_distance('E', 'A',
+                30).get_counts()[20], 0)
+        with self.assertRaises(ValueError):
+            self.stations.can_reach('A', 'F')
+
+        self.stations.add_connection('D', 'F', 2)
+        self.assertTrue(self.stations.can_reach('A', 'F'))
+        # Answered from the index alone, without the condensation dropped by
+        # the new connection being built again
+        self.assertEqual(self.stations.num_trips_by_moves('F', 'A', 1, 10), 0)
+        self.assertEqual(self.stations.trip_histogram_by_moves('F', 'A',
+                10).get_counts()[5], 0)
+        self.assertIsNone(self.stations._current('_condensation'))
+        self.stations.update_distance('D', 'F', 3)
+        self.stations.add_connection('E', 'A', 1)
+        self.assertTrue(self.stations.can_reach('B', 'A'))
+        self.assertEqual(self.stations.min_route_distance('B', 'A'), 7)
+        self.stations.remove_connection('E', 'A')
+        self.assertFalse(self.stations.can_reach('B', 'A'))
+
+    def test_condensation_only_used_once_built(self):
+        """
+        Do trip counts and searches leave the condensation unbuilt, and give
+            the same answers once it has been built for them to prune with?
+        """
+        self.stations.add_connection('E', 'F', 1)
+        queries = [
+            lambda: self.stations.num_trips_by_moves('A', 'C', 1, 6),
+            lambda: self.stations.trip_histogram_by_distance('A', 'C',
+                    30).get_counts(),
+            lambda: list(self.stations.iter_trips('A', 'C', 1, 20, True)),
+            lambda: self.stations.min_route_distance('A', 'C', 'early'),
+            lambda: self.stations.min_route_distance('B', 'F',
+                    'bidirectional'),
+        ]
+        expected = [query() for query in queries]
+        self.assertIsNone(self.stations._current('_condensation'))
+        self.stations.condensation()
+        self.assertEqual([query() for query in queries], expected)
+
+    def test_derived_kept_after_unused_change(self):
+        """
+        When a connection is removed or made longer, are the cached origins
+            and the distance index kept if none of their shortest routes used
+            it, and dropped if any did?
+        """
+        self.stations.add_connection('A', 'C', 20)
+        self.stations.build_distance_index()
+        self.stations.update_distance('A', 'C', 30)
+        self.assertTrue(self.stations.has_distance_index())
+        self.assertEqual(self.stations.min_route_distance('A', 'C'), 9)
+
+        self.stations.remove_connection('A', 'C')
+        for node_from in ['A', 'C']:
+            self.stations.min_route_distance(node_from, 'E', search='dijkstra')
+        self.stations.remove_connection('A', 'E')
+        self.assertFalse(self.stations.has_distance_index())
+        self.assertEqual(self.stations.distance_cache_info()['size'], 1)
+        self.assertEqual(self.stations.min_route_distance('C', 'C'), 9)
+        self.assertEqual(self.stations.min_route_distance('A', 'E'), 11)
+
+    def test_save_and_load(self):
+        """
+        Does a graph saved with save() load back with the same connections,
+            along with its distance index?
+        """
+        self.stations.build_distance_index()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.snapshot')
+            self.stations.save(path)
+            loaded = StationGraph.load(path)
+            copied = StationGraph.load(path, compact=False)
+            self.stations.save(path)
+            other_path = os.path.join(directory, 'graph.json')
+            for content in ['', '{"version": 1}']:
+                with open(other_path, 'w') as graph_file:
+                    graph_file.write(content)
+                with self.assertRaises(ValueError):
+                    StationGraph.load(other_path)
+        self.assertTrue(loaded.is_compact())
+        self.assertTrue(loaded.has_distance_index())
+        for node in self.stations.get_vertices():
+            self.assertEqual(loaded.get(node), self.stations.get(node))
+        self.assertEqual(loaded.min_route_distance('B', 'B'), 9)
+        self.assertEqual(loaded.min_route_distance('B', 'A'), float("inf"))
+        self.assertEqual(loaded.num_trips_by_distance('C', 'C', 1, 30), 7)
+        self.assertFalse(copied.is_compact())
+        copied.add_connection('B', 'A', 1)
+        self.assertEqual(copied.min_route_distance('B', 'A'), 1)
+
     def test_set_question_10(self):
         """
         Runs the final test against the data set. (Test 10)
         """
         self.assertEqual(self.stations.num_trips_by_distance('C', 'C', 1, 30), 7)
 
+class StationGraphCompactTestCases(unittest.TestCase):
+    """
+    Unit testing for a StationGraph object using compact storage.
+    """
+    def setUp(self):
+        test_input = ['AB5', 'BC4', 'CD8', 'DC8', 'DE6', 'AD5', 'CE2', 'EB3', 'AE7']
+        self.stations = StationGraph(test_input)
+        self.stations.compact()
+
+    def test_is_compact(self):
+        """
+        Does the graph report compact storage, and refuse new connections?
+        """
+        self.assertTrue(self.stations.is_compact())
+        self.assertFalse(StationGraph(['AB1']).is_compact())
+        with self.assertRaises(TypeError):
+            self.stations.add_connection('B', 'A', 1)
+
+    def test_simple_calc(self):
+        """
+        Do the simple methods work the same on a compact graph?
+        """
+        self.assertEqual(self.stations.get_vertices(), ['A', 'B', 'C', 'D', 'E'])
+        self.assertEqual(self.stations.get('A'), {'B': 5, 'D': 5, 'E': 7})
+        self.assertIsNone(self.stations.get('X'))
+        self.assertTrue(self.stations.are_adjacent('A', 'B'))
+        self.assertFalse(self.stations.are_adjacent('B', 'A'))
+        self.assertEqual(self.stations.get_distance_by_route(['A', 'E', 'B', 'C', 'D']), '22')
+        self.assertEqual(self.stations.get_distance_by_route(['A', 'E', 'D']), 'NO SUCH ROUTE')
+
+    def test_advanced_calc(self):
+        """
+        Do the trip counting and search methods work the same on a compact
+            graph?
+        """
+        self.assertEqual(self.stations.num_trips_by_moves('C', 'C', 1, 3), 2)
+        self.assertEqual(self.stations.num_trips_by_moves('A', 'C', 4, 4), 3)
+        self.assertEqual(self.stations.num_trips_by_distance('C', 'C', 1, 30), 7)
+        for search in ['dijkstra', 'early', 'bidirectional']:
+            self.assertEqual(self.stations.min_route_distance('A', 'C',
+                    search=search), 9)
+            self.assertEqual(self.stations.min_route_distance('B', 'B',
+                    search=search), 9)
+
+    def test_multi_character_names(self):
+        """
+        Can a compact graph hold stations with longer names?
+        """
+        stations = StationGraph([])
+        stations.add_connection('Union', 'King', 2)
+        stations.add_connection('King', 'Union', 3)
+        stations.compact()
+        self.assertEqual(stations.min_route_distance('Union', 'Union'), 5)
+        self.assertEqual(stations.get_distance_by_route(['King', 'Union']), '3')
+
 if __name__ == '__main__':
     unittest.main()
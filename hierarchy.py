@@ -0,0 +1,319 @@
+import time
+from queues import IndexedPriorityQueue, PriorityQueue
+
+class ContractionHierarchy:
+    """
+    A class representing a contraction hierarchy built over a directed graph,
+        used to answer minimum distance queries with two very small searches.
+
+    The points of the graph are ranked, then removed (contracted) one at a
+        time, lowest rank first. Whenever removing a point would lengthen the
+        minimum distance between two of its remaining neighbours, a shortcut
+        connection is added between them. A minimum distance query then only
+        ever has to follow connections towards higher-ranked points - forwards
+        from the origin and backwards from the destination - and the two
+        searches meet at the highest point of the route.
+
+    Public variables are:
+        rank - A dict of each point (key) and its place in the contraction
+            order (value).
+        shortcut_count - The number of shortcut connections added.
+        preprocessing_time - The time taken to build the hierarchy, in
+            seconds.
+
+    Private variables are:
+        _out, _in - The connections from (and to) each point that has not
+            been contracted yet, shortcuts included. Only used while building.
+        _contracted_neighbours - The number of neighbours of each point that
+            have been contracted so far. Only used while building.
+        _shortcut_counts - The number of shortcuts contracting each point
+            would have added, when it was last checked. Only used while
+            building.
+        _up_forward - A dict of each point (key) and the connections from it
+            to higher-ranked points, with their distances (value).
+        _up_backward - A dict of each point (key) and the connections to it
+            from higher-ranked points, with their distances (value).
+        _in_edges - The original connections to each point, used to find
+            routes from a point back to itself.
+    """
+    # The most points a witness search settles before giving up. A witness
+    # missed because of it only costs an unneeded shortcut, never a wrong
+    # distance, and keeps each search - and so building the hierarchy -
+    # from growing with the size of the graph.
+    WITNESS_SETTLED_LIMIT = 40
+
+    def __init__(self, adjacency):
+        """
+        Builds the hierarchy for a graph.
+
+        Arguments:
+            adjacency - A dict of each point (key) and a dict of the points it
+                connects to, with the distance of each connection (value) -
+                e.g. StationGraph._nodes.
+        """
+        started = time.perf_counter()
+        self.rank = {}
+        self.shortcut_count = 0
+        self._out = {node: dict(connected_nodes)
+                for node, connected_nodes in adjacency.items()}
+        self._in = {node: {} for node in adjacency}
+        for node_from, connected_nodes in adjacency.items():
+            for node_to, distance in connected_nodes.items():
+                self._in[node_to][node_from] = distance
+        self._in_edges = {node: dict(connected_nodes)
+                for node, connected_nodes in self._in.items()}
+        self._contracted_neighbours = dict.fromkeys(adjacency, 0)
+        self._shortcut_counts = {}
+        self._up_forward = {}
+        self._up_backward = {}
+
+        # Points are contracted in order of their priority. Contracting a
+        # point only changes the priorities of its neighbours, and they are
+        # moved up if their priority - estimated from their new connections
+        # and the shortcuts they last needed, without a witness search -
+        # dropped. The full priority is only worked out when a point reaches
+        # the front of the queue: if it is no longer the lowest, it goes
+        # back in with its new priority. Otherwise, the shortcuts found for
+        # that check are the ones added.
+        node_queue = IndexedPriorityQueue()
+        for node in adjacency:
+            node_queue.add(node, self._priority(node, self._shortcuts(node)))
+        while not node_queue.is_empty():
+            priority, node = node_queue.remove()
+            shortcuts = self._shortcuts(node)
+            priority = self._priority(node, shortcuts)
+            if not node_queue.is_empty() and priority > node_queue.peek()[0]:
+                node_queue.add(node, priority)
+                continue
+            neighbours = set(self._out[node]) | set(self._in[node])
+            self._contract(node, shortcuts)
+            for neighbour in neighbours:
+                priority = self._estimated_priority(neighbour)
+                if priority < node_queue.get_priority(neighbour):
+                    node_queue.decrease_key(neighbour, priority)
+
+        del self._out, self._in, self._contracted_neighbours, \
+                self._shortcut_counts
+        self.preprocessing_time = time.perf_counter() - started
+
+    def distance(self, node_from, node_to):
+        """
+        Gets the minimum distance between two points, following the rules of
+            StationGraph.min_route_distance(). A route from a point back to
+            itself is found by starting the backward search from every point
+            connecting to it at once, each at the distance of its connection,
+            so that every route found ends with one of those connections.
+
+        Arguments:
+            node_from - The origin point of the route.
+            node_to - The destination point of the route.
+
+        Returns:
+            int/float - The minimum distance. If the route is origin to origin
+                and no route leads back, 0. If the destination can't be
+                reached, float("inf").
+        """
+        if node_from == node_to:
+            backward_start = self._in_edges[node_to]
+        else:
+            backward_start = {node_to: 0}
+        forward_distances = self._upward_search(self._up_forward,
+                self._up_backward, {node_from: 0})[0]
+        best_distance = self._upward_search(self._up_backward,
+                self._up_forward, backward_start, forward_distances)[1]
+        if node_from == node_to and best_distance == float("inf"):
+            return 0
+        return best_distance
+
+    def _upward_search(self, adjacency, downward, start_distances,
+            other_distances=None):
+        """
+        Runs Dijkstra's algorithm over the connections towards higher-ranked
+            points only. A point is stalled - its connections aren't followed
+            - if a higher-ranked point already reached leads down to it by a
+            shorter route, as then no shortest route goes up through it.
+            This keeps the search to a fraction of the points it would reach
+            otherwise.
+
+        Arguments:
+            adjacency - Either _up_forward or _up_backward.
+            downward - The other of the two, i.e. the connections into each
+                point from higher-ranked points, in the search's direction.
+            start_distances - A dict of the points to start from (key), and
+                the distance to start each of them at (value).
+            other_distances - If given, the result of the search in the
+                other direction. The routes through each point both searches
+                reach are measured as this search goes, and it stops once
+                no shorter route can be found.
+
+        Returns:
+            tuple - (min_distances, best_distance). min_distances is a dict
+                of the distance (value) to each point reached (key). It is
+                the minimum for every point a shortest route goes up
+                through, and the length of some longer route for the rest.
+                best_distance is the shortest route found through a point
+                in other_distances (float("inf") if none, or without
+                other_distances).
+        """
+        min_distances = dict(start_distances)
+        best_distance = float("inf")
+        settled = set()
+        node_queue = PriorityQueue.from_iterable((distance, node)
+                for node, distance in start_distances.items())
+        while not node_queue.is_empty():
+            minimum, current_node = node_queue.remove()
+            if current_node in settled:
+                continue
+            if minimum >= best_distance:
+                break
+            settled.add(current_node)
+            if other_distances is not None and \
+                    current_node in other_distances:
+                best_distance = min(best_distance,
+                        minimum + other_distances[current_node])
+            stalled = False
+            for higher_node, higher_distance in downward[current_node].items():
+                if min_distances.get(higher_node, minimum) + higher_distance \
+                        < minimum:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            for connected_node, connected_distance in \
+                    adjacency[current_node].items():
+                new_distance = minimum + connected_distance
+                if new_distance < min_distances.get(connected_node, float("inf")):
+                    min_distances[connected_node] = new_distance
+                    node_queue.add((new_distance, connected_node))
+        return min_distances, best_distance
+
+    def _priority(self, node, shortcuts):
+        """
+        Gives the contraction priority of a point - the number of shortcuts
+            contracting it would add, less the connections it would remove,
+            plus the number of its neighbours already contracted (so that
+            contractions are spread evenly over the graph). Lower goes first.
+
+        Arguments:
+            node - The point to score.
+            shortcuts - The shortcuts contracting it would add, as given by
+                _shortcuts().
+        Returns:
+            int - The priority of the point.
+        """
+        self._shortcut_counts[node] = len(shortcuts)
+        return self._estimated_priority(node)
+
+    def _estimated_priority(self, node):
+        """
+        Gives the contraction priority of a point as _priority() does, but
+            with the number of shortcuts it needed when last checked, so
+            that no witness searches are run.
+
+        Arguments:
+            node - The point to score.
+        Returns:
+            int - The estimated priority of the point.
+        """
+        return self._shortcut_counts[node] - len(self._in[node]) - \
+                len(self._out[node]) + self._contracted_neighbours[node]
+
+    def _shortcuts(self, node):
+        """
+        Finds the shortcuts needed to contract a point - i.e. every pair of
+            its remaining neighbours u and x where the route u>node>x is
+            shorter than any route from u to x that avoids node (a "witness").
+
+        Arguments:
+            node - The point to be contracted.
+        Returns:
+            list - (u, x, distance) for each shortcut needed.
+        """
+        shortcuts = []
+        for node_from, distance_in in self._in[node].items():
+            via_distances = {node_to: distance_in + distance_out
+                    for node_to, distance_out in self._out[node].items()
+                    if node_to != node_from}
+            if not via_distances:
+                continue
+            witness_distances = self._witness_search(node_from, node,
+                    max(via_distances.values()), via_distances)
+            for node_to, via_distance in via_distances.items():
+                if witness_distances.get(node_to, float("inf")) > via_distance:
+                    shortcuts.append((node_from, node_to, via_distance))
+        return shortcuts
+
+    def _witness_search(self, node_from, excluded, limit, targets):
+        """
+        Runs Dijkstra's algorithm over the points not yet contracted, without
+            passing through one point, until every target is settled, the
+            distance limit is passed or WITNESS_SETTLED_LIMIT points have
+            been settled.
+
+        Arguments:
+            node_from - The origin point of the search.
+            excluded - The point the search may not pass through.
+            limit - The distance after which the search stops.
+            targets - The points whose distances are wanted.
+        Returns:
+            dict - The minimum distance (value) to each point reached (key).
+                Distances to points that weren't settled may be too long,
+                but never too short.
+        """
+        # These searches are small and run many times, so a plain heap is
+        # used - a point improved on is added again, and the older entry is
+        # skipped once it comes off the queue.
+        min_distances = {node_from: 0}
+        settled = set()
+        node_queue = PriorityQueue()
+        node_queue.add((0, node_from))
+        targets_left = len(targets)
+        while not node_queue.is_empty():
+            minimum, current_node = node_queue.remove()
+            if current_node in settled:
+                continue
+            if minimum > limit or \
+                    len(settled) == self.WITNESS_SETTLED_LIMIT:
+                break
+            settled.add(current_node)
+            if current_node in targets:
+                targets_left -= 1
+                if targets_left == 0:
+                    break
+            for connected_node, connected_distance in \
+                    self._out[current_node].items():
+                if connected_node == excluded:
+                    continue
+                new_distance = minimum + connected_distance
+                if new_distance < min_distances.get(connected_node, float("inf")):
+                    min_distances[connected_node] = new_distance
+                    node_queue.add((new_distance, connected_node))
+        return min_distances
+
+    def _contract(self, node, shortcuts):
+        """
+        Contracts a point - records its connections to the remaining
+            (higher-ranked) points, removes it from the graph, and adds any
+            shortcuts needed to keep the minimum distances between the
+            remaining points.
+
+        Arguments:
+            node - The point to contract.
+            shortcuts - The shortcuts needed, as given by _shortcuts() for
+                the graph as it is now.
+        """
+        self.rank[node] = len(self.rank)
+        self._up_forward[node] = self._out.pop(node)
+        self._up_backward[node] = self._in.pop(node)
+        for node_to in self._up_forward[node]:
+            del self._in[node_to][node]
+            self._contracted_neighbours[node_to] += 1
+        for node_from in self._up_backward[node]:
+            del self._out[node_from][node]
+            self._contracted_neighbours[node_from] += 1
+
+        for node_from, node_to, distance in shortcuts:
+            if distance < self._out[node_from].get(node_to, float("inf")):
+                self._out[node_from][node_to] = distance
+                self._in[node_to][node_from] = distance
+                self.shortcut_count += 1
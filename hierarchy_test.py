@@ -0,0 +1,92 @@
+import random
+import unittest
+from graph import StationGraph
+from hierarchy import ContractionHierarchy
+
+class ContractionHierarchyUnitTests(unittest.TestCase):
+    """
+    Unit testing for a ContractionHierarchy object.
+    """
+    def setUp(self):
+        # A-B-C-D in a line both ways, with a slow direct A>D connection and a
+        # dead end at E
+        self.adjacency = {
+            'A': {'B': 1, 'D': 10},
+            'B': {'A': 1, 'C': 1},
+            'C': {'B': 1, 'D': 1, 'E': 4},
+            'D': {'C': 1},
+            'E': {},
+        }
+        self.hierarchy = ContractionHierarchy(self.adjacency)
+
+    def test_every_point_ranked(self):
+        """
+        Is every point given a distinct rank?
+        """
+        self.assertEqual(sorted(self.hierarchy.rank.values()), list(range(5)))
+
+    def test_preprocessing_reported(self):
+        """
+        Are the number of shortcuts and the preprocessing time reported?
+        """
+        self.assertGreaterEqual(self.hierarchy.shortcut_count, 0)
+        self.assertGreaterEqual(self.hierarchy.preprocessing_time, 0)
+
+    def test_distances(self):
+        """
+        Does the hierarchy give the minimum distance between two points,
+            including through shortcuts and to unreachable points?
+        """
+        self.assertEqual(self.hierarchy.distance('A', 'D'), 3)
+        self.assertEqual(self.hierarchy.distance('D', 'A'), 3)
+        self.assertEqual(self.hierarchy.distance('A', 'E'), 6)
+        self.assertEqual(self.hierarchy.distance('E', 'A'), float("inf"))
+
+    def test_distances_back_to_origin(self):
+        """
+        Does the hierarchy give the shortest route from a point back to
+            itself, or 0 if there is none?
+        """
+        self.assertEqual(self.hierarchy.distance('A', 'A'), 2)
+        self.assertEqual(self.hierarchy.distance('D', 'D'), 2)
+        self.assertEqual(self.hierarchy.distance('E', 'E'), 0)
+
+class ContractionHierarchyScaleTests(unittest.TestCase):
+    """
+    Testing a ContractionHierarchy over a larger graph.
+    """
+    def test_grid(self):
+        """
+        Over a 20x20 grid of two-way connections of random distances, does
+            the hierarchy keep to a modest number of shortcuts, and give the
+            same distances as Dijkstra's algorithm?
+        """
+        generator = random.Random(0)
+        stations = StationGraph([])
+        size = 20
+        for row in range(size):
+            for column in range(size):
+                for next_row, next_column in [(row + 1, column),
+                        (row, column + 1)]:
+                    if next_row < size and next_column < size:
+                        node = 'S{:d}_{:d}'.format(row, column)
+                        next_node = 'S{:d}_{:d}'.format(next_row, next_column)
+                        stations.add_connection(node, next_node,
+                                generator.randint(1, 9))
+                        stations.add_connection(next_node, node,
+                                generator.randint(1, 9))
+        hierarchy = stations.build_hierarchy()
+        connection_count = sum(len(stations.get(node))
+                for node in stations.get_vertices())
+        self.assertLess(hierarchy.shortcut_count, 2 * connection_count)
+        vertices = stations.get_vertices()
+        for _ in range(50):
+            node_from = generator.choice(vertices)
+            node_to = generator.choice(vertices)
+            self.assertEqual(stations.min_route_distance(node_from,
+                    node_to, search='hierarchy'),
+                    stations.min_route_distance(node_from, node_to,
+                    search='dijkstra'))
+
+if __name__ == '__main__':
+    unittest.main()
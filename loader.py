@@ -0,0 +1,128 @@
+import csv
+import re
+
+# The delimiters read_connections() accepts, by format name
+FORMATS = {'auto': None, 'list': None, 'csv': ',', 'tsv': '\t'}
+
+def split_connection(connection):
+    """
+    Splits a connection in the short form used by the -l argument (two
+        one-character station names and a distance - e.g. 'AB2') into its
+        parts.
+
+    Arguments:
+        connection - The connection to split. Throws a ValueError if it has
+            fewer than 3 characters.
+    Returns:
+        tuple - (node_from, node_to, distance), with the distance still as
+            a string.
+    """
+    if len(connection) < 3:
+        raise ValueError("Expected a connection list item with a " \
+                "length of 3 or more but got a length of {:d} "\
+                "instead.".format(len(connection)))
+    return connection[0], connection[1], connection[2:]
+
+def read_connections(lines, file_format='auto'):
+    """
+    Reads connections from a stream of lines, one line at a time, so that
+        large edge lists never have to be held in memory (or on the command
+        line) all at once. Blank lines and lines starting with '#' are
+        skipped. Two kinds of line are understood:
+            CSV/TSV rows - 'FROM,TO,DISTANCE' or 'FROM<tab>TO<tab>DISTANCE',
+                where station names can be any length, and can be quoted
+                to hold the delimiter - e.g. '"Union, North",King,3'. Each
+                row is a line of its own. If the first row's DISTANCE is not
+                a number, the row is taken as a header and skipped.
+            Short form - one or more connections like 'AB2', as for the -l
+                argument, separated by commas and/or whitespace.
+
+    Arguments:
+        lines - An iterable of lines, e.g. an open file or sys.stdin.
+        file_format - One of FORMATS: 'csv' or 'tsv' to read every line as
+            a row, 'list' to read every line as short-form connections, or
+            'auto' (default) to decide line by line. Throws a ValueError for
+            any other value.
+    Yields:
+        tuple - (node_from, node_to, distance) for each connection, with the
+            distance still as a string. Connections are not validated here -
+            see StationGraph.from_edges().
+    """
+    if file_format not in FORMATS:
+        raise ValueError("Unknown edge list format: {!r}".format(file_format))
+    first_row = True
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        delimiter = FORMATS[file_format]
+        if file_format == 'auto':
+            delimiter = _guess_delimiter(line)
+        if delimiter is None:
+            for connection in re.split(r'[,\s]+', line):
+                yield split_connection(connection)
+            first_row = False
+            continue
+
+        fields = _split_row(line, delimiter)
+        if len(fields) != 3:
+            raise ValueError("Expected 3 fields on line {:d} but got " \
+                    "{:d}".format(line_number, len(fields)))
+        if first_row and not _is_integer(fields[2]) and \
+                not fields[2][-1:].isdigit():
+            # A header row
+            first_row = False
+            continue
+        first_row = False
+        yield fields[0], fields[1], fields[2]
+
+def _guess_delimiter(line):
+    """
+    Guesses whether a line is a TSV row, a CSV row or short-form connections.
+
+    Arguments:
+        line - The line, with surrounding whitespace removed.
+    Returns:
+        string - '\t' or ',' for a row, None for short-form connections.
+    """
+    # A row has exactly three fields, the last a distance (or a header).
+    # 'AB5,BC4,CD6' (or with tabs) is three short-form connections instead.
+    if '\t' in line and _is_row(_split_row(line, '\t')):
+        return '\t'
+    # Short-form connections are never quoted
+    if '"' in line or _is_row(_split_row(line, ',')):
+        return ','
+    return None
+
+def _is_row(fields):
+    """
+    Indicates whether or not the fields of a line make up a CSV or TSV row -
+        three fields, the last of them a distance or the heading of one.
+    """
+    return len(fields) == 3 and (_is_integer(fields[2]) or \
+            not fields[2][-1:].isdigit())
+
+def _split_row(line, delimiter):
+    """
+    Splits a CSV or TSV row into its fields, as the csv module reads them -
+        so a quoted field can hold the delimiter, and its quotes are removed.
+
+    Arguments:
+        line - The row, with surrounding whitespace removed.
+        delimiter - ',' or '\t'.
+    Returns:
+        list - The fields, each with surrounding whitespace removed.
+    """
+    return [field.strip() for field in
+            next(csv.reader([line], delimiter=delimiter))]
+
+def _is_integer(text):
+    """
+    Indicates whether or not a string is a whole number.
+    """
+    try:
+        int(text)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,93 @@
+import unittest
+from loader import read_connections, split_connection
+
+class LoaderUnitTests(unittest.TestCase):
+    """
+    Unit testing for the edge list readers.
+    """
+    def test_split_connection(self):
+        """
+        Are short-form connections split into two names and a distance, and
+            are ones that are too short rejected?
+        """
+        self.assertEqual(split_connection('AB12'), ('A', 'B', '12'))
+        with self.assertRaises(ValueError):
+            split_connection('AB')
+
+    def test_read_short_form(self):
+        """
+        Are short-form connections read whether they are separated by commas,
+            spaces or new lines, with blank lines and comments skipped?
+        """
+        lines = ['# A comment', 'AB5,BC4', '', 'CD8 DC8\n', '  AE7  ']
+        self.assertEqual(list(read_connections(lines)),
+                [('A', 'B', '5'), ('B', 'C', '4'), ('C', 'D', '8'),
+                ('D', 'C', '8'), ('A', 'E', '7')])
+
+    def test_read_csv_and_tsv_rows(self):
+        """
+        Are CSV and TSV rows read with station names of any length, and is a
+            header row skipped?
+        """
+        lines = ['from,to,distance', 'Union,King,3', 'King\tSt Andrew\t2']
+        self.assertEqual(list(read_connections(lines)),
+                [('Union', 'King', '3'), ('King', 'St Andrew', '2')])
+
+    def test_read_quoted_fields(self):
+        """
+        Are quoted station names read without their quotes, even when they
+            hold the delimiter?
+        """
+        lines = ['"Union, North",King,3', '"Union",King,4',
+                '"St ""A"" Station"\tKing\t5']
+        self.assertEqual(list(read_connections(lines)),
+                [('Union, North', 'King', '3'), ('Union', 'King', '4'),
+                ('St "A" Station', 'King', '5')])
+        self.assertEqual(list(read_connections(['"A,B",C,5'], 'csv')),
+                [('A,B', 'C', '5')])
+
+    def test_three_short_form_connections_are_not_a_row(self):
+        """
+        Is a line of exactly three short-form connections read as
+            connections rather than a CSV row?
+        """
+        self.assertEqual(list(read_connections(['AB5,BC4,CD8'])),
+                [('A', 'B', '5'), ('B', 'C', '4'), ('C', 'D', '8')])
+
+    def test_tab_separated_short_form_connections_are_not_a_row(self):
+        """
+        Are short-form connections separated by tabs read as connections,
+            while a tab-separated header and row are still read as a row?
+        """
+        self.assertEqual(list(read_connections(['AB5\tBC4'])),
+                [('A', 'B', '5'), ('B', 'C', '4')])
+        self.assertEqual(list(read_connections(['AB5\tBC4\tCD6'])),
+                [('A', 'B', '5'), ('B', 'C', '4'), ('C', 'D', '6')])
+        self.assertEqual(list(read_connections(['from\tto\tdistance',
+                'Union\tKing\t3'])), [('Union', 'King', '3')])
+
+    def test_forced_format(self):
+        """
+        Does a forced format read every line the same way, and are unknown
+            formats and rows with the wrong number of fields rejected?
+        """
+        self.assertEqual(list(read_connections(['AB5\tBC4'], 'list')),
+                [('A', 'B', '5'), ('B', 'C', '4')])
+        self.assertEqual(list(read_connections(['AB,CD,5'], 'csv')),
+                [('AB', 'CD', '5')])
+        with self.assertRaises(ValueError):
+            list(read_connections(['AB5'], 'xml'))
+        with self.assertRaises(ValueError):
+            list(read_connections(['A,B,C,5'], 'csv'))
+
+    def test_reads_lazily(self):
+        """
+        Are lines read one at a time, rather than all at once?
+        """
+        def lines():
+            yield 'AB5'
+            raise AssertionError("Read past the first connection")
+        self.assertEqual(next(read_connections(lines())), ('A', 'B', '5'))
+
+if __name__ == '__main__':
+    unittest.main()
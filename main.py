@@ -3,7 +3,7 @@
 CODING TEST FOR RECEPTIVITI.AI - DIRECTED GRAPH ROUTE CALCULATOR
 Created by James Byrnes <mail@jamesbyrnes.ca>, January 2018
 
-This repo consists of seven files:
+This repo consists of the following files:
     main.py - This file, intended to be used as a CLI frontend for the 
         calculator.
     main_test.py - Unit test file for main.py
@@ -11,15 +11,64 @@ This repo consists of seven files:
         all of the calculation methods.
     graph_test.py - Unit test file for graph.py
     queues.py - Queue data structures for use with the directed graph.
-        Includes a simple queue data structure as well as a priority queue.
-        Currently only the priority queue is used, with the simple queue
-        kept for posterity.
+        Includes a simple queue data structure, priority queues, and a
+        bucket queue used by searches when every connection is short. The
+        simple queue is kept for posterity.
     queues_test.py - Unit test file for queues.py
+    cache.py - A bounded least-recently-used cache, used to keep the
+        minimum distances found from recent origins.
+    cache_test.py - Unit test file for cache.py
+    hierarchy.py - A contraction hierarchy, used to answer minimum distance
+        queries quickly on graphs that rarely change.
+    hierarchy_test.py - Unit test file for hierarchy.py
+    reachability.py - The strongly connected components of a graph, used to
+        keep searches away from dead ends, and an index of which points can
+        reach which, used to answer queries between unconnected points
+        without a search.
+    reachability_test.py - Unit test file for reachability.py
+    storage.py - Compact, array-based storage for large graphs.
+    storage_test.py - Unit test file for storage.py
+    loader.py - Readers for streamed edge lists, in CSV, TSV or the same
+        short form as the -l argument.
+    loader_test.py - Unit test file for loader.py
+    commands.py - The queries that can be run against a graph, shared by
+        this file and server.py.
+    commands_test.py - Unit test file for commands.py
+    server.py - Long-running query servers, answering queries sent as
+        newline-delimited JSON over stdin, a Unix socket or TCP.
+    server_test.py - Unit test file for server.py
+    batch.py - Batch queries, answered across a pool of worker processes.
+    batch_test.py - Unit test file for batch.py
+    shared.py - A read-only graph held in shared memory, for worker
+        processes to query without each holding a copy.
+    shared_test.py - Unit test file for shared.py
+    matrix.py - Many-to-many minimum distances, worked out across a pool of
+        worker processes.
+    matrix_test.py - Unit test file for matrix.py
     README.md - Recommended reading for more information
 """
 
-import argparse, sys
+import argparse, csv, sys
+import batch, commands, matrix, server
 from graph import StationGraph
+from loader import FORMATS, read_connections
+
+def window_type(text):
+    """
+    Argument type for a MIN,MAX window, as used by 'movehist' and 'disthist'.
+
+    Arguments:
+        text - The argument as given on the command line, e.g. '2,5'
+
+    Returns:
+        tuple - (minimum, maximum) as ints
+    """
+    try:
+        minimum, maximum = [int(value) for value in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("Expected a window formatted as " \
+                "MIN,MAX but received {:s} instead".format(text))
+    return minimum, maximum
 
 def get_arg_parser(args):
     """
@@ -37,13 +86,24 @@ def get_arg_parser(args):
 
     # argparse seems to be very touchy, so for our main argument
     # (i.e. the list of graph connections), we should specify the flag
-    # -l or --list... this also opens up the opportunity to allow for
-    # file inputs down the road...
+    # -l or --list. Large graphs can be read from a file (or stdin, with
+    # -f -) instead.
     required_group = parser.add_argument_group("required arguments")
-    required_group.add_argument('-l', '--list', type=str, nargs=None, 
+    graph_source = required_group.add_mutually_exclusive_group(required=True)
+    graph_source.add_argument('-l', '--list', type=str, nargs=None, 
             metavar='CONN1,CONN2,CONN3...', 
-            help='A comma-separated listing of graph connections', 
-            required=True)
+            help='A comma-separated listing of graph connections')
+    graph_source.add_argument('-f', '--file', type=str, nargs=None,
+            metavar='PATH',
+            help='A file listing the graph connections, or - for stdin')
+    graph_source.add_argument('-g', '--graph', type=str, nargs=None,
+            metavar='SNAPSHOT',
+            help='A graph snapshot written by the save command')
+    parser.add_argument('--format', type=str, nargs=None,
+            choices=list(FORMATS), default='auto',
+            help='The format of the --file edge list')
+    parser.add_argument('--compact', action='store_true',
+            help='Store the graph in compact form')
 
     # POSITIONAL ARGUMENTS
     # 'route' takes an arbitrarily long comma-separated list of node
@@ -63,11 +123,16 @@ def get_arg_parser(args):
             type=int, nargs=None, default=1)
     sp_move_trips.add_argument('-M', '--maximum', metavar='STEPS',
             type=int, nargs=None, required=True)
+    sp_move_trips.add_argument('--routes', action='store_true')
 
     # 'disttrips' take a maximum of three arguments - a comma-separated pair
     # of node names (i.e. node_from and node_to), a --min distance
     # before trips get counted, and a mandatory --max distance to be 
     # counting trips for. Returns StationGraph method num_trips_by_distance()
+    #
+    # With --routes, 'movetrips' and 'disttrips' instead write every trip they
+    # would count, one per line, as they are found by StationGraph method
+    # iter_trips()
     sp_dist_trips = subparser.add_parser('disttrips')
     sp_dist_trips.add_argument('nodes', metavar='ORIGIN,DESTINATION',
             type=str, nargs=None)
@@ -75,15 +140,159 @@ def get_arg_parser(args):
             type=int, nargs=None, default=1)
     sp_dist_trips.add_argument('-M', '--maximum', metavar='DISTANCE',
             type=int, nargs=None, required=True)
+    sp_dist_trips.add_argument('--routes', action='store_true')
+
+    # 'movetripsfrom' and 'disttripsfrom' work like 'movetrips' and
+    # 'disttrips', but take only an origin and count the trips to every
+    # destination in one pass. Returns StationGraph methods
+    # num_trips_from_by_moves() and num_trips_from_by_distance()
+    sp_move_trips_from = subparser.add_parser('movetripsfrom')
+    sp_move_trips_from.add_argument('nodes', metavar='ORIGIN',
+            type=str, nargs=None)
+    sp_move_trips_from.add_argument('-m', '--minimum', metavar='STEPS',
+            type=int, nargs=None, default=1)
+    sp_move_trips_from.add_argument('-M', '--maximum', metavar='STEPS',
+            type=int, nargs=None, required=True)
+
+    sp_dist_trips_from = subparser.add_parser('disttripsfrom')
+    sp_dist_trips_from.add_argument('nodes', metavar='ORIGIN',
+            type=str, nargs=None)
+    sp_dist_trips_from.add_argument('-m', '--minimum', metavar='DISTANCE',
+            type=int, nargs=None, default=1)
+    sp_dist_trips_from.add_argument('-M', '--maximum', metavar='DISTANCE',
+            type=int, nargs=None, required=True)
+
+    # 'movehist' and 'disthist' take a comma-separated pair of node names,
+    # a mandatory --max ceiling, and any number of --window MIN,MAX pairs.
+    # The trips are counted once up to the ceiling, then every window is
+    # answered from StationGraph methods trip_histogram_by_moves() and
+    # trip_histogram_by_distance(). Without a window, the count for every
+    # number of moves/distance is returned instead.
+    sp_move_hist = subparser.add_parser('movehist')
+    sp_move_hist.add_argument('nodes', metavar='ORIGIN,DESTINATION',
+            type=str, nargs=None)
+    sp_move_hist.add_argument('-M', '--maximum', metavar='STEPS',
+            type=int, nargs=None, required=True)
+    sp_move_hist.add_argument('-w', '--window', metavar='MIN,MAX',
+            type=window_type, action='append')
+
+    sp_dist_hist = subparser.add_parser('disthist')
+    sp_dist_hist.add_argument('nodes', metavar='ORIGIN,DESTINATION',
+            type=str, nargs=None)
+    sp_dist_hist.add_argument('-M', '--maximum', metavar='DISTANCE',
+            type=int, nargs=None, required=True)
+    sp_dist_hist.add_argument('-w', '--window', metavar='MIN,MAX',
+            type=window_type, action='append')
 
     # 'route' takes a comma-separated pair of node names (i.e node_from and 
     # node_to) names and returns StationGraph method min_route_distance()
     sp_min_dist = subparser.add_parser('mindist')
     sp_min_dist.add_argument('nodes', metavar='ORIGIN,DESTINATION',
             type=str, nargs=None)
+    sp_min_dist.add_argument('-s', '--search', type=str, nargs=None,
+            choices=[mode for mode in StationGraph.SEARCH_MODES if mode],
+            default=None)
+    sp_min_dist.add_argument('--landmarks', metavar='COUNT', type=int,
+            nargs=None, default=0)
+    sp_min_dist.add_argument('--hierarchy', action='store_true')
+
+    # 'save' writes the graph to a binary snapshot, which can be loaded
+    # with -g much faster than the graph can be built from a list. With
+    # --distance-index, the minimum distance between every pair of nodes is
+    # worked out and saved too. Returns the path written.
+    sp_save = subparser.add_parser('save')
+    sp_save.add_argument('path', metavar='SNAPSHOT', type=str, nargs=None)
+    sp_save.add_argument('--distance-index', action='store_true')
+
+    # 'serve' keeps the graph loaded and answers a stream of queries, one
+    # JSON object per line, from stdin (or from each client connecting to a
+    # Unix --socket). Each query takes the same arguments as the commands
+    # above - see server.py. --landmarks, --hierarchy and --reachability are
+    # built once, before the first query. With --port, many clients are answered at
+    # once over TCP instead, with slow queries run on --workers processes.
+    sp_serve = subparser.add_parser('serve')
+    sp_serve.add_argument('--socket', metavar='PATH', type=str, nargs=None,
+            default=None)
+    sp_serve.add_argument('--port', metavar='PORT', type=int, nargs=None,
+            default=None)
+    sp_serve.add_argument('--host', metavar='ADDRESS', type=str, nargs=None,
+            default='127.0.0.1')
+    sp_serve.add_argument('--workers', metavar='COUNT', type=int,
+            nargs=None, default=None)
+    sp_serve.add_argument('--landmarks', metavar='COUNT', type=int,
+            nargs=None, default=0)
+    sp_serve.add_argument('--hierarchy', action='store_true')
+    sp_serve.add_argument('--reachability', action='store_true')
+
+    # 'batch' answers a file of queries (or stdin, with -), one per line in
+    # the same form as for 'serve', across a pool of worker processes. The
+    # answers are written in the same order as the queries, to stdout or
+    # --output, and a count of queries and errors is written to stderr.
+    sp_batch = subparser.add_parser('batch')
+    sp_batch.add_argument('queries', metavar='QUERYFILE', type=str,
+            nargs=None)
+    sp_batch.add_argument('-o', '--output', metavar='PATH', type=str,
+            nargs=None, default=None)
+    sp_batch.add_argument('--processes', metavar='COUNT', type=int,
+            nargs=None, default=None)
+
+    # 'distmatrix' writes the minimum distance from each --origins node to
+    # each --destinations node (every node, by default) as CSV, one row per
+    # origin, with 'inf' where a destination can't be reached. Each row takes
+    # one search, and the rows are spread across --processes workers.
+    sp_dist_matrix = subparser.add_parser('distmatrix')
+    sp_dist_matrix.add_argument('--origins', metavar='NODE1,NODE2...',
+            type=str, nargs=None, default=None)
+    sp_dist_matrix.add_argument('--destinations', metavar='NODE1,NODE2...',
+            type=str, nargs=None, default=None)
+    sp_dist_matrix.add_argument('--processes', metavar='COUNT', type=int,
+            nargs=None, default=None)
 
     return parser.parse_args(args)
 
+def build_graph(arguments):
+    """
+    Builds the StationGraph described by the arguments - from the -l list,
+        from the edge list in the --file (or stdin), read line by line, or
+        from a --graph snapshot.
+
+    Arguments:
+        arguments - the argparse arguments set, passed from main()
+
+    Returns:
+        StationGraph - the graph
+    """
+    if arguments.list is not None:
+        station_graph = StationGraph(arguments.list.split(','))
+        if arguments.compact:
+            station_graph.compact()
+        return station_graph
+
+    if arguments.graph is not None:
+        return StationGraph.load(arguments.graph)
+
+    if arguments.file == '-':
+        return StationGraph.from_edges(read_connections(sys.stdin,
+                arguments.format), compact=arguments.compact)
+    with open(arguments.file) as edge_file:
+        return StationGraph.from_edges(read_connections(edge_file,
+                arguments.format), compact=arguments.compact)
+
+def prepare_graph(station_graph, arguments):
+    """
+    Builds the landmarks and contraction hierarchy asked for by the
+        --landmarks and --hierarchy arguments (see
+        commands.PREPROCESSING_ARGUMENTS), once, before any query is run.
+
+    Arguments:
+        station_graph - the StationGraph object from build_graph()
+        arguments - the argparse arguments set, passed from main()
+    """
+    if arguments.landmarks:
+        station_graph.build_landmarks(arguments.landmarks)
+    if arguments.hierarchy:
+        station_graph.build_hierarchy()
+
 def argument_handler(arguments):
     """
     Argument handler - takes the built argument set from argparse and builds
@@ -94,34 +303,102 @@ def argument_handler(arguments):
         arguments - the argparse arguments set, passed from main()
 
     Returns:
-        output - the output from the StationGraph object
+        output - the output from the StationGraph object, or None for
+            'serve', 'batch', 'distmatrix' and 'movetrips'/'disttrips' with
+            --routes, whose output is written as it goes
     """
-    # List of connections to construct the graph
-    connection_list = arguments.list.split(',')
-    # List of nodes to be traversed for the StationGraph methods
-    node_name_list = arguments.nodes.split(',')
-
-    station_graph = StationGraph(connection_list)
-    
-    output = ''
+    station_graph = build_graph(arguments)
 
     # Method calls on the StationGraph object
-    if arguments.command == 'route':
-        output = station_graph.get_distance_by_route(node_name_list)
-    elif arguments.command == 'movetrips':
-        output = station_graph.num_trips_by_moves(node_name_list[0],
-                node_name_list[1], arguments.minimum, 
-                arguments.maximum)
-    elif arguments.command == 'disttrips':
-        output = station_graph.num_trips_by_distance(node_name_list[0],
-                node_name_list[1], arguments.minimum, 
-                arguments.maximum)
-    elif arguments.command == 'mindist':
-        output = station_graph.min_route_distance(node_name_list[0],
-                node_name_list[1])
+    if arguments.command in ('movetrips', 'disttrips') and arguments.routes:
+        node_name_list = arguments.nodes.split(',')
+        if len(node_name_list) < 2:
+            raise ValueError("Expected 2 node names for {:s} but received " \
+                    "{:d}".format(arguments.command, len(node_name_list)))
+        trips = station_graph.iter_trips(node_name_list[0],
+                node_name_list[1], arguments.minimum, arguments.maximum,
+                arguments.command == 'disttrips')
+        for trip in trips:
+            sys.stdout.write(','.join(trip) + '\n')
+        output = None
+    elif arguments.command in commands.QUERY_COMMANDS:
+        if arguments.command == 'mindist':
+            prepare_graph(station_graph, arguments)
+        request = {name: value for name, value in vars(arguments).items()
+                if name not in commands.PREPROCESSING_ARGUMENTS}
+        output = commands.execute(station_graph, request)
+    elif arguments.command == 'save':
+        if arguments.distance_index:
+            station_graph.build_distance_index()
+        station_graph.save(arguments.path)
+        output = arguments.path
+    elif arguments.command == 'serve':
+        # Over TCP, slow queries are answered by worker processes, which
+        # each build what they need for themselves - see server.QueryService
+        if arguments.socket or arguments.port is None:
+            prepare_graph(station_graph, arguments)
+            if arguments.reachability:
+                station_graph.build_reachability()
+        if arguments.socket:
+            server.serve_unix_socket(station_graph, arguments.socket)
+        elif arguments.port is not None:
+            server.serve_tcp(station_graph, arguments.host, arguments.port,
+                    arguments.workers, arguments.landmarks,
+                    arguments.hierarchy, arguments.reachability)
+        else:
+            server.serve_stream(station_graph, sys.stdin, sys.stdout)
+        output = None
+    elif arguments.command == 'batch':
+        query_file = sys.stdin
+        output_file = sys.stdout
+        try:
+            if arguments.queries != '-':
+                query_file = open(arguments.queries)
+            if arguments.output is not None:
+                output_file = open(arguments.output, 'w')
+            summary = batch.run_batch(station_graph, query_file, output_file,
+                    arguments.processes)
+        finally:
+            for stream in (query_file, output_file):
+                if stream not in (sys.stdin, sys.stdout):
+                    stream.close()
+        sys.stderr.write('{:d} queries, {:d} errors\n'.format(
+                summary['queries'], summary['errors']))
+        output = None
+    elif arguments.command == 'distmatrix':
+        origins = destinations = None
+        if arguments.origins:
+            origins = arguments.origins.split(',')
+        if arguments.destinations:
+            destinations = arguments.destinations.split(',')
+        rows = matrix.distance_rows(station_graph, origins, destinations,
+                arguments.processes)
+        if destinations is None:
+            destinations = station_graph.get_vertices()
+        writer = csv.writer(sys.stdout, lineterminator='\n')
+        writer.writerow([''] + destinations)
+        for origin, row in rows:
+            writer.writerow([origin] + row)
+        output = None
 
     return output
 
+def format_output(output):
+    """
+    Formats the output from the StationGraph object for printing. Counts per
+        destination are printed one per line, as 'DESTINATION: COUNT'.
+
+    Arguments:
+        output - the output from argument_handler()
+
+    Returns:
+        string - the text to print
+    """
+    if isinstance(output, dict):
+        return '\n'.join('{}: {}'.format(node, value)
+                for node, value in output.items())
+    return str(output)
+
 def main():
     """
     Main entry method for this file. Intended to be used as a CLI frontend.
@@ -130,7 +407,8 @@ def main():
 
     output = argument_handler(parsed_args)
 
-    print(output)
+    if output is not None:
+        print(format_output(output))
 
 if __name__ == '__main__':
     main()
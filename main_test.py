@@ -1,4 +1,9 @@
+import contextlib
+import io
+import os
+import tempfile
 import unittest
+import unittest.mock
 import main
 from graph import StationGraph
 
@@ -51,6 +56,23 @@ class MainTestCases(unittest.TestCase):
         output = main.argument_handler(parsed_args)
         self.assertEqual(output, self.stations.num_trips_by_distance('A','B',1,10))
 
+    def test_trips_list_argument_functionality(self):
+        """
+        Do movetrips and disttrips with --routes write every trip counted, one
+            per line, in the same order as the StationGraph object?
+        """
+        for command, is_distance in (('movetrips', False),
+                ('disttrips', True)):
+            args = self.args + [command, 'A,B', '-M', '10', '--routes']
+            parsed_args = main.get_arg_parser(args)
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                self.assertIsNone(main.argument_handler(parsed_args))
+            trips = list(self.stations.iter_trips('A', 'B', 1, 10,
+                    is_distance))
+            self.assertTrue(trips)
+            self.assertEqual(output.getvalue().splitlines(),
+                    [','.join(trip) for trip in trips])
+
     def test_mindist_argument_functionality(self):
         """
         Does the mindist function work in an equivalent way to the StationGraph
@@ -61,5 +83,148 @@ class MainTestCases(unittest.TestCase):
         output = main.argument_handler(parsed_args)
         self.assertEqual(output, self.stations.min_route_distance('A','B'))
 
+    def test_movetripsfrom_argument_functionality(self):
+        """
+        Does the movetripsfrom function work in an equivalent way to the
+            StationGraph object?
+        """
+        self.args.extend(['movetripsfrom', 'A', '-M', '4'])
+        parsed_args = main.get_arg_parser(self.args)
+        output = main.argument_handler(parsed_args)
+        self.assertEqual(output, self.stations.num_trips_from_by_moves('A',1,4))
+
+    def test_disttripsfrom_argument_functionality(self):
+        """
+        Does the disttripsfrom function work in an equivalent way to the
+            StationGraph object?
+        """
+        self.args.extend(['disttripsfrom', 'A', '-m', '2', '-M', '10'])
+        parsed_args = main.get_arg_parser(self.args)
+        output = main.argument_handler(parsed_args)
+        self.assertEqual(output, self.stations.num_trips_from_by_distance('A',2,10))
+
+    def test_movehist_argument_functionality(self):
+        """
+        Does the movehist function answer each window in an equivalent way to
+            the StationGraph object?
+        """
+        self.args.extend(['movehist', 'A,B', '-M', '4', '-w', '1,2',
+                '-w', '2,4'])
+        parsed_args = main.get_arg_parser(self.args)
+        output = main.argument_handler(parsed_args)
+        self.assertEqual(output, {
+            '1,2': self.stations.num_trips_by_moves('A','B',1,2),
+            '2,4': self.stations.num_trips_by_moves('A','B',2,4)})
+
+    def test_disthist_argument_functionality(self):
+        """
+        Does the disthist function give the count for every distance when no
+            window is given?
+        """
+        self.args.extend(['disthist', 'A,B', '-M', '11'])
+        parsed_args = main.get_arg_parser(self.args)
+        output = main.argument_handler(parsed_args)
+        self.assertEqual(output[4], self.stations.num_trips_by_distance('A','B',4,5))
+        self.assertEqual(output[10], self.stations.num_trips_by_distance('A','B',10,11))
+        self.assertEqual(sum(output.values()),
+                self.stations.num_trips_by_distance('A','B',1,11))
+
+    def test_mindist_search_argument_functionality(self):
+        """
+        Does the mindist function give the same answer when a search mode
+            is chosen?
+        """
+        self.args.extend(['mindist', 'A,B', '--search', 'bidirectional'])
+        parsed_args = main.get_arg_parser(self.args)
+        output = main.argument_handler(parsed_args)
+        self.assertEqual(output, self.stations.min_route_distance('A','B'))
+
+    def test_mindist_landmarks_argument_functionality(self):
+        """
+        Does the mindist function give the same answer when landmarks are
+            built for an 'alt' search?
+        """
+        self.args.extend(['mindist', 'A,B', '--search', 'alt',
+                '--landmarks', '2'])
+        parsed_args = main.get_arg_parser(self.args)
+        output = main.argument_handler(parsed_args)
+        self.assertEqual(output, self.stations.min_route_distance('A','B'))
+
+    def test_mindist_hierarchy_argument_functionality(self):
+        """
+        Does the mindist function give the same answer when a contraction
+            hierarchy is built?
+        """
+        self.args.extend(['mindist', 'A,B', '--hierarchy'])
+        parsed_args = main.get_arg_parser(self.args)
+        output = main.argument_handler(parsed_args)
+        self.assertEqual(output, self.stations.min_route_distance('A','B'))
+
+    def test_file_argument_functionality(self):
+        """
+        Is the graph read the same way from a CSV file as from -l, and can
+            -l and --file not be given together?
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'edges.csv')
+            with open(path, 'w') as edge_file:
+                edge_file.write('from,to,distance\nA,B,10\nA,C,2\n' \
+                        'C,B,2\nA,D,5\n')
+            for extra_args in [[], ['--compact']]:
+                parsed_args = main.get_arg_parser(['-f', path] + extra_args +
+                        ['mindist', 'A,B'])
+                output = main.argument_handler(parsed_args)
+                self.assertEqual(output,
+                        self.stations.min_route_distance('A','B'))
+        with self.assertRaises(SystemExit), \
+                contextlib.redirect_stderr(io.StringIO()):
+            main.get_arg_parser(self.args + ['-f', path, 'mindist', 'A,B'])
+
+    def test_save_and_graph_argument_functionality(self):
+        """
+        Does a graph saved with the save function give the same answers when
+            loaded with -g?
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.snapshot')
+            parsed_args = main.get_arg_parser(self.args + ['save', path,
+                    '--distance-index'])
+            self.assertEqual(main.argument_handler(parsed_args), path)
+            parsed_args = main.get_arg_parser(['-g', path, 'mindist', 'A,B'])
+            output = main.argument_handler(parsed_args)
+        self.assertEqual(output, self.stations.min_route_distance('A','B'))
+
+    def test_stdin_argument_functionality(self):
+        """
+        Is the graph read from stdin when the file is given as -?
+        """
+        parsed_args = main.get_arg_parser(['-f', '-', 'route', 'A,C,B'])
+        with unittest.mock.patch('sys.stdin',
+                io.StringIO('AB10 AC2\nCB2 AD5\n')):
+            output = main.argument_handler(parsed_args)
+        self.assertEqual(output, self.stations.get_distance_by_route(['A','C','B']))
+
+    def test_distmatrix_argument_functionality(self):
+        """
+        Does the distmatrix function write a CSV row of minimum distances per
+            origin, equivalent to the StationGraph object?
+        """
+        self.args.extend(['distmatrix', '--origins', 'A,B', '--destinations',
+                'B,C', '--processes', '1'])
+        parsed_args = main.get_arg_parser(self.args)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertIsNone(main.argument_handler(parsed_args))
+        self.assertEqual(output.getvalue().splitlines(), [',B,C',
+                'A,{},{}'.format(self.stations.min_route_distance('A','B'),
+                self.stations.min_route_distance('A','C')), 'B,0,inf'])
+
+    def test_format_output(self):
+        """
+        Are per-destination counts printed one destination per line, while
+            single values are printed as-is?
+        """
+        self.assertEqual(main.format_output({'A': 0, 'B': 2}), 'A: 0\nB: 2')
+        self.assertEqual(main.format_output(5), '5')
+
 if __name__ == '__main__':
     unittest.main()
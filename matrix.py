@@ -0,0 +1,107 @@
+"""
+Many-to-many minimum distances for a StationGraph - the minimum distance
+    from each of a list of origins to each of a list of destinations, worked
+    out with one search per origin, spread across a pool of worker
+    processes.
+"""
+
+from array import array
+import multiprocessing
+import shared
+from shared import SharedGraph
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def distance_rows(station_graph, origins=None, destinations=None,
+        processes=None, chunksize=8):
+    """
+    Works out the minimum distance from each origin to each destination, one
+        row per origin, following the rules of
+        StationGraph.min_route_distance() - so an origin that is also a
+        destination gets the distance of the shortest route back to itself,
+        or 0 if there is none. Each row is found with a single search from
+        its origin (see StationGraph.min_route_distances_from()), and rows
+        are yielded in origin order as soon as they and every row before
+        them are ready, so the matrix never has to be held in memory at
+        once.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        origins - The origin points, in row order. None (default) uses every
+            point in the graph.
+        destinations - The destination points, in column order. None
+            (default) uses every point in the graph.
+        processes - The number of worker processes, which query the graph in
+            shared memory (see shared.SharedGraph). None uses one per core.
+            With 1, the rows are worked out in this process instead.
+        chunksize - The number of origins sent to a worker at a time.
+    Yields:
+        tuple - (origin, row), where row is a list of the minimum distance to
+            each destination - float("inf") where it can't be reached.
+            Throws a ValueError up front if any point does not exist.
+    """
+    vertices = station_graph.get_vertices()
+    origins = vertices if origins is None else list(origins)
+    destinations = vertices if destinations is None else list(destinations)
+    for node in origins + destinations:
+        if station_graph.get(node) is None:
+            raise ValueError("Non-existant node was given: {}".format(node))
+    return _distance_rows(station_graph, origins, destinations, processes,
+            chunksize)
+
+def _distance_rows(station_graph, origins, destinations, processes,
+        chunksize):
+    """
+    The generator behind distance_rows(), once the points are checked.
+    """
+    if processes == 1:
+        for origin in origins:
+            min_distances = station_graph.min_route_distances_from(origin)
+            yield origin, [min_distances[node_to] for node_to in destinations]
+        return
+
+    with SharedGraph.create(station_graph) as shared_graph, \
+            multiprocessing.Pool(processes, shared.init_worker,
+                    (shared_graph, destinations)) as pool:
+        for origin, row in zip(origins,
+                pool.imap(_distance_row, origins, chunksize)):
+            yield origin, row
+
+def distance_matrix(station_graph, origins=None, destinations=None,
+        processes=None):
+    """
+    Works out the minimum distance from each origin to each destination, as
+        for distance_rows(), as a dense matrix.
+
+    Arguments:
+        As for distance_rows().
+    Returns:
+        numpy.ndarray - A float64 matrix with a row per origin and a column
+            per destination, with infinity where a destination can't be
+            reached. If NumPy is not installed, a list of array.array('d')
+            rows is returned instead.
+    """
+    rows = [array('d', row) for origin, row in distance_rows(station_graph,
+            origins, destinations, processes)]
+    if numpy is None:
+        return rows
+    matrix = numpy.empty((len(rows), len(rows[0]) if rows else 0))
+    for index, row in enumerate(rows):
+        matrix[index] = numpy.frombuffer(row)
+    return matrix
+
+def _distance_row(origin):
+    """
+    Works out one row of the matrix in a worker process, whose context (see
+        shared.init_worker()) is the destinations, in column order.
+
+    Arguments:
+        origin - The origin point of the row.
+    Returns:
+        list - The minimum distance to each destination.
+    """
+    min_distances = shared.worker_graph.min_route_distances_from(origin)
+    return [min_distances[node_to] for node_to in shared.worker_context]
@@ -0,0 +1,69 @@
+import unittest
+import matrix
+from graph import StationGraph
+
+class DistanceMatrixTestCases(unittest.TestCase):
+    """
+    Unit testing for many-to-many minimum distances.
+    """
+    def setUp(self):
+        self.stations = StationGraph(['AB5', 'BC4', 'CD8', 'DC8', 'DE6',
+                'AD5', 'CE2', 'EB3', 'AE7', 'FA1'])
+
+    def expected_rows(self, origins, destinations):
+        """
+        Gives the rows expected, from one min_route_distance() call per pair.
+        """
+        return [(origin, [self.stations.min_route_distance(origin, node_to)
+                for node_to in destinations]) for origin in origins]
+
+    def test_all_pairs(self):
+        """
+        Does every row match min_route_distance(), including the loop-back
+            distances of each origin to itself, whether worked out here or
+            across worker processes?
+        """
+        vertices = self.stations.get_vertices()
+        expected = self.expected_rows(vertices, vertices)
+        for processes in [1, 2]:
+            self.assertEqual(list(matrix.distance_rows(self.stations,
+                    processes=processes)), expected)
+
+    def test_many_to_many(self):
+        """
+        Are the rows and columns given in the order of the origins and
+            destinations asked for?
+        """
+        rows = list(matrix.distance_rows(self.stations, ['E', 'F', 'B'],
+                ['F', 'B', 'A'], processes=2, chunksize=1))
+        self.assertEqual(rows, self.expected_rows(['E', 'F', 'B'],
+                ['F', 'B', 'A']))
+        self.assertEqual(rows[0][1], [float("inf"), 3, float("inf")])
+
+    def test_unknown_node(self):
+        """
+        Is an unknown origin or destination rejected before any work is done?
+        """
+        with self.assertRaises(ValueError):
+            matrix.distance_rows(self.stations, ['A'], ['X'])
+
+    def test_distance_matrix(self):
+        """
+        Does distance_matrix() give the same distances as the rows?
+        """
+        result = matrix.distance_matrix(self.stations, ['A', 'B'],
+                ['B', 'F'], processes=1)
+        self.assertEqual([list(row) for row in result],
+                [[5.0, float("inf")], [9.0, float("inf")]])
+
+    @unittest.skipIf(matrix.numpy is None, "NumPy is not installed")
+    def test_distance_matrix_numpy(self):
+        """
+        Is the matrix a dense NumPy array when NumPy is installed?
+        """
+        result = matrix.distance_matrix(self.stations, processes=1)
+        self.assertEqual(result.shape, (6, 6))
+        self.assertEqual(result.dtype, matrix.numpy.float64)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import heapq
+
 class SimpleQueue:
     """
     NOTE - This class is not currently used but is maintained here for
@@ -99,6 +101,12 @@ class PriorityQueue:
         entered onto a list and the lowest value of those items remains at the
         head of the queue.
 
+    The values are kept in the same layout as the heapq module (the children
+        of index i are 2i + 1 and 2i + 2), so the sifting is done by heapq in
+        C. The values are only checked for comparability once per queue, when
+        the first value is added - every value after that only needs to be of
+        the same type.
+
     Public variables are:
         size - The number of items in the queue.
 
@@ -117,6 +125,31 @@ class PriorityQueue:
         self._type = None
         self.size = 0
 
+    @classmethod
+    def from_iterable(cls, values):
+        """
+        Builds a queue from any number of values at once, in O(n) time
+            rather than the O(n log n) of adding them one at a time.
+
+        Arguments:
+            values - An iterable of comparable values, all of the same type.
+                Throws a TypeError as described in add().
+        Returns:
+            PriorityQueue - The queue.
+        """
+        queue = cls()
+        nodes = list(values)
+        if nodes:
+            queue._check_type(nodes[0])
+            value_type = queue._type
+            for value in nodes:
+                if type(value) is not value_type:
+                    queue._check_type(value)
+            heapq.heapify(nodes)
+        queue._nodes = nodes
+        queue.size = len(nodes)
+        return queue
+
     def is_empty(self):
         """
         Identifies whether or not the queue is empty.
@@ -138,9 +171,8 @@ class PriorityQueue:
     def add(self, value):
         """
         Adds a value to the end of the priority queue, then "works"
-            up the queue until the value's  parent's value is less than its
-            value.  In this case, the value's parent is always idx/2 where idx
-            is the current index of the added value.
+            up the queue until the value's parent's value is not greater than
+            its value.
 
         Arguments:
             value - A comparable value to be added. Will throw a TypeError if
@@ -149,6 +181,19 @@ class PriorityQueue:
                 when the type of the value being added and the values already
                 in the queue don't match.
         """
+        if type(value) is not self._type:
+            self._check_type(value)
+        heapq.heappush(self._nodes, value)
+        self.size += 1
+
+    def _check_type(self, value):
+        """
+        Checks a value of a type not yet seen by the queue, as described in
+            add(). The first type added becomes the type of the queue.
+
+        Arguments:
+            value - The value to check.
+        """
         if self._type is not None and self._type is not type(value):
             raise TypeError('Expected type {:s} but received ' \
                     '{:s}'.format(self._type.__name__, type(value).__name__))
@@ -162,47 +207,21 @@ class PriorityQueue:
 
         # FIX 2018-01-30 - Set the type of queue if we are adding to the queue for the first
         # time.
-        if self._type is None and self.is_empty():
+        if self._type is None:
             self._type = type(value)
 
-        self._nodes.append(value)
-        self.size += 1
-
-        # heap_crawler starts at the end of the queue and works up the parents
-        # on the heap until the parent is <= the value added
-        heap_crawler = self.size - 1
-
-        while heap_crawler > 0 and self._nodes[int(heap_crawler / 2)] > value:
-            self._nodes[heap_crawler] = self._nodes[int(heap_crawler / 2)]
-            heap_crawler = int(heap_crawler / 2)
-
-        # Insert the new value in this spot.
-        self._nodes[heap_crawler] = value
-
     def remove(self):
         """
-        Removes and returns the first value from the queue, then runs heapify()
-            to re-sort the queue.
+        Removes and returns the first value from the queue, moving the last
+            value to the front and back down the heap to re-sort the queue.
 
         Returns:
             (any type) - The value of the first item in the queue.
         """
         if self.is_empty():
             raise IndexError("Tried to remove a value from an empty queue")
-
-        first_item = self._nodes[0]
-
-        # Take the last item in the queue and put it at the front,
-        # then remove it from the back (no duplication). Then, reduce the size
-        # of the queue.
-        self._nodes[0] = self._nodes[self.size - 1]
-        self._nodes.pop()
         self.size -= 1
-
-        if self.size > 1:
-            self.heapify(0)
-
-        return first_item
+        return heapq.heappop(self._nodes)
 
     def heapify(self, root):
         """
@@ -221,22 +240,363 @@ class PriorityQueue:
                     "size of the queue")
 
         moving_node = self._nodes[root]
-        child_node = root
         heap_crawler = root
 
         # heap_crawler will now go DOWN the tree, and child_node will examine
         # its child nodes to reorder the heap
-
-        while 2 * heap_crawler < self.size:
-            child_node = 2 * heap_crawler
-            if child_node < self.size - 1 and self._nodes[child_node] > self._nodes[child_node + 1]:
+        while 2 * heap_crawler + 1 < self.size:
+            child_node = 2 * heap_crawler + 1
+            if child_node + 1 < self.size and \
+                    self._nodes[child_node + 1] < self._nodes[child_node]:
                 # Check both children
                 child_node += 1
-            if moving_node <= self._nodes[child_node]:
+            if not self._nodes[child_node] < moving_node:
                 break
-            else:
-                # Continue down the tree if we haven't found a spot to place
-                # the moving_node.
-                self._nodes[heap_crawler] = self._nodes[child_node]
-                heap_crawler = child_node
+            # Continue down the tree if we haven't found a spot to place
+            # the moving_node.
+            self._nodes[heap_crawler] = self._nodes[child_node]
+            heap_crawler = child_node
         self._nodes[heap_crawler] = moving_node
+
+class IndexedPriorityQueue:
+    """
+    A class representing an indexed min-heap priority queue, i.e. a priority
+        queue of unique keys, each with a priority, where the position of
+        every key in the heap is tracked. This allows the priority of a key
+        already in the queue to be lowered in place (decrease_key()) rather
+        than adding a duplicate.
+
+    Public variables are:
+        size - The number of keys in the queue.
+
+    Private variables are:
+        _keys - The keys in the queue, organized like a binary heap (the
+            children of index i are 2i + 1 and 2i + 2).
+        _priorities - The priority of each key, in the same order as _keys.
+        _positions - A dict of each key in the queue (key) and its index in
+            _keys (value).
+    """
+    def __init__(self):
+        """
+        Constructor method - returns a completely empty queue.
+        """
+        self._keys = []
+        self._priorities = []
+        self._positions = {}
+        self.size = 0
+
+    def is_empty(self):
+        """
+        Identifies whether or not the queue is empty.
+
+        Returns:
+            boolean - Whether or not self.size == 0
+        """
+        return self.size == 0
+
+    def contains(self, key):
+        """
+        Identifies whether or not a key is in the queue.
+
+        Arguments:
+            key - The key to look for.
+        Returns:
+            boolean - Whether or not the key is in the queue.
+        """
+        return key in self._positions
+
+    def get_priority(self, key):
+        """
+        Gives the priority of a key in the queue. Throws a KeyError if the
+            key is not in the queue.
+
+        Arguments:
+            key - The key to look up.
+        Returns:
+            (any type) - The priority of the key.
+        """
+        return self._priorities[self._positions[key]]
+
+    def peek(self):
+        """
+        Gives the key with the lowest priority without removing it.
+
+        Returns:
+            tuple - (priority, key) of the first key in the queue.
+        """
+        if self.is_empty():
+            raise IndexError("Tried to peek at an empty queue")
+        return self._priorities[0], self._keys[0]
+
+    def add(self, key, priority):
+        """
+        Adds a key to the queue with the given priority. Throws a KeyError if
+            the key is already in the queue - use decrease_key() instead.
+
+        Arguments:
+            key - A hashable key to be added.
+            priority - A comparable priority for the key.
+        """
+        if key in self._positions:
+            raise KeyError("Key {!r} is already in the queue".format(key))
+        self._keys.append(key)
+        self._priorities.append(priority)
+        self._positions[key] = self.size
+        self.size += 1
+        self._sift_up(self.size - 1)
+
+    def decrease_key(self, key, priority):
+        """
+        Lowers the priority of a key already in the queue, then moves it up
+            the heap to its new place. Throws a KeyError if the key is not in
+            the queue, or a ValueError if the new priority is greater than
+            the current one.
+
+        Arguments:
+            key - The key to be updated.
+            priority - The new priority for the key.
+        """
+        position = self._positions[key]
+        if priority > self._priorities[position]:
+            raise ValueError("decrease_key() cannot raise the priority of " \
+                    "a key")
+        self._priorities[position] = priority
+        self._sift_up(position)
+
+    def remove(self):
+        """
+        Removes the key with the lowest priority from the queue.
+
+        Returns:
+            tuple - (priority, key) of the removed key.
+        """
+        if self.is_empty():
+            raise IndexError("Tried to remove a value from an empty queue")
+
+        first_key = self._keys[0]
+        first_priority = self._priorities[0]
+        del self._positions[first_key]
+
+        # Take the last item in the queue and put it at the front, then
+        # move it back down the heap.
+        last_key = self._keys.pop()
+        last_priority = self._priorities.pop()
+        self.size -= 1
+        if self.size > 0:
+            self._keys[0] = last_key
+            self._priorities[0] = last_priority
+            self._positions[last_key] = 0
+            self._sift_down(0)
+
+        return first_priority, first_key
+
+    def _sift_up(self, position):
+        """
+        Moves the key at a position up the heap until its parent's priority
+            is not greater than its own.
+
+        Arguments:
+            position - The index of the key to move.
+        """
+        key = self._keys[position]
+        priority = self._priorities[position]
+        while position > 0:
+            parent = (position - 1) // 2
+            if not priority < self._priorities[parent]:
+                break
+            self._keys[position] = self._keys[parent]
+            self._priorities[position] = self._priorities[parent]
+            self._positions[self._keys[position]] = position
+            position = parent
+        self._keys[position] = key
+        self._priorities[position] = priority
+        self._positions[key] = position
+
+    def _sift_down(self, position):
+        """
+        Moves the key at a position down the heap until neither of its
+            children has a lower priority.
+
+        Arguments:
+            position - The index of the key to move.
+        """
+        key = self._keys[position]
+        priority = self._priorities[position]
+        while 2 * position + 1 < self.size:
+            child = 2 * position + 1
+            if child + 1 < self.size and \
+                    self._priorities[child + 1] < self._priorities[child]:
+                child += 1
+            if not self._priorities[child] < priority:
+                break
+            self._keys[position] = self._keys[child]
+            self._priorities[position] = self._priorities[child]
+            self._positions[self._keys[position]] = position
+            position = child
+        self._keys[position] = key
+        self._priorities[position] = priority
+        self._positions[key] = position
+
+class BucketQueue:
+    """
+    A class representing a monotone bucket queue (Dial's algorithm) - a
+        priority queue of unique keys with small, non-negative integer
+        priorities, with the same methods as IndexedPriorityQueue. It relies
+        on two properties of Dijkstra's algorithm over integer distances:
+        no key is ever added with a lower priority than the last one removed,
+        and no key is ever more than the longest connection (max_step) ahead
+        of it. Keys are kept in a ring of max_step + 1 buckets, one per
+        priority, so adding a key or lowering its priority takes constant
+        time, and finding the lowest priority means stepping forward through
+        at most max_step empty buckets.
+
+    Public variables are:
+        size - The number of keys in the queue.
+        max_step - The furthest any priority may be ahead of the last one
+            removed.
+
+    Private variables are:
+        _buckets - The ring of buckets. The keys with priority p are kept in
+            _buckets[p % (max_step + 1)], as a dict used as an ordered set.
+        _priorities - A dict of each key in the queue (key) and its priority
+            (value).
+        _cursor - The priority of the last key removed (or the first key
+            added, before any are removed). Every key in the queue has a
+            priority from _cursor to _cursor + max_step.
+    """
+    def __init__(self, max_step):
+        """
+        Constructor method - returns a completely empty queue.
+
+        Arguments:
+            max_step - The furthest any priority may be ahead of the last one
+                removed - for Dijkstra's algorithm, the longest connection.
+                Throws a ValueError if it is negative.
+        """
+        if max_step < 0:
+            raise ValueError("max_step cannot be negative")
+        self.max_step = max_step
+        self._buckets = [{} for _ in range(max_step + 1)]
+        self._priorities = {}
+        self._cursor = None
+        self.size = 0
+
+    def is_empty(self):
+        """
+        Identifies whether or not the queue is empty.
+
+        Returns:
+            boolean - Whether or not self.size == 0
+        """
+        return self.size == 0
+
+    def contains(self, key):
+        """
+        Identifies whether or not a key is in the queue.
+
+        Arguments:
+            key - The key to look for.
+        Returns:
+            boolean - Whether or not the key is in the queue.
+        """
+        return key in self._priorities
+
+    def get_priority(self, key):
+        """
+        Gives the priority of a key in the queue. Throws a KeyError if the
+            key is not in the queue.
+
+        Arguments:
+            key - The key to look up.
+        Returns:
+            int - The priority of the key.
+        """
+        return self._priorities[key]
+
+    def peek(self):
+        """
+        Gives the key with the lowest priority without removing it.
+
+        Returns:
+            tuple - (priority, key) of the first key in the queue.
+        """
+        if self.is_empty():
+            raise IndexError("Tried to peek at an empty queue")
+        priority = self._cursor
+        bucket = self._buckets[priority % len(self._buckets)]
+        while not bucket:
+            priority += 1
+            bucket = self._buckets[priority % len(self._buckets)]
+        return priority, next(iter(bucket))
+
+    def add(self, key, priority):
+        """
+        Adds a key to the queue with the given priority. Throws a KeyError if
+            the key is already in the queue - use decrease_key() instead - or
+            a ValueError if the priority is outside the range described
+            above.
+
+        Arguments:
+            key - A hashable key to be added.
+            priority - An int priority for the key.
+        """
+        if key in self._priorities:
+            raise KeyError("Key {!r} is already in the queue".format(key))
+        if self._cursor is None:
+            self._cursor = priority
+        self._check_priority(priority)
+        self._buckets[priority % len(self._buckets)][key] = None
+        self._priorities[key] = priority
+        self.size += 1
+
+    def decrease_key(self, key, priority):
+        """
+        Lowers the priority of a key already in the queue, moving it to the
+            bucket of its new priority. Throws a KeyError if the key is not
+            in the queue, or a ValueError if the new priority is greater than
+            the current one.
+
+        Arguments:
+            key - The key to be updated.
+            priority - The new priority for the key.
+        """
+        old_priority = self._priorities[key]
+        if priority > old_priority:
+            raise ValueError("decrease_key() cannot raise the priority of " \
+                    "a key")
+        self._check_priority(priority)
+        del self._buckets[old_priority % len(self._buckets)][key]
+        self._buckets[priority % len(self._buckets)][key] = None
+        self._priorities[key] = priority
+
+    def remove(self):
+        """
+        Removes a key with the lowest priority from the queue.
+
+        Returns:
+            tuple - (priority, key) of the removed key.
+        """
+        if self.is_empty():
+            raise IndexError("Tried to remove a value from an empty queue")
+        buckets = self._buckets
+        priority = self._cursor
+        bucket = buckets[priority % len(buckets)]
+        while not bucket:
+            priority += 1
+            bucket = buckets[priority % len(buckets)]
+        self._cursor = priority
+        key = bucket.popitem()[0]
+        del self._priorities[key]
+        self.size -= 1
+        return priority, key
+
+    def _check_priority(self, priority):
+        """
+        Throws a ValueError if a priority can't be held by the ring of
+            buckets - i.e. it is lower than the last priority removed, or
+            more than max_step ahead of it.
+        """
+        if not self._cursor <= priority <= self._cursor + self.max_step:
+            raise ValueError("Priority {!r} is outside the range of the " \
+                    "queue ({:d} to {:d})".format(priority, self._cursor,
+                    self._cursor + self.max_step))
@@ -2,6 +2,8 @@ import unittest
 import random
 from queues import SimpleQueue
 from queues import PriorityQueue
+from queues import IndexedPriorityQueue
+from queues import BucketQueue
 
 class SimpleQueueUnitTests(unittest.TestCase):
     """
@@ -265,5 +267,206 @@ class PriorityQueueUnitTests(unittest.TestCase):
         for item in test_list:
             self.assertEqual(item, self.pq.remove())
 
+    def test_queue_from_iterable(self):
+        """
+        Does from_iterable() build a queue that removes every value in order,
+            and check the values as add() does?
+        """
+        test_list = [random.randrange(10000) for num in range(1000)]
+        pq = PriorityQueue.from_iterable(test_list)
+        self.assertEqual(pq.size, 1000)
+        self.assertEqual(pq.get_type(), int)
+        self.assertEqual([pq.remove() for num in range(1000)],
+                sorted(test_list))
+        self.assertTrue(PriorityQueue.from_iterable([]).is_empty())
+        with self.assertRaises(TypeError):
+            PriorityQueue.from_iterable([1, 2, 'three'])
+        with self.assertRaises(TypeError):
+            PriorityQueue.from_iterable([{'a': 1}])
+
+    def test_queue_heapify_restores_order(self):
+        """
+        After a value in the queue is raised in place, does heapify() move it
+            back down to its place?
+        """
+        pq = PriorityQueue.from_iterable(range(10))
+        pq._nodes[0] = 100
+        pq.heapify(0)
+        self.assertEqual([pq.remove() for num in range(10)],
+                list(range(1, 10)) + [100])
+
+class IndexedPriorityQueueUnitTests(unittest.TestCase):
+    """
+    Unit testing for an IndexedPriorityQueue object.
+    """
+    def setUp(self):
+        self.pq = IndexedPriorityQueue()
+
+    def test_queue_initializes_empty(self):
+        """
+        Does the queue indicate it's empty when initialized?
+        """
+        self.assertTrue(self.pq.is_empty())
+        self.assertFalse(self.pq.contains('a'))
+
+    def test_queue_cannot_remove_from_empty(self):
+        """
+        Does the queue give an error when remove() is done on an empty
+            queue?
+        """
+        with self.assertRaises(IndexError):
+            self.pq.remove()
+
+    def test_queue_cannot_add_key_twice(self):
+        """
+        Does the queue give an error when a key already in the queue is
+            added again?
+        """
+        self.pq.add('a', 1)
+        with self.assertRaises(KeyError):
+            self.pq.add('a', 2)
+
+    def test_queue_contains_and_priority(self):
+        """
+        Does the queue track which keys it holds, and their priorities?
+        """
+        self.pq.add('a', 5)
+        self.pq.add('b', 3)
+        self.assertTrue(self.pq.contains('a'))
+        self.assertEqual(self.pq.get_priority('a'), 5)
+        self.assertEqual(self.pq.size, 2)
+        self.pq.remove()
+        self.assertFalse(self.pq.contains('b'))
+        self.assertEqual(self.pq.size, 1)
+
+    def test_queue_peek(self):
+        """
+        Does peek() give the first key without removing it, and give an
+            error on an empty queue?
+        """
+        with self.assertRaises(IndexError):
+            self.pq.peek()
+        self.pq.add('a', 5)
+        self.pq.add('b', 3)
+        self.assertEqual(self.pq.peek(), (3, 'b'))
+        self.assertEqual(self.pq.size, 2)
+
+    def test_queue_decrease_key(self):
+        """
+        Does decrease_key() move a key to the front of the queue when its
+            priority becomes the lowest, and refuse to raise a priority?
+        """
+        self.pq.add('a', 5)
+        self.pq.add('b', 3)
+        self.pq.add('c', 4)
+        self.pq.decrease_key('a', 1)
+        self.assertEqual(self.pq.remove(), (1, 'a'))
+        with self.assertRaises(ValueError):
+            self.pq.decrease_key('c', 10)
+        with self.assertRaises(KeyError):
+            self.pq.decrease_key('a', 0)
+
+    def test_queue_dequeues_in_order_large(self):
+        """
+        Do keys get removed in order of priority, including keys whose
+            priority was decreased?
+        """
+        priorities = {}
+        for key in range(1000):
+            priorities[key] = random.randrange(10000)
+            self.pq.add(key, priorities[key])
+        for key in random.sample(range(1000), 300):
+            priorities[key] = random.randrange(priorities[key] + 1)
+            self.pq.decrease_key(key, priorities[key])
+
+        removed = [self.pq.remove() for key in range(1000)]
+        self.assertEqual([priority for priority, key in removed],
+                sorted(priorities.values()))
+        for priority, key in removed:
+            self.assertEqual(priorities[key], priority)
+        self.assertTrue(self.pq.is_empty())
+
+class BucketQueueUnitTests(unittest.TestCase):
+    """
+    Unit testing for a BucketQueue object.
+    """
+    def setUp(self):
+        self.pq = BucketQueue(10)
+
+    def test_queue_initializes_empty(self):
+        """
+        Does the queue indicate it's empty when initialized, and give an
+            error on remove() or peek()?
+        """
+        self.assertTrue(self.pq.is_empty())
+        self.assertFalse(self.pq.contains('a'))
+        with self.assertRaises(IndexError):
+            self.pq.remove()
+        with self.assertRaises(IndexError):
+            self.pq.peek()
+
+    def test_queue_keys_and_priorities(self):
+        """
+        Does the queue track which keys it holds and their priorities, and
+            refuse to add a key twice or raise a priority?
+        """
+        self.pq.add('a', 0)
+        self.pq.add('b', 7)
+        self.assertTrue(self.pq.contains('b'))
+        self.assertEqual(self.pq.get_priority('b'), 7)
+        self.assertEqual(self.pq.peek(), (0, 'a'))
+        with self.assertRaises(KeyError):
+            self.pq.add('a', 2)
+        with self.assertRaises(ValueError):
+            self.pq.decrease_key('b', 8)
+        self.pq.decrease_key('b', 0)
+        self.assertEqual(sorted([self.pq.remove(), self.pq.remove()]),
+                [(0, 'a'), (0, 'b')])
+        self.assertTrue(self.pq.is_empty())
+
+    def test_queue_priority_range(self):
+        """
+        Are priorities below the last one removed, or more than max_step
+            ahead of it, refused?
+        """
+        self.pq.add('a', 5)
+        self.pq.add('b', 15)
+        with self.assertRaises(ValueError):
+            self.pq.add('c', 16)
+        self.assertEqual(self.pq.remove(), (5, 'a'))
+        with self.assertRaises(ValueError):
+            self.pq.add('c', 4)
+        with self.assertRaises(ValueError):
+            BucketQueue(-1)
+
+    def test_queue_matches_dijkstra_use(self):
+        """
+        Used the way Dijkstra's algorithm uses it - each key added no lower
+            than the last priority removed - are keys removed in the same
+            order of priority as an IndexedPriorityQueue gives?
+        """
+        heap = IndexedPriorityQueue()
+        self.pq.add(0, 0)
+        heap.add(0, 0)
+        next_key = 1
+        while not heap.is_empty():
+            priority, key = heap.remove()
+            self.assertEqual(self.pq.remove()[0], priority)
+            for step in range(random.randrange(3) if next_key < 500 else 0):
+                new_priority = priority + random.randint(1, 10)
+                self.pq.add(next_key, new_priority)
+                heap.add(next_key, new_priority)
+                next_key += 1
+            # Keys of equal priority can come out in a different order, so
+            # only keys still in both queues are lowered
+            shared_keys = [key for key in heap._positions
+                    if self.pq.contains(key)]
+            if shared_keys and random.random() < 0.3:
+                key = random.choice(shared_keys)
+                new_priority = max(priority, heap.get_priority(key) - 3)
+                self.pq.decrease_key(key, new_priority)
+                heap.decrease_key(key, new_priority)
+        self.assertTrue(self.pq.is_empty())
+
 if __name__ == '__main__':
     unittest.main()
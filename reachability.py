@@ -0,0 +1,283 @@
+from cache import LRUCache
+
+def strongly_connected_components(adjacency):
+    """
+    Splits a directed graph into its strongly connected components - the
+        largest groups of points that can all reach each other - using
+        Tarjan's algorithm. The search is iterative rather than recursive,
+        so that long chains of points can't overflow the stack.
+
+    Arguments:
+        adjacency - A mapping of each point (key) to a mapping of the points
+            it connects to (value) - e.g. StationGraph._nodes.
+    Returns:
+        tuple - (components, count), where components is a dict of each
+            point (key) and the number of its component (value), and count
+            is the number of components. Components are numbered in reverse
+            topological order, i.e. a connection between two components
+            always leads to the one with the lower number.
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = {}
+    count = 0
+    for root in adjacency:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        # Each item is a point being explored, and an iterator over the
+        # points it connects to that are still to be looked at
+        work = [(root, iter(adjacency[root]))]
+        while work:
+            node, connected_nodes = work[-1]
+            for connected_node in connected_nodes:
+                if connected_node not in index:
+                    index[connected_node] = lowlink[connected_node] = \
+                            len(index)
+                    stack.append(connected_node)
+                    on_stack.add(connected_node)
+                    work.append((connected_node,
+                            iter(adjacency[connected_node])))
+                    break
+                if connected_node in on_stack:
+                    lowlink[node] = min(lowlink[node], index[connected_node])
+            else:
+                # Every point this one connects to has been explored
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    # This point is the first found of its component, which
+                    # is everything above it on the stack
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        components[member] = count
+                        if member == node:
+                            break
+                    count += 1
+    return components, count
+
+class Condensation:
+    """
+    A class representing the strongly connected components of a directed
+        graph (see strongly_connected_components()) and the directed acyclic
+        graph they form - the condensation, with one point per component and
+        a connection wherever any point of one component connects to any
+        point of another. It depends only on which points connect to which,
+        not on the distances of the connections.
+
+    Public variables are:
+        components - A dict of each point (key) and the number of its
+            component (value). Components are numbered in reverse
+            topological order.
+        component_count - The number of components.
+        members - A list with the points of each component.
+        successors - A list with the set of components each component
+            connects to, not counting itself.
+        predecessors - A list with the set of components connecting to each
+            component, not counting itself.
+        cyclic - A list of whether or not each component has a route from
+            its points back to themselves, i.e. has more than one point.
+
+    Private variables are:
+        _linked_components - An LRUCache of the results of reaching() and
+            reachable_from(), by (component, whether forwards) (key).
+    """
+    def __init__(self, adjacency, cache_size=32):
+        """
+        Builds the condensation of a graph.
+
+        Arguments:
+            adjacency - A mapping of each point (key) to a mapping of the
+                points it connects to (value) - e.g. StationGraph._nodes.
+            cache_size - The number of results of reaching() and
+                reachable_from() to keep.
+        """
+        self.components, self.component_count = \
+                strongly_connected_components(adjacency)
+        self.members = [[] for _ in range(self.component_count)]
+        self.successors = [set() for _ in range(self.component_count)]
+        self.predecessors = [set() for _ in range(self.component_count)]
+        self.cyclic = [False] * self.component_count
+        for node, connected_nodes in adjacency.items():
+            component = self.components[node]
+            self.members[component].append(node)
+            for connected_node in connected_nodes:
+                connected_component = self.components[connected_node]
+                if connected_component == component:
+                    self.cyclic[component] = True
+                else:
+                    self.successors[component].add(connected_component)
+                    self.predecessors[connected_component].add(component)
+        self._linked_components = LRUCache(cache_size)
+
+    def reaching(self, node_to):
+        """
+        Gives every component that a route of any length - including none at
+            all - leads from to a destination, found by following the
+            condensation backwards from the destination's component. Any
+            route to the destination only ever passes through the points of
+            these components, so a search for it can skip every point whose
+            component (see components) isn't one of them. Only components
+            are listed, so the work done doesn't grow with the number of
+            points they hold.
+
+        Arguments:
+            node_to - The destination. Throws a KeyError if it is not in the
+                graph.
+        Returns:
+            frozenset - The numbers of the components that can reach
+                node_to, its own included.
+        """
+        return self._linked(node_to, self.predecessors)
+
+    def reachable_from(self, node_from):
+        """
+        Gives every component that a route of any length - including none at
+            all - leads to from an origin, as reaching() does but following
+            the condensation forwards.
+
+        Arguments:
+            node_from - The origin. Throws a KeyError if it is not in the
+                graph.
+        Returns:
+            frozenset - The numbers of the components node_from can reach,
+                its own included.
+        """
+        return self._linked(node_from, self.successors)
+
+    def _linked(self, node, links):
+        """
+        Gives every component that can be reached from the component of a
+            point by following links, caching the result.
+
+        Arguments:
+            node - The point to start from.
+            links - Either successors or predecessors.
+        Returns:
+            frozenset - The numbers of the components found, including the
+                first.
+        """
+        first = self.components[node]
+        key = (first, links is self.successors)
+        linked = self._linked_components.get(key)
+        if linked is not None:
+            return linked
+        seen = {first}
+        unexplored = [first]
+        while unexplored:
+            for component in links[unexplored.pop()]:
+                if component not in seen:
+                    seen.add(component)
+                    unexplored.append(component)
+        linked = frozenset(seen)
+        self._linked_components.put(key, linked)
+        return linked
+
+class ReachabilityIndex:
+    """
+    A class representing which points of a directed graph can reach which
+        others, so that whether there is any route at all between two points
+        is answered in constant time, without a search.
+
+    The transitive closure of the condensation of the graph (see
+        Condensation) is kept as one bitset per component, using Python ints
+        - bit j of the bitset of component i is set if a route of at least
+        one move leads from component i to component j. This takes
+        component_count squared bits in total.
+
+    Public variables are:
+        component_count - The number of strongly connected components.
+
+    Private variables are:
+        _components - A dict of each point (key) and the number of its
+            component (value).
+        _reach - A list with the bitset of each component, as described
+            above.
+    """
+    def __init__(self, condensation):
+        """
+        Builds the index for a graph.
+
+        Arguments:
+            condensation - The Condensation of the graph. It is not changed
+                by add_connection().
+        """
+        self._components = dict(condensation.components)
+        self.component_count = condensation.component_count
+        # Components are numbered so that every component a component
+        # connects to has already been done
+        self._reach = []
+        for component in range(self.component_count):
+            reach = 1 << component if condensation.cyclic[component] else 0
+            for successor in condensation.successors[component]:
+                reach |= 1 << successor | self._reach[successor]
+            self._reach.append(reach)
+
+    def can_reach(self, node_from, node_to):
+        """
+        Indicates whether or not a route of at least one move leads from one
+            point to another - so a point can only reach itself if it is on
+            a loop.
+
+        Arguments:
+            node_from - The origin point. Throws a KeyError if it is not in
+                the index.
+            node_to - The destination point. Throws a KeyError if it is not
+                in the index.
+        Returns:
+            boolean - True if node_to can be reached from node_from.
+        """
+        return self._reach[self._components[node_from]] >> \
+                self._components[node_to] & 1 == 1
+
+    def add_connection(self, node_from, node_to):
+        """
+        Updates the index for a connection added to the graph, along with
+            either of its points if they are new. This can be done cheaply
+            unless the connection joins two components into one, i.e. if
+            node_to could already reach node_from.
+
+        Arguments:
+            node_from - The origin of the connection.
+            node_to - The destination of the connection.
+        Returns:
+            boolean - True if the index was updated, or False if the
+                connection joins two components and the index has to be
+                built again.
+        """
+        for node in (node_from, node_to):
+            if node not in self._components:
+                self._components[node] = self.component_count
+                self._reach.append(0)
+                self.component_count += 1
+        component_from = self._components[node_from]
+        component_to = self._components[node_to]
+        if self._reach[component_from] >> component_to & 1:
+            # Nothing new can be reached
+            return True
+        if self._reach[component_to] >> component_from & 1:
+            return False
+
+        # Everything that reaches node_from now reaches node_to, and
+        # everything node_to reaches
+        reach_added = 1 << component_to | self._reach[component_to]
+        for component, reach in enumerate(self._reach):
+            if component == component_from or reach >> component_from & 1:
+                self._reach[component] = reach | reach_added
+        return True
+
+    def nbytes(self):
+        """
+        Gives the memory taken up by the bitsets.
+
+        Returns:
+            int - The size in bytes, not counting the overhead of each int.
+        """
+        return sum((reach.bit_length() + 7) // 8 for reach in self._reach)
@@ -0,0 +1,144 @@
+import unittest
+from reachability import Condensation, ReachabilityIndex, \
+        strongly_connected_components
+
+class StronglyConnectedComponentsUnitTests(unittest.TestCase):
+    """
+    Unit testing for strongly_connected_components().
+    """
+    def test_components(self):
+        """
+        Are points that can all reach each other put in the same component,
+            numbered so that connections between components always lead to
+            a lower number?
+        """
+        adjacency = {
+            'A': {'B': 1},
+            'B': {'C': 1, 'D': 1},
+            'C': {'A': 1},
+            'D': {'E': 1},
+            'E': {'D': 1, 'F': 1},
+            'F': {},
+        }
+        components, count = strongly_connected_components(adjacency)
+        self.assertEqual(count, 3)
+        self.assertEqual(len({components[node] for node in 'ABC'}), 1)
+        self.assertEqual(components['D'], components['E'])
+        self.assertGreater(components['A'], components['D'])
+        self.assertGreater(components['D'], components['F'])
+
+    def test_long_chain(self):
+        """
+        Can a chain far longer than the recursion limit be split up?
+        """
+        adjacency = {index: {index + 1: 1} for index in range(5000)}
+        adjacency[5000] = {0: 1}
+        components, count = strongly_connected_components(adjacency)
+        self.assertEqual(count, 1)
+
+class CondensationUnitTests(unittest.TestCase):
+    """
+    Unit testing for a Condensation object.
+    """
+    def setUp(self):
+        # A loop of A, B and C, which D leads into and which leads out to a
+        # dead end at E and a loop of F and G
+        self.adjacency = {
+            'A': {'B': 1},
+            'B': {'C': 1},
+            'C': {'A': 1, 'E': 1, 'F': 1},
+            'D': {'A': 1},
+            'E': {},
+            'F': {'G': 1},
+            'G': {'F': 1},
+        }
+        self.condensation = Condensation(self.adjacency)
+
+    def test_components(self):
+        """
+        Are the components, their members and the connections between them
+            all found?
+        """
+        components = self.condensation.components
+        self.assertEqual(self.condensation.component_count, 4)
+        self.assertEqual(sorted(self.condensation.members[components['A']]),
+                ['A', 'B', 'C'])
+        self.assertEqual(self.condensation.successors[components['A']],
+                {components['E'], components['F']})
+        self.assertEqual(self.condensation.predecessors[components['A']],
+                {components['D']})
+        self.assertEqual([self.condensation.cyclic[components[node]]
+                for node in 'ADEF'], [True, False, False, True])
+
+    def test_reaching(self):
+        """
+        Does reaching() give every component that can reach a destination,
+            and reachable_from() every component an origin can reach, each
+            including the point's own component?
+        """
+        components = self.condensation.components
+        def numbers(nodes):
+            return frozenset(components[node] for node in nodes)
+        self.assertEqual(self.condensation.reaching('B'), numbers('AD'))
+        self.assertEqual(self.condensation.reaching('E'), numbers('ADE'))
+        self.assertEqual(self.condensation.reaching('D'), numbers('D'))
+        self.assertEqual(self.condensation.reachable_from('A'),
+                numbers('AEF'))
+        self.assertIs(self.condensation.reaching('B'),
+                self.condensation.reaching('B'))
+        with self.assertRaises(KeyError):
+            self.condensation.reaching('H')
+
+class ReachabilityIndexUnitTests(unittest.TestCase):
+    """
+    Unit testing for a ReachabilityIndex object.
+    """
+    def setUp(self):
+        # A loop of A, B and C leading to a dead end at D, with E off on its
+        # own
+        self.adjacency = {
+            'A': {'B': 1},
+            'B': {'C': 1},
+            'C': {'A': 1, 'D': 1},
+            'D': {},
+            'E': {},
+        }
+        self.index = ReachabilityIndex(Condensation(self.adjacency))
+
+    def test_can_reach(self):
+        """
+        Does the index show which points can reach which, including a point
+            reaching itself only when it is on a loop?
+        """
+        self.assertEqual(self.index.component_count, 3)
+        self.assertTrue(self.index.can_reach('A', 'D'))
+        self.assertTrue(self.index.can_reach('C', 'B'))
+        self.assertTrue(self.index.can_reach('A', 'A'))
+        self.assertFalse(self.index.can_reach('D', 'A'))
+        self.assertFalse(self.index.can_reach('D', 'D'))
+        self.assertFalse(self.index.can_reach('A', 'E'))
+        with self.assertRaises(KeyError):
+            self.index.can_reach('A', 'F')
+
+    def test_add_connection(self):
+        """
+        Is the index updated for a connection that doesn't join two
+            components, including to a new point, and refused for one that
+            does?
+        """
+        self.assertTrue(self.index.add_connection('D', 'E'))
+        self.assertTrue(self.index.can_reach('B', 'E'))
+        self.assertTrue(self.index.add_connection('E', 'F'))
+        self.assertTrue(self.index.can_reach('A', 'F'))
+        self.assertFalse(self.index.can_reach('F', 'A'))
+        self.assertTrue(self.index.add_connection('A', 'D'))
+        self.assertFalse(self.index.add_connection('F', 'A'))
+
+    def test_nbytes(self):
+        """
+        Is the size of the bitsets reported?
+        """
+        self.assertEqual(self.index.nbytes(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
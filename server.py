@@ -0,0 +1,421 @@
+"""
+A long-running query server for a StationGraph. The graph is built once,
+    then queries are answered one per line as newline-delimited JSON, so
+    that many queries can be answered without starting a new process (and
+    rebuilding the graph) for each one.
+
+Each request is a JSON object describing one query, using the same names as
+    the CLI arguments (see commands.execute()), plus an optional 'id' that is
+    echoed back - e.g.
+        {"id": 1, "command": "movetrips", "nodes": "C,C", "maximum": 3}
+Each response is a JSON object on a line of its own, in the same order as the
+    requests, holding either the output of the query or the error it threw:
+        {"id": 1, "result": 2}
+        {"id": 2, "error": "ValueError: ..."}
+    An unreachable minimum distance is given as null.
+
+The same requests can be sent to a TCP port, where QueryService answers many
+    clients at once and reports latency percentiles per command - see
+    serve_tcp().
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import io
+import json
+import math
+import os
+import socketserver
+import threading
+import time
+import commands
+import shared
+from shared import SharedGraph
+
+def handle_line(station_graph, line):
+    """
+    Answers a single request.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        line - The request, as a line of JSON.
+    Returns:
+        dict - The response, ready to be written as JSON.
+    """
+    request, error_response = parse_request(line)
+    if request is None:
+        return error_response
+
+    response = {'id': request.get('id')}
+    response.update(answer_request(station_graph, request))
+    return response
+
+def parse_request(line):
+    """
+    Reads a single request.
+
+    Arguments:
+        line - The request, as a line of JSON.
+    Returns:
+        tuple - (request, None) if the line holds a JSON object, else
+            (None, response) with the error to send back.
+    """
+    try:
+        request = json.loads(line)
+    except ValueError as error:
+        return None, {'id': None, 'error': 'Invalid JSON: {}'.format(error)}
+    if not isinstance(request, dict):
+        return None, {'id': None, 'error': 'Expected a JSON object per line'}
+    return request, None
+
+def answer_request(station_graph, request):
+    """
+    Runs the query of a request.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        request - The request, as a dict.
+    Returns:
+        dict - {'result': output} or {'error': message}, without the id.
+    """
+    try:
+        return {'result': to_json(commands.execute(station_graph, request))}
+    except Exception as error:
+        # One bad query should never stop the server
+        return {'error': '{:s}: {}'.format(type(error).__name__, error)}
+
+def to_json(output):
+    """
+    Converts the output of a query to JSON-compatible values - infinite
+        distances become None, as JSON has no infinity.
+
+    Arguments:
+        output - The output of commands.execute().
+    Returns:
+        output - The same output, safe for json.dumps().
+    """
+    if isinstance(output, dict):
+        return {key: to_json(value) for key, value in output.items()}
+    if isinstance(output, float) and output == float("inf"):
+        return None
+    return output
+
+def serve_stream(station_graph, input_stream, output_stream):
+    """
+    Answers requests read from one stream, writing each response to another
+        as soon as it is ready, until the input ends. Blank lines are
+        skipped.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        input_stream - A text stream of requests, e.g. sys.stdin.
+        output_stream - A text stream for the responses, e.g. sys.stdout.
+    """
+    for line in input_stream:
+        if not line.strip():
+            continue
+        output_stream.write(json.dumps(handle_line(station_graph, line)))
+        output_stream.write('\n')
+        output_stream.flush()
+
+def make_unix_server(station_graph, path):
+    """
+    Builds a server listening on a Unix socket, which answers the requests
+        of each client that connects as serve_stream() does, with a thread
+        per client. An old socket file left at the path is replaced.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        path - The path of the socket.
+    Returns:
+        socketserver.ThreadingUnixStreamServer - The server, ready for
+            serve_forever().
+    """
+    class StreamHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            serve_stream(station_graph,
+                    io.TextIOWrapper(self.rfile, 'utf-8'),
+                    io.TextIOWrapper(self.wfile, 'utf-8', write_through=True))
+
+    if os.path.exists(path):
+        os.remove(path)
+    unix_server = socketserver.ThreadingUnixStreamServer(path, StreamHandler)
+    unix_server.daemon_threads = True
+    return unix_server
+
+def serve_unix_socket(station_graph, path):
+    """
+    Answers requests on a Unix socket (see make_unix_server()) until
+        interrupted, then removes the socket file.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        path - The path of the socket.
+    """
+    try:
+        with make_unix_server(station_graph, path) as unix_server:
+            unix_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+class LatencyStats:
+    """
+    A class keeping the latencies of recent queries, per command, so that
+        percentiles can be reported.
+
+    Public variables are:
+        window - The number of recent latencies kept per command.
+
+    Private variables are:
+        _latencies - A dict of each command (key) and a deque of its most
+            recent latencies, in seconds (value).
+        _counts - A dict of each command (key) and the number of queries it
+            has answered in total (value).
+        _lock - Guards the two dicts above, as latencies can be recorded
+            from more than one thread.
+    """
+    # The percentiles reported by summary()
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, window=10000):
+        """
+        Constructor method.
+
+        Arguments:
+            window - The number of recent latencies to keep per command.
+        """
+        self.window = window
+        self._latencies = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, command, seconds):
+        """
+        Records the latency of one query.
+
+        Arguments:
+            command - The command of the query.
+            seconds - The time taken to answer it.
+        """
+        with self._lock:
+            if command not in self._latencies:
+                self._latencies[command] = collections.deque(
+                        maxlen=self.window)
+                self._counts[command] = 0
+            self._latencies[command].append(seconds)
+            self._counts[command] += 1
+
+    def summary(self):
+        """
+        Reports the latency percentiles of each command, over its most recent
+            queries, using the nearest-rank method.
+
+        Returns:
+            dict - For each command (key), a dict (value) of the number of
+                queries answered ('count') and each percentile in
+                milliseconds (e.g. 'p99').
+        """
+        with self._lock:
+            latencies = {command: sorted(values)
+                    for command, values in self._latencies.items()}
+            counts = dict(self._counts)
+        summary = {}
+        for command, values in latencies.items():
+            summary[command] = {'count': counts[command]}
+            for percentile in self.PERCENTILES:
+                rank = max(math.ceil(percentile / 100 * len(values)), 1)
+                summary[command]['p{:d}'.format(percentile)] = \
+                        round(values[rank - 1] * 1000, 3)
+        return summary
+
+class QueryService:
+    """
+    A class answering queries concurrently for an asyncio server. Queries
+        whose command is in INLINE_COMMANDS are cheap, and are answered
+        straight away on the event loop; every other query is run on a pool
+        of worker processes, each querying the same copy of the graph in
+        shared memory (see shared.SharedGraph). The searches and trip counts
+        are pure Python, so on threads they would hold the GIL and stall the
+        event loop; in their own processes they can't hold up the fast
+        queries, or the reading and writing of any connection. Identical
+        queries in flight at the same time are only run once - the later
+        ones wait for the first and share its answer.
+
+    Besides the commands of commands.execute(), a request for the 'stats'
+        command is answered with the latency percentiles of each command
+        (see LatencyStats.summary()).
+
+    Public variables are:
+        latencies - The LatencyStats of the queries answered.
+        coalesced_count - The number of queries answered by waiting for an
+            identical query already in flight.
+
+    Private variables are:
+        _station_graph - The StationGraph to query, for INLINE_COMMANDS.
+        _shared_graph - The SharedGraph copy of it the workers query.
+        _executor - The pool of worker processes.
+        _in_flight - A dict of the key of each query running on the pool
+            (key), and the asyncio future of its answer (value).
+    """
+    # Commands cheap enough to answer on the event loop
+    INLINE_COMMANDS = ('route',)
+
+    def __init__(self, station_graph, workers=None, landmarks=0,
+            hierarchy=False, reachability=False):
+        """
+        Constructor method. The graph is copied into shared memory once, for
+            every worker to query in place.
+
+        Arguments:
+            station_graph - The StationGraph to query.
+            workers - The number of worker processes. None uses one per
+                core.
+            landmarks, hierarchy, reachability - The landmarks (a count),
+                contraction hierarchy and reachability index for each worker
+                to build before its first query, as for the serve arguments
+                of the same names. They aren't part of the shared copy.
+        """
+        self._station_graph = station_graph
+        self._shared_graph = SharedGraph.create(station_graph)
+        self._executor = concurrent.futures.ProcessPoolExecutor(workers,
+                initializer=shared.init_worker, initargs=(self._shared_graph,
+                None, landmarks, hierarchy, reachability))
+        self._in_flight = {}
+        self.latencies = LatencyStats()
+        self.coalesced_count = 0
+
+    async def answer(self, request):
+        """
+        Answers a single request.
+
+        Arguments:
+            request - The request, as a dict.
+        Returns:
+            dict - The response, ready to be written as JSON.
+        """
+        response = {'id': request.get('id')}
+        command = request.get('command')
+        if command == 'stats':
+            response['result'] = self.latencies.summary()
+            return response
+
+        started = time.perf_counter()
+        if command in self.INLINE_COMMANDS:
+            response.update(answer_request(self._station_graph, request))
+        else:
+            key = json.dumps({name: value for name, value in request.items()
+                    if name != 'id'}, sort_keys=True, default=repr)
+            answer = self._in_flight.get(key)
+            if answer is None:
+                answer = asyncio.get_running_loop().run_in_executor(
+                        self._executor, _answer_in_worker, request)
+                self._in_flight[key] = answer
+                answer.add_done_callback(
+                        lambda done, key=key: self._in_flight.pop(key, None))
+            else:
+                self.coalesced_count += 1
+            response.update(await asyncio.shield(answer))
+        self.latencies.record(str(command), time.perf_counter() - started)
+        return response
+
+    async def handle_client(self, reader, writer):
+        """
+        Answers the requests of one client, as newline-delimited JSON. The
+            requests are answered concurrently, so a response is written as
+            soon as it is ready - not necessarily in the order the requests
+            were sent. Clients that send more than one request at a time
+            should give each an id.
+
+        Arguments:
+            reader, writer - The asyncio streams of the connection.
+        """
+        tasks = set()
+
+        async def respond(request):
+            response = await self.answer(request)
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                request, error_response = parse_request(line)
+                if request is None:
+                    writer.write(json.dumps(error_response).encode('utf-8') +
+                            b'\n')
+                    continue
+                task = asyncio.ensure_future(respond(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start_server(self, host='127.0.0.1', port=0):
+        """
+        Starts listening for clients on a TCP port.
+
+        Arguments:
+            host - The address to listen on. Defaults to localhost only.
+            port - The port to listen on. 0 picks a free port.
+        Returns:
+            asyncio.Server - The server, already accepting clients.
+        """
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def close(self):
+        """
+        Shuts down the pool of worker processes and frees the shared copy of
+            the graph.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._shared_graph.close()
+
+def _answer_in_worker(request):
+    """
+    Runs the query of a request in a worker process.
+
+    Arguments:
+        request - The request, as a dict.
+    Returns:
+        dict - The answer from answer_request().
+    """
+    return answer_request(shared.worker_graph, request)
+
+def serve_tcp(station_graph, host='127.0.0.1', port=0, workers=None,
+        landmarks=0, hierarchy=False, reachability=False):
+    """
+    Answers requests from any number of clients on a TCP port (see
+        QueryService) until interrupted.
+
+    Arguments:
+        station_graph - The StationGraph to query.
+        host - The address to listen on. Defaults to localhost only.
+        port - The port to listen on. 0 picks a free port.
+        workers, landmarks, hierarchy, reachability - As for QueryService.
+    """
+    async def run():
+        service = QueryService(station_graph, workers, landmarks, hierarchy,
+                reachability)
+        try:
+            tcp_server = await service.start_server(host, port)
+            async with tcp_server:
+                await tcp_server.serve_forever()
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,168 @@
+import asyncio
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+import server
+from graph import StationGraph
+
+class ServerTestCases(unittest.TestCase):
+    """
+    Unit testing for the query server.
+    """
+    def setUp(self):
+        self.stations = StationGraph(['AB10', 'AC2', 'CB2', 'AD5'])
+
+    def test_handle_line(self):
+        """
+        Are requests answered as the CLI would answer them, with the id
+            echoed back and infinite distances given as null?
+        """
+        response = server.handle_line(self.stations,
+                '{"id": 7, "command": "mindist", "nodes": "A,B"}')
+        self.assertEqual(response, {'id': 7, 'result': 4})
+        response = server.handle_line(self.stations,
+                '{"command": "mindist", "nodes": ["B", "A"]}')
+        self.assertEqual(response, {'id': None, 'result': None})
+        response = server.handle_line(self.stations, '{"command": ' \
+                '"movehist", "nodes": "A,B", "maximum": 3, "window": [[1, 2]]}')
+        self.assertEqual(response['result'], {'1,2': 2})
+
+    def test_handle_line_errors(self):
+        """
+        Are bad requests, and queries that throw an error, answered with the
+            error rather than stopping the server?
+        """
+        for line in ['not json', '[1, 2]', '{"command": "save"}',
+                '{"id": 3, "command": "movetrips", "nodes": "A,B", ' \
+                '"minimum": 5, "maximum": 2}']:
+            response = server.handle_line(self.stations, line)
+            self.assertIn('error', response)
+            self.assertNotIn('result', response)
+        self.assertEqual(response['id'], 3)
+        self.assertTrue(response['error'].startswith('ValueError'))
+
+    def test_serve_stream(self):
+        """
+        Is a response written for each request, in order, skipping blank
+            lines?
+        """
+        requests = io.StringIO('{"id": 1, "command": "route", ' \
+                '"nodes": "A,C,B"}\n\n{"id": 2, "command": "movetrips", ' \
+                '"nodes": "A,B", "maximum": 2}\n')
+        responses = io.StringIO()
+        server.serve_stream(self.stations, requests, responses)
+        self.assertEqual([json.loads(line) for line in
+                responses.getvalue().splitlines()],
+                [{'id': 1, 'result': '4'}, {'id': 2, 'result': 2}])
+
+    def test_unix_socket(self):
+        """
+        Are requests sent over a Unix socket answered on the same connection?
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.sock')
+            unix_server = server.make_unix_server(self.stations, path)
+            thread = threading.Thread(target=unix_server.serve_forever)
+            thread.start()
+            try:
+                with socket.socket(socket.AF_UNIX) as client:
+                    client.connect(path)
+                    client.sendall(b'{"id": 1, "command": "mindist", ' \
+                            b'"nodes": "A,B"}\n')
+                    response = client.makefile('rb').readline()
+            finally:
+                unix_server.shutdown()
+                unix_server.server_close()
+                thread.join()
+        self.assertEqual(json.loads(response), {'id': 1, 'result': 4})
+
+class QueryServiceTestCases(unittest.TestCase):
+    """
+    Unit testing for the asyncio query server.
+    """
+    def setUp(self):
+        self.stations = StationGraph(['AB10', 'AC2', 'CB2', 'AD5'])
+        self.service = server.QueryService(self.stations, workers=2,
+                hierarchy=True)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_identical_queries_coalesced(self):
+        """
+        Are identical queries in flight at the same time only run once, with
+            each request still given its own id?
+        """
+        async def scenario():
+            request = {'command': 'movetrips', 'nodes': 'A,B', 'maximum': 2}
+            answers = [asyncio.ensure_future(self.service.answer(
+                    dict(request, id=number))) for number in range(3)]
+            return await asyncio.gather(*answers)
+
+        responses = asyncio.run(scenario())
+        self.assertEqual(responses, [{'id': number, 'result': 2}
+                for number in range(3)])
+        self.assertEqual(self.service.coalesced_count, 2)
+
+    def test_workers_prepared(self):
+        """
+        Do the worker processes build the preprocessing the service was
+            given, without the original graph having it?
+        """
+        async def scenario():
+            return await self.service.answer({'id': 1, 'command': 'mindist',
+                    'nodes': 'A,B', 'search': 'hierarchy'})
+
+        self.assertEqual(asyncio.run(scenario()), {'id': 1, 'result': 4})
+        with self.assertRaises(ValueError):
+            self.stations.min_route_distance('A', 'B', search='hierarchy')
+
+    def test_fast_query_not_blocked(self):
+        """
+        Over TCP, is a route answered while a slow query is still running,
+            and are latency percentiles reported per command?
+        """
+        async def scenario():
+            tcp_server = await self.service.start_server()
+            port = tcp_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'{"id": 1, "command": "movetrips", "nodes": "A,B", ' \
+                    b'"maximum": 2}\n{"id": 2, "command": "route", ' \
+                    b'"nodes": "A,C,B"}\n')
+            first = json.loads(await reader.readline())
+            second = json.loads(await reader.readline())
+            writer.write(b'{"id": 3, "command": "stats"}\n')
+            stats = json.loads(await reader.readline())
+            writer.close()
+            tcp_server.close()
+            await tcp_server.wait_closed()
+            return first, second, stats
+
+        first, second, stats = asyncio.run(scenario())
+        self.assertEqual(first, {'id': 2, 'result': '4'})
+        self.assertEqual(second, {'id': 1, 'result': 2})
+        self.assertEqual(set(stats['result']), {'route', 'movetrips'})
+        self.assertEqual(stats['result']['route']['count'], 1)
+        self.assertIn('p99', stats['result']['movetrips'])
+
+class LatencyStatsUnitTests(unittest.TestCase):
+    """
+    Unit testing for a LatencyStats object.
+    """
+    def test_percentiles(self):
+        """
+        Are the nearest-rank percentiles reported in milliseconds, over the
+            most recent latencies only?
+        """
+        latencies = server.LatencyStats(window=100)
+        for milliseconds in range(1, 201):
+            latencies.record('mindist', milliseconds / 1000)
+        self.assertEqual(latencies.summary(), {'mindist': {'count': 200,
+                'p50': 150.0, 'p90': 190.0, 'p99': 199.0}})
+
+if __name__ == '__main__':
+    unittest.main()
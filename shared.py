@@ -0,0 +1,157 @@
+"""
+A read-only StationGraph held in shared memory, so that worker processes
+    can all query the same copy of a graph instead of each being sent their
+    own.
+"""
+
+from multiprocessing import shared_memory
+from graph import StationGraph
+
+# The shared graphs this process has attached to, by name, so that a graph
+# passed to the same worker many times is only attached once
+_attached = {}
+
+# The graph queried by a worker process, and anything else its pool handed
+# it, set up by init_worker()
+worker_graph = None
+worker_context = None
+
+class SharedGraph:
+    """
+    A class representing a graph snapshot (see StationGraph.to_bytes()) in a
+        block of shared memory. The process that creates it owns the block;
+        other processes attach to it by name and query it in place, without
+        copying it. Pickling a SharedGraph - e.g. to pass it to a
+        multiprocessing.Pool - only sends the name.
+
+    The graph is read-only, as after StationGraph.compact(), but supports
+        every query method. Processes attaching should be started by the
+        multiprocessing module from the process that created the block, so
+        that the block is cleaned up once, by its owner.
+
+    Public variables are:
+        graph - The StationGraph, using the shared memory in place.
+
+    Private variables are:
+        _memory - The multiprocessing.shared_memory.SharedMemory block.
+        _owner - Whether or not this process created the block (and so
+            should unlink it).
+    """
+    def __init__(self, memory, owner, cache_size=128):
+        """
+        Constructor method - use create() or attach() instead.
+
+        Arguments:
+            memory - The SharedMemory block holding the snapshot.
+            owner - Whether or not this process created the block.
+            cache_size - As for StationGraph().
+        """
+        self._memory = memory
+        self._owner = owner
+        self.graph = StationGraph.from_buffer(memory.buf, cache_size)
+
+    @classmethod
+    def create(cls, station_graph, cache_size=128):
+        """
+        Copies a graph, along with its distance index if one has been built,
+            into a new block of shared memory.
+
+        Arguments:
+            station_graph - The StationGraph to share.
+            cache_size - As for StationGraph(), for the shared copy.
+        Returns:
+            SharedGraph - The shared graph, owned by this process.
+        """
+        snapshot = station_graph.to_bytes()
+        memory = shared_memory.SharedMemory(create=True, size=len(snapshot))
+        memory.buf[:len(snapshot)] = snapshot
+        del snapshot
+        return cls(memory, True, cache_size)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attaches to a graph already in shared memory. Each block is only
+            attached to once per process.
+
+        Arguments:
+            name - The name of the block, as given by the name property.
+        Returns:
+            SharedGraph - The shared graph.
+        """
+        shared_graph = _attached.get(name)
+        if shared_graph is None:
+            shared_graph = cls(shared_memory.SharedMemory(name), False)
+            _attached[name] = shared_graph
+        return shared_graph
+
+    @property
+    def name(self):
+        """
+        Gives the name of the shared memory block, for attach().
+        """
+        return self._memory.name
+
+    @property
+    def nbytes(self):
+        """
+        Gives the size of the shared memory block, in bytes.
+        """
+        return self._memory.size
+
+    def __reduce__(self):
+        return SharedGraph.attach, (self.name,)
+
+    def close(self):
+        """
+        Stops using the shared graph in this process, and frees the block if
+            this process created it. The graph can't be queried afterwards,
+            and any reference to it should be dropped first - the block stays
+            mapped until the process exits if one is still held.
+        """
+        _attached.pop(self.name, None)
+        self.graph = None
+        try:
+            self._memory.close()
+        except BufferError:
+            # Parts of the graph are still referenced
+            pass
+        if self._owner:
+            self._owner = False
+            self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def init_worker(shared_graph, context=None, landmarks=0, hierarchy=False,
+        reachability=False):
+    """
+    Sets up a worker process of a multiprocessing pool with the graph to
+        query, as the pool's initializer - e.g.
+        multiprocessing.Pool(processes, init_worker, (shared_graph,)). The
+        graph is then worker_graph. Under the fork start method the worker
+        inherits shared_graph from the process that made the pool, mapping
+        and all; otherwise it is pickled, and attached to by name as it is
+        unpickled (see SharedGraph.attach()). Either way the graph is read
+        in place rather than copied.
+
+    Arguments:
+        shared_graph - The SharedGraph to query.
+        context - Anything else the worker's tasks need, e.g. the
+            destinations of a distance matrix. Kept as worker_context.
+        landmarks, hierarchy, reachability - The landmarks (a count),
+            contraction hierarchy and reachability index to build before the
+            worker's first task. None of them are part of the shared copy.
+    """
+    global worker_graph, worker_context
+    worker_graph = shared_graph.graph
+    worker_context = context
+    if landmarks:
+        worker_graph.build_landmarks(landmarks)
+    if hierarchy:
+        worker_graph.build_hierarchy()
+    if reachability:
+        worker_graph.build_reachability()
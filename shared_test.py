@@ -0,0 +1,61 @@
+import multiprocessing
+import unittest
+from graph import StationGraph
+from shared import SharedGraph
+
+def _count_trips(shared_graph):
+    """
+    Counts trips on a shared graph in a worker process.
+    """
+    return shared_graph.graph.num_trips_by_distance('C', 'C', 1, 30)
+
+class SharedGraphTestCases(unittest.TestCase):
+    """
+    Unit testing for a SharedGraph object.
+    """
+    def setUp(self):
+        self.stations = StationGraph(['AB5', 'BC4', 'CD8', 'DC8', 'DE6',
+                'AD5', 'CE2', 'EB3', 'AE7'])
+        self.stations.build_distance_index()
+        self.shared_graph = SharedGraph.create(self.stations)
+
+    def tearDown(self):
+        self.shared_graph.close()
+
+    def test_queries(self):
+        """
+        Does the shared graph answer queries like the original, while staying
+            read-only?
+        """
+        graph = self.shared_graph.graph
+        self.assertTrue(graph.is_compact())
+        self.assertTrue(graph.has_distance_index())
+        self.assertEqual(graph.get_distance_by_route(['A', 'B', 'C']), '9')
+        self.assertEqual(graph.num_trips_by_moves('C', 'C', 1, 3), 2)
+        self.assertEqual(graph.min_route_distance('B', 'B'), 9)
+        self.assertEqual(graph.min_route_distance('A', 'C', 'bidirectional'),
+                9)
+        with self.assertRaises(TypeError):
+            graph.add_connection('B', 'A', 1)
+
+    def test_attach(self):
+        """
+        Is attaching by name only done once per process?
+        """
+        attached = SharedGraph.attach(self.shared_graph.name)
+        self.assertIs(SharedGraph.attach(self.shared_graph.name), attached)
+        self.assertEqual(attached.graph.get('A'), self.stations.get('A'))
+        attached.close()
+        self.assertIsNot(SharedGraph.attach(self.shared_graph.name), attached)
+        SharedGraph.attach(self.shared_graph.name).close()
+
+    def test_workers_attach(self):
+        """
+        Can worker processes be passed the shared graph and query it?
+        """
+        with multiprocessing.Pool(2) as pool:
+            counts = pool.map(_count_trips, [self.shared_graph] * 4)
+        self.assertEqual(counts, [7] * 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,382 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+import io
+import struct
+import sys
+
+# The layout of a snapshot header, as written by CompactAdjacency.write():
+# magic, format version, flags, station count, connection count and the
+# size of the station name table in bytes. The sections that follow are
+# each padded to a multiple of 8 bytes.
+SNAPSHOT_MAGIC = b'STNGRAPH'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<8sIIqqq')
+# Snapshot flags
+SNAPSHOT_BIG_ENDIAN = 1
+SNAPSHOT_HAS_DISTANCES = 2
+
+class CompactAdjacency(Mapping):
+    """
+    A class representing the connections of a graph in a compact, read-only
+        form. Every station name is mapped to a dense integer ID, and the
+        connections are stored in compressed sparse row (CSR) form - three
+        flat arrays rather than a dict per station:
+            offsets - The connections from station i are stored at positions
+                offsets[i] up to (not including) offsets[i + 1] of the two
+                arrays below.
+            targets - The ID of the station each connection leads to. The
+                connections from each station are sorted by this ID.
+            weights - The distance of each connection.
+
+    It behaves like the dict of dicts used by StationGraph._nodes - e.g.
+        adjacency['A'] gives the connections from 'A', as a mapping of each
+        station it connects to and the distance - so everything built on top
+        of _nodes keeps working.
+
+    Private variables are:
+        _names - The name of each station, indexed by ID.
+        _ids - A dict of each station name (key) and its ID (value).
+        _offsets, _targets, _weights - The CSR arrays described above. Any
+            sequence of ints will do, e.g. array.array or memoryview.
+    """
+    def __init__(self, names, offsets, targets, weights):
+        """
+        Constructor method.
+
+        Arguments:
+            names - The name of each station, indexed by ID.
+            offsets - The offsets array, len(names) + 1 long.
+            targets - The targets array.
+            weights - The weights array, the same length as targets.
+        """
+        if len(offsets) != len(names) + 1 or len(targets) != len(weights):
+            raise ValueError("Mismatched compact graph arrays")
+        self._names = list(names)
+        self._ids = {name: index for index, name in enumerate(self._names)}
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+
+    @classmethod
+    def from_edges(cls, edges, names=()):
+        """
+        Builds the compact form of a graph from a list of connections. If a
+            connection is listed more than once, the last one listed is kept,
+            as with StationGraph.add_connection().
+
+        Arguments:
+            edges - An iterable of (node_from, node_to, distance) tuples. The
+                connections are not validated here.
+            names - Station names to give the first IDs to, in order - e.g.
+                to keep stations without any connections.
+        Returns:
+            CompactAdjacency - The compact graph.
+        """
+        ids = {}
+        for name in names:
+            ids.setdefault(name, len(ids))
+        sources = array('i')
+        targets = array('i')
+        weights = array('q')
+        for node_from, node_to, distance in edges:
+            sources.append(ids.setdefault(node_from, len(ids)))
+            targets.append(ids.setdefault(node_to, len(ids)))
+            weights.append(distance)
+
+        # Group the connections by the station they start from (a counting
+        # sort), then sort and de-duplicate the connections of each station.
+        counts = [0] * (len(ids) + 1)
+        for source in sources:
+            counts[source + 1] += 1
+        for index in range(len(ids)):
+            counts[index + 1] += counts[index]
+        places = counts[:-1]
+        grouped_targets = array('i', bytes(len(targets) * targets.itemsize))
+        grouped_weights = array('q', bytes(len(weights) * weights.itemsize))
+        for source, target, weight in zip(sources, targets, weights):
+            grouped_targets[places[source]] = target
+            grouped_weights[places[source]] = weight
+            places[source] += 1
+        del sources, targets, weights
+
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('q')
+        for index in range(len(ids)):
+            start, end = counts[index], counts[index + 1]
+            row = dict(zip(grouped_targets[start:end],
+                    grouped_weights[start:end]))
+            for target in sorted(row):
+                targets.append(target)
+                weights.append(row[target])
+            offsets.append(len(targets))
+
+        return cls(sorted(ids, key=ids.get), offsets, targets, weights)
+
+    @classmethod
+    def from_adjacency(cls, adjacency):
+        """
+        Builds the compact form of a dict of dicts like StationGraph._nodes.
+
+        Arguments:
+            adjacency - A dict of each station (key) and a dict of the
+                stations it connects to, with the distance of each connection
+                (value).
+        Returns:
+            CompactAdjacency - The compact graph.
+        """
+        edges = ((node_from, node_to, distance)
+                for node_from, connected_nodes in adjacency.items()
+                for node_to, distance in connected_nodes.items())
+        return cls.from_edges(edges, adjacency.keys())
+
+    def reversed(self):
+        """
+        Builds the compact form of this graph with every connection reversed.
+
+        Returns:
+            CompactAdjacency - The reversed graph, with the same station IDs.
+        """
+        edges = ((self._names[self._targets[position]], node_from,
+                self._weights[position])
+                for index, node_from in enumerate(self._names)
+                for position in range(self._offsets[index],
+                        self._offsets[index + 1]))
+        return CompactAdjacency.from_edges(edges, self._names)
+
+    def write(self, stream, distances=None):
+        """
+        Writes the graph to a binary stream as a snapshot, which
+            from_buffer() can use in place - e.g. from a memory-mapped file -
+            without reading each connection. The snapshot holds:
+                A header - see SNAPSHOT_HEADER.
+                The station name table - the offset of each name (len(names)
+                    + 1 8-byte ints), then the names themselves in UTF-8.
+                The offsets, targets and weights arrays, as stored here.
+                Optionally, a table of len(names) squared doubles (e.g. the
+                    minimum distances of a DistanceIndex).
+            The arrays are written in the byte order of this machine.
+
+        Arguments:
+            stream - A binary file-like object to write to.
+            distances - An optional table of doubles to write after the
+                graph, ordered by station ID.
+        """
+        encoded_names = [name.encode('utf-8') for name in self._names]
+        name_offsets = array('q', [0])
+        for encoded_name in encoded_names:
+            name_offsets.append(name_offsets[-1] + len(encoded_name))
+        flags = SNAPSHOT_BIG_ENDIAN if sys.byteorder == 'big' else 0
+        if distances is not None:
+            if len(distances) != len(self._names) ** 2:
+                raise ValueError("Expected {:d} distances but received " \
+                        "{:d}".format(len(self._names) ** 2, len(distances)))
+            flags |= SNAPSHOT_HAS_DISTANCES
+
+        stream.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                flags, len(self._names), len(self._targets),
+                name_offsets[-1]))
+        sections = [name_offsets, b''.join(encoded_names),
+                _as_array('q', self._offsets), _as_array('i', self._targets),
+                _as_array('q', self._weights)]
+        if distances is not None:
+            sections.append(_as_array('d', distances))
+        for section in sections:
+            size = stream.write(section)
+            stream.write(bytes(-size % 8))
+
+    def to_bytes(self, distances=None):
+        """
+        Gives the snapshot written by write() as bytes.
+        """
+        stream = io.BytesIO()
+        self.write(stream, distances)
+        return stream.getvalue()
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Uses a snapshot written by write() in place. The arrays of the graph
+            are views onto the buffer rather than copies, so only the
+            station names are read up front - the connections are read from
+            the buffer (e.g. paged in from a memory-mapped file) as they are
+            used. The buffer must stay open for as long as the graph is used.
+
+        Arguments:
+            buffer - An object supporting the buffer protocol holding the
+                snapshot, e.g. bytes, mmap.mmap or a shared memory block.
+        Returns:
+            tuple - (graph, distances): the CompactAdjacency, and the table
+                of doubles written with it (a memoryview), or None. Throws a
+                ValueError if the buffer is not a snapshot this version can
+                use.
+        """
+        view = memoryview(buffer).cast('B')
+        if len(view) < SNAPSHOT_HEADER.size:
+            raise ValueError("Buffer is too short to be a graph snapshot")
+        magic, version, flags, node_count, edge_count, names_size = \
+                SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Buffer is not a graph snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported graph snapshot version " \
+                    "{:d}".format(version))
+        if bool(flags & SNAPSHOT_BIG_ENDIAN) != (sys.byteorder == 'big'):
+            raise ValueError("Graph snapshot was written with a different " \
+                    "byte order")
+
+        position = SNAPSHOT_HEADER.size
+        def section(typecode, count):
+            nonlocal position
+            size = count * struct.calcsize(typecode)
+            if position + size > len(view):
+                raise ValueError("Graph snapshot is truncated")
+            values = view[position:position + size].cast(typecode)
+            position += size + (-size % 8)
+            return values
+
+        name_offsets = section('q', node_count + 1)
+        name_table = section('B', names_size)
+        names = [str(name_table[name_offsets[index]:
+                name_offsets[index + 1]], 'utf-8')
+                for index in range(node_count)]
+        offsets = section('q', node_count + 1)
+        targets = section('i', edge_count)
+        weights = section('q', edge_count)
+        distances = None
+        if flags & SNAPSHOT_HAS_DISTANCES:
+            distances = section('d', node_count * node_count)
+        return cls(names, offsets, targets, weights), distances
+
+    def __getitem__(self, name):
+        """
+        Returns the connections from a station. Throws a KeyError if the
+            station doesn't exist.
+        """
+        index = self._ids[name]
+        return CompactConnections(self, self._offsets[index],
+                self._offsets[index + 1])
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def id_of(self, name):
+        """
+        Gives the integer ID of a station. Throws a KeyError if the station
+            doesn't exist.
+        """
+        return self._ids[name]
+
+    def name_of(self, index):
+        """
+        Gives the name of the station with an integer ID.
+        """
+        return self._names[index]
+
+    def edge_count(self):
+        """
+        Gives the number of connections in the graph.
+        """
+        return len(self._targets)
+
+    def nbytes(self):
+        """
+        Gives the memory taken up by the CSR arrays, in bytes (the station
+            names are not included).
+        """
+        return sum(len(values) * values.itemsize for values in
+                (self._offsets, self._targets, self._weights))
+
+def _as_array(typecode, values):
+    """
+    Gives a sequence of numbers as a buffer of the given type, without
+        copying it if it already is one.
+
+    Arguments:
+        typecode - The array.array type code wanted, e.g. 'q'.
+        values - The numbers - e.g. an array.array, a memoryview or a list.
+    Returns:
+        array/memoryview - The numbers, with that type code.
+    """
+    if isinstance(values, (array, memoryview)) and \
+            getattr(values, 'typecode', getattr(values, 'format', None)) == \
+            typecode:
+        return values
+    return array(typecode, values)
+
+class CompactConnections(Mapping):
+    """
+    A class representing the connections from one station of a
+        CompactAdjacency - a read-only mapping of each station it connects to
+        (key) and the distance of the connection (value).
+
+    Private variables are:
+        _graph - The CompactAdjacency the connections belong to.
+        _start, _end - The range of the connections in the CSR arrays.
+    """
+    __slots__ = ('_graph', '_start', '_end')
+
+    def __init__(self, graph, start, end):
+        self._graph = graph
+        self._start = start
+        self._end = end
+
+    def _position(self, name):
+        """
+        Finds a connection in the CSR arrays with a binary search.
+
+        Returns:
+            int - The position of the connection to the named station, or
+                None if there is no such connection.
+        """
+        index = self._graph._ids.get(name)
+        if index is None:
+            return None
+        position = bisect_left(self._graph._targets, index, self._start,
+                self._end)
+        if position < self._end and self._graph._targets[position] == index:
+            return position
+        return None
+
+    def __getitem__(self, name):
+        position = self._position(name)
+        if position is None:
+            raise KeyError(name)
+        return self._graph._weights[position]
+
+    def __contains__(self, name):
+        return self._position(name) is not None
+
+    def __iter__(self):
+        names = self._graph._names
+        for position in range(self._start, self._end):
+            yield names[self._graph._targets[position]]
+
+    def __len__(self):
+        return self._end - self._start
+
+    def items(self):
+        """
+        Iterates over the connections as (station, distance) pairs, without
+            looking each one up again.
+        """
+        names = self._graph._names
+        return zip([names[target] for target in
+                self._graph._targets[self._start:self._end]],
+                self._graph._weights[self._start:self._end])
+
+    def values(self):
+        """
+        Iterates over the distances of the connections.
+        """
+        return iter(self._graph._weights[self._start:self._end])
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,102 @@
+import unittest
+from storage import CompactAdjacency
+
+class CompactAdjacencyUnitTests(unittest.TestCase):
+    """
+    Unit testing for a CompactAdjacency object.
+    """
+    def setUp(self):
+        self.adjacency = {
+            'Union': {'King': 2, 'St Andrew': 3},
+            'King': {'Queen': 1},
+            'St Andrew': {'Union': 3},
+            'Queen': {},
+        }
+        self.compact = CompactAdjacency.from_adjacency(self.adjacency)
+
+    def test_behaves_like_dict(self):
+        """
+        Does the compact form give the same stations and connections as the
+            dict of dicts it was built from?
+        """
+        self.assertEqual(list(self.compact), list(self.adjacency))
+        self.assertEqual(len(self.compact), 4)
+        for node, connected_nodes in self.adjacency.items():
+            self.assertEqual(self.compact[node], connected_nodes)
+            self.assertEqual(dict(self.compact[node].items()), connected_nodes)
+        self.assertIn('Queen', self.compact)
+        self.assertNotIn('Bay', self.compact)
+        with self.assertRaises(KeyError):
+            self.compact['Bay']
+
+    def test_connection_lookup(self):
+        """
+        Can single connections be looked up, and do missing ones give a
+            KeyError?
+        """
+        self.assertEqual(self.compact['Union']['St Andrew'], 3)
+        self.assertIn('King', self.compact['Union'])
+        self.assertNotIn('Queen', self.compact['Union'])
+        self.assertNotIn('Bay', self.compact['Union'])
+        with self.assertRaises(KeyError):
+            self.compact['King']['Union']
+
+    def test_ids(self):
+        """
+        Are the station names mapped to dense integer IDs?
+        """
+        ids = sorted(self.compact.id_of(node) for node in self.adjacency)
+        self.assertEqual(ids, [0, 1, 2, 3])
+        self.assertEqual(self.compact.name_of(self.compact.id_of('King')),
+                'King')
+        self.assertEqual(self.compact.edge_count(), 4)
+        self.assertGreater(self.compact.nbytes(), 0)
+
+    def test_from_edges_last_wins(self):
+        """
+        When a connection is listed twice, is the last one kept?
+        """
+        compact = CompactAdjacency.from_edges([('A', 'B', 5), ('B', 'C', 1),
+                ('A', 'B', 2)])
+        self.assertEqual(compact['A'], {'B': 2})
+        self.assertEqual(compact['C'], {})
+        self.assertEqual(compact.edge_count(), 2)
+
+    def test_reversed(self):
+        """
+        Does reversed() give every connection the other way around?
+        """
+        reverse = self.compact.reversed()
+        self.assertEqual(reverse['Union'], {'St Andrew': 3})
+        self.assertEqual(reverse['Queen'], {'King': 1})
+        self.assertEqual(reverse['King'], {'Union': 2})
+
+    def test_snapshot_round_trip(self):
+        """
+        Does a snapshot written by to_bytes() give back the same graph, and
+            the same table of distances, when used in place by
+            from_buffer()?
+        """
+        distances = [float(value) for value in range(len(self.compact) ** 2)]
+        snapshot = self.compact.to_bytes(distances)
+        self.assertEqual(len(snapshot) % 8, 0)
+        loaded, loaded_distances = CompactAdjacency.from_buffer(snapshot)
+        self.assertEqual(list(loaded), list(self.compact))
+        for name in self.compact:
+            self.assertEqual(loaded[name], self.compact[name])
+        self.assertEqual(list(loaded_distances), distances)
+        self.assertIsNone(CompactAdjacency.from_buffer(
+                self.compact.to_bytes())[1])
+
+    def test_snapshot_errors(self):
+        """
+        Are buffers that are not snapshots, or are cut short, rejected?
+        """
+        snapshot = self.compact.to_bytes()
+        for buffer in [b'', b'X' * len(snapshot), snapshot[:-8],
+                snapshot[:8] + b'\x09' + snapshot[9:]]:
+            with self.assertRaises(ValueError):
+                CompactAdjacency.from_buffer(buffer)
+
+if __name__ == '__main__':
+    unittest.main()